@@ -0,0 +1,67 @@
+"""Time connecting-flight searches over the departures-by-airport index.
+
+Loads the schedule of a synthetic database once, then runs searches between random
+airport pairs on random days and reports the index build time and per-query latency.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_connections.py [--flights 20000] [--queries 500]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from synthetic_travel_db import AIRPORTS, build_travel_db
+
+from agents.tools.connections import FlightSchedule, find_connections
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path, flights=args.flights)
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        schedule = FlightSchedule.load(conn)
+        load_ms = (time.perf_counter() - start) * 1000
+        conn.close()
+        print(f"flights: {args.flights}, index built in {load_ms:.1f} ms")
+
+        rng = random.Random(7)
+        first_day = date(2024, 5, 1)
+        print(f"{'max legs':>9}{'found':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+        for max_legs in (1, 2, 3):
+            timings, found = [], 0
+            for _ in range(args.queries):
+                origin, destination = rng.sample(AIRPORTS, 2)
+                day = first_day + timedelta(days=rng.randrange(90))
+                start = time.perf_counter()
+                connections = find_connections(
+                    schedule,
+                    origin,
+                    destination,
+                    day.isoformat(),
+                    (day + timedelta(days=1)).isoformat(),
+                    max_legs=max_legs,
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+                found += bool(connections)
+            timings.sort()
+            print(
+                f"{max_legs:>9}{found:>8}{statistics.median(timings):>9.2f}"
+                f"{timings[int(len(timings) * 0.95)]:>9.2f}{timings[-1]:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare a month of per-day flight searches with one fare calendar lookup.
+
+Also reports how long the calendar migration takes to build the table and how much the
+refresh triggers add to a ticket insert.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_fare_calendar.py [--repeat 50]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from synthetic_travel_db import build_travel_db
+
+from agents.tools.db import TravelDBPool
+from agents.tools.flight_tools import build_calendar_query, build_flight_search_query
+
+ROUTE = ("BSL", "CDG")
+FIRST_DAY = date(2024, 5, 1)
+
+
+def per_day_searches(conn) -> int:
+    found = 0
+    for offset in range(31):
+        day = FIRST_DAY + timedelta(days=offset)
+        query, params = build_flight_search_query(*ROUTE, day, day, limit=20)
+        found += bool(conn.execute(query, params).fetchall())
+    return found
+
+
+def calendar_lookup(conn) -> int:
+    query, params = build_calendar_query(*ROUTE, FIRST_DAY)
+    return len(conn.execute(query, params).fetchall())
+
+
+def timed(fn, conn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(conn)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path)
+        pool = TravelDBPool(f"file:{path}?mode=rw")
+        start = time.perf_counter()
+        with pool.write():
+            pass
+        print(f"migrations, including the calendar build: {time.perf_counter() - start:.2f} s")
+
+        with pool.read() as conn:
+            print(f"days with flights: {per_day_searches(conn)} / {calendar_lookup(conn)}")
+            print(f"31 per-day searches: {timed(per_day_searches, conn, args.repeat):8.2f} ms")
+            print(f"calendar lookup:     {timed(calendar_lookup, conn, args.repeat):8.2f} ms")
+
+        with pool.write() as conn:
+            flight_ids = [row[0] for row in conn.execute("SELECT flight_id FROM flights LIMIT 500")]
+            start = time.perf_counter()
+            for n, flight_id in enumerate(flight_ids):
+                conn.execute(
+                    "INSERT INTO ticket_flights VALUES (?, ?, 'Economy', ?)",
+                    (f"BENCH{n}", flight_id, 100 + n),
+                )
+            elapsed = (time.perf_counter() - start) / len(flight_ids) * 1000
+        print(f"ticket insert with calendar refresh: {elapsed:.3f} ms")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare free-text location matching with R*Tree radius and nearest-N hotel lookups.
+
+Hotels are scattered across Europe so that the spatial queries see a realistic density,
+while the LIKE query still matches the synthetic city names.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_geo.py [--hotels 100000] [--repeat 200]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic_travel_db import build_travel_db
+
+from agents.tools.db import TravelDBPool
+from agents.tools.geo import AIRPORTS, build_nearby_query, search_nearby
+
+
+def timed(fn, repeat: int) -> tuple[int, float]:
+    rows = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return len(rows), (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hotels", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path, hotels=args.hotels)
+        pool = TravelDBPool(f"file:{path}?mode=rw")
+        with pool.write() as conn:
+            conn.execute(
+                "UPDATE hotels SET latitude = 36 + (abs(random()) % 240000) / 10000.0, "
+                "longitude = -10 + (abs(random()) % 400000) / 10000.0"
+            )
+
+        _, _, latitude, longitude = AIRPORTS["BSL"]
+        with pool.read() as conn:
+            cases = {
+                "LIKE '%Basel%'": lambda: conn.execute(
+                    "SELECT * FROM hotels WHERE location LIKE '%Basel%'"
+                ).fetchall(),
+                "within 20 km of BSL": lambda: conn.execute(
+                    *build_nearby_query("hotels", latitude, longitude, 20, limit=20)
+                ).fetchall(),
+                "nearest 10 to BSL": lambda: search_nearby(conn, "hotels", "BSL", limit=10),
+                "nearest 10 to Zermatt": lambda: search_nearby(conn, "hotels", "Zermatt", limit=10),
+            }
+            print(f"hotels: {args.hotels}")
+            print(f"{'query':<22}{'rows':>6}{'ms':>9}")
+            for name, fn in cases.items():
+                rows, ms = timed(fn, args.repeat)
+                print(f"{name:<22}{rows:>6}{ms:>9.3f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
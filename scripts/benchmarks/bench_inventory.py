@@ -0,0 +1,124 @@
+"""Contention benchmark for seat inventory: many processes booking the same flight.
+
+Compares a naive check-then-update in a deferred transaction with the inventory module's
+atomic conditional UPDATE inside the pool's BEGIN IMMEDIATE transaction. Each worker
+process keeps booking one seat until the flight is sold out, and the benchmark reports
+bookings, lock errors, throughput and whether the flight was oversold.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_inventory.py [--processes 8] [--seats 2000]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from multiprocessing import Pool
+
+from synthetic_travel_db import build_travel_db
+
+from agents.tools import inventory
+from agents.tools.db import TravelDBPool
+from agents.tools.inventory import SoldOut, hold_seats
+
+FLIGHT_ID = 1
+
+
+def naive_worker(path: str) -> tuple[int, int]:
+    booked = errors = 0
+    conn = sqlite3.connect(path, timeout=5)
+    while True:
+        try:
+            with conn:
+                left = conn.execute(
+                    "SELECT capacity - booked FROM flight_inventory "
+                    "WHERE flight_id = ? AND fare_conditions = 'Economy'",
+                    (FLIGHT_ID,),
+                ).fetchone()[0]
+                if left <= 0:
+                    break
+                conn.execute(
+                    "UPDATE flight_inventory SET booked = booked + 1 "
+                    "WHERE flight_id = ? AND fare_conditions = 'Economy'",
+                    (FLIGHT_ID,),
+                )
+            booked += 1
+        except sqlite3.OperationalError:
+            # The read lock can't be upgraded while another writer holds the database.
+            errors += 1
+        except sqlite3.IntegrityError:
+            # The CHECK constraint is the only thing stopping an oversell here.
+            errors += 1
+    conn.close()
+    return booked, errors
+
+
+def atomic_worker(path: str) -> tuple[int, int]:
+    booked = errors = 0
+    pool = TravelDBPool(f"file:{path}?mode=rw")
+    while True:
+        try:
+            with pool.write() as conn:
+                hold_seats(conn, FLIGHT_ID, "Economy", ttl=None)
+            booked += 1
+        except SoldOut:
+            break
+        except sqlite3.OperationalError:
+            errors += 1
+    pool.close()
+    return booked, errors
+
+
+def run(name: str, worker, path: str, processes: int, seats: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM flight_inventory")
+    conn.execute(
+        "INSERT INTO flight_inventory (flight_id, fare_conditions, capacity, booked) "
+        "VALUES (?, 'Economy', ?, 0)",
+        (FLIGHT_ID, seats),
+    )
+    conn.commit()
+
+    start = time.perf_counter()
+    with Pool(processes) as pool:
+        results = pool.map(worker, [path] * processes)
+    elapsed = time.perf_counter() - start
+
+    booked = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    counter = conn.execute("SELECT booked FROM flight_inventory").fetchone()[0]
+    conn.close()
+    print(
+        f"{name:<18}{processes:>10}{booked:>9}{errors:>9}{booked / elapsed:>13.0f}"
+        f"{'yes' if booked > seats or counter != booked else 'no':>10}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--seats", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path, flights=100)
+        # Opening the writer creates the inventory tables and switches the file to WAL.
+        setup = TravelDBPool(f"file:{path}?mode=rw")
+        with setup.write():
+            pass
+        setup.close()
+
+        print(f"seats per run: {args.seats}, hold TTL {inventory.HOLD_TTL_SECONDS}s")
+        print(
+            f"{'mode':<18}{'processes':>10}{'booked':>9}{'errors':>9}"
+            f"{'bookings/s':>13}{'oversold':>10}"
+        )
+        for processes in (1, args.processes):
+            run("naive-deferred", naive_worker, path, processes, args.seats)
+            run("atomic-immediate", atomic_worker, path, processes, args.seats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare the per-ticket itinerary lookup with the batched fetch_itinerary query.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_itinerary.py [--repeat 20]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from synthetic_travel_db import build_travel_db
+
+from agents.tools.itinerary import fetch_itinerary
+
+TICKET_COUNTS = (1, 10, 100, 500)
+
+
+def legacy_fetch(conn: sqlite3.Connection, passenger_id: str) -> dict:
+    """The previous fetch_user_flight_information body: one flight query per ticket."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM tickets WHERE passenger_id = ?", (passenger_id,))
+    ticket_rows = cursor.fetchall()
+    ticket_columns = [column[0] for column in cursor.description]
+    flights = []
+    for ticket_row in ticket_rows:
+        ticket = dict(zip(ticket_columns, ticket_row))
+        cursor.execute("SELECT * FROM flights WHERE flight_id = ?", (ticket["flight_id"],))
+        flight_row = cursor.fetchone()
+        flight = dict(zip([c[0] for c in cursor.description], flight_row)) if flight_row else None
+        flights.append({"ticket_info": ticket, "flight_info": flight})
+
+    cursor.execute("SELECT * FROM hotel_bookings WHERE passenger_id = ?", (passenger_id,))
+    hotels = cursor.fetchall()
+    hotel_ids = [row[1] for row in hotels]
+    cursor.execute(
+        f"SELECT * FROM hotels WHERE id IN ({','.join('?' for _ in hotel_ids)})", hotel_ids
+    )
+    cursor.fetchall()
+    cursor.execute("SELECT * FROM taxi_bookings WHERE passenger_id = ?", (passenger_id,))
+    cursor.fetchall()
+    cursor.execute("SELECT * FROM car_rental_bookings WHERE passenger_id = ?", (passenger_id,))
+    rentals = cursor.fetchall()
+    rental_ids = [row[0] for row in rentals]
+    cursor.execute(
+        f"SELECT * FROM car_rentals WHERE id IN ({','.join('?' for _ in rental_ids)})", rental_ids
+    )
+    cursor.fetchall()
+    cursor.close()
+    return {"flights": flights}
+
+
+def add_passenger(conn: sqlite3.Connection, passenger_id: str, tickets: int) -> None:
+    conn.executemany(
+        "INSERT INTO tickets VALUES (?, 'BENCH', ?, NULL, ?)",
+        [(f"B{passenger_id}-{n}", passenger_id, n % 20_000 + 1) for n in range(tickets)],
+    )
+    conn.execute(
+        "INSERT INTO hotel_bookings VALUES (?, 1, ?, '2024-05-01', '2024-05-03', NULL, 1)",
+        (f"H{passenger_id}", passenger_id),
+    )
+    conn.execute(
+        "INSERT INTO taxi_bookings VALUES (?, ?, 'Sedan', '2024-05-01 10:00', 'BSL', 'Basel')",
+        (f"T{passenger_id}", passenger_id),
+    )
+    conn.execute(
+        "INSERT INTO car_rental_bookings VALUES (1, '2024-05-01', '2024-05-03', ?)",
+        (passenger_id,),
+    )
+    conn.commit()
+
+
+def measure(conn: sqlite3.Connection, fn, passenger_id: str, repeat: int) -> tuple[int, float]:
+    statements = []
+    conn.set_trace_callback(statements.append)
+    fn(conn, passenger_id)
+    conn.set_trace_callback(None)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(conn, passenger_id)
+    return len(statements), (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path)
+        conn = sqlite3.connect(path)
+        # Index the lookup columns so the comparison is about round trips, not table scans.
+        conn.execute("CREATE INDEX IF NOT EXISTS bench_tickets ON tickets (passenger_id)")
+        for table in ("hotel_bookings", "taxi_bookings", "car_rental_bookings"):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS bench_{table} ON {table} (passenger_id)")
+
+        print(
+            f"{'tickets':>8}{'legacy queries':>16}{'legacy ms':>11}{'batched queries':>17}{'batched ms':>12}"
+        )
+        for tickets in TICKET_COUNTS:
+            passenger_id = f"BENCH {tickets:06d}"
+            add_passenger(conn, passenger_id, tickets)
+            legacy_queries, legacy_ms = measure(conn, legacy_fetch, passenger_id, args.repeat)
+            batched_queries, batched_ms = measure(conn, fetch_itinerary, passenger_id, args.repeat)
+            print(
+                f"{tickets:>8}{legacy_queries:>16}{legacy_ms:>11.2f}"
+                f"{batched_queries:>17}{batched_ms:>12.2f}"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
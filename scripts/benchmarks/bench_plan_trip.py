@@ -0,0 +1,85 @@
+"""Time plan_trip against running its flight, hotel and car searches one after another.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_plan_trip.py [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from synthetic_travel_db import AIRPORTS, build_travel_db
+
+from agents.tools import db
+from agents.tools.bundles import PlanTrip, best_bundles, car_options, flight_options, hotel_options
+
+
+def sequential(origin: str, destination: str, depart: str, back: str) -> list[dict]:
+    outbound = flight_options(origin, destination, depart, None)
+    inbound = flight_options(destination, origin, back, None)
+    hotels = hotel_options(destination, depart, back)
+    cars = car_options(destination, depart, back)
+    return best_bundles(outbound, inbound, hotels or None, cars or None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path)
+        db._pool = db.TravelDBPool(f"file:{path}?mode=rw", f"file:{path}?mode=ro")
+        rng = random.Random(7)
+        trips = []
+        for _ in range(args.repeat):
+            origin, destination = rng.sample(AIRPORTS, 2)
+            day = rng.randrange(1, 25)
+            trips.append((origin, destination, f"2024-05-{day:02d}", f"2024-05-{day + 3:02d}"))
+        tool = PlanTrip()
+        sequential(*trips[0])
+
+        start = time.perf_counter()
+        found = sum(bool(sequential(*trip)) for trip in trips)
+        sequential_ms = (time.perf_counter() - start) / len(trips) * 1000
+
+        start = time.perf_counter()
+        for origin, destination, depart, back in trips:
+            tool.invoke(
+                {
+                    "origin": origin,
+                    "destination": destination,
+                    "departure_date": depart,
+                    "return_date": back,
+                }
+            )
+        threaded_ms = (time.perf_counter() - start) / len(trips) * 1000
+
+        async def run_async() -> None:
+            for origin, destination, depart, back in trips:
+                await tool.ainvoke(
+                    {
+                        "origin": origin,
+                        "destination": destination,
+                        "departure_date": depart,
+                        "return_date": back,
+                    }
+                )
+
+        start = time.perf_counter()
+        asyncio.run(run_async())
+        async_ms = (time.perf_counter() - start) / len(trips) * 1000
+        db._pool.close()
+
+    print(f"trips planned: {len(trips)}, with at least one bundle: {found}")
+    print(f"sequential searches: {sequential_ms:8.2f} ms per trip")
+    print(f"plan_trip (invoke):  {threaded_ms:8.2f} ms per trip")
+    print(f"plan_trip (ainvoke): {async_ms:8.2f} ms per trip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time a cold import of the FastAPI app, and compiling each agent on top of it.
+
+Every sample runs in a fresh interpreter, the way a worker or a new pod starts.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_APP = "from service import app"
+WARM_UP = "from agents import warm_up; warm_up({agents})"
+# Prints the time since interpreter start, measured inside the child so that process
+# creation is not counted.
+TIMED = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(code: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", TIMED.format(code=code)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=os.environ,
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from agents.agents import agents
+
+    cases = {"import service:app": IMPORT_APP}
+    for agent_id in agents:
+        cases[f"+ warm up {agent_id}"] = f"{IMPORT_APP}\n{WARM_UP.format(agents=[agent_id])}"
+    cases["+ warm up all agents"] = f"{IMPORT_APP}\n{WARM_UP.format(agents=None)}"
+
+    print(f"{'':<40}{'median ms':>10}{'min ms':>10}")
+    for name, code in cases.items():
+        samples = [cold_start(code) for _ in range(args.repeat)]
+        print(f"{name:<40}{statistics.median(samples):>10.0f}{min(samples):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Count the tokens of representative tool outputs as JSON and as compact tables.
+
+The last row is the user's itinerary as the travel assistant writes it into every prompt.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_tool_output.py [--max-rows 20]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from synthetic_travel_db import build_travel_db
+
+from agents.tools import db
+from agents.tools.bundles import PlanTrip
+from agents.tools.car_rental_tools import SearchCarRental
+from agents.tools.encoding import encode, encode_tool_message
+from agents.tools.flight_tools import (
+    SearchConnectingFlights,
+    SearchFlights,
+    fetch_user_flight_information,
+)
+from agents.tools.hotel_tools import SearchHotel
+from agents.tools.taxi_tools import SearchTaxi
+from agents.tools.trip_recommendations import search_trip_recommendations
+
+QUERIES = [
+    (
+        "search_flights BSL-CDG",
+        SearchFlights(),
+        {"departure_airport": "BSL", "arrival_airport": "CDG"},
+    ),
+    (
+        "search_connecting_flights",
+        SearchConnectingFlights(),
+        {"departure_airport": "BSL", "arrival_airport": "NRT", "start_time": "2024-05-10"},
+    ),  # noqa: E501
+    ("search_hotel Basel", SearchHotel(), {"location": "Basel", "limit": 20}),
+    ("search_hotel near ZRH", SearchHotel(), {"near": "ZRH", "limit": 10}),
+    ("search_car_rental Paris", SearchCarRental(), {"location": "Paris"}),
+    ("search_taxi", SearchTaxi(), {"pickup_location": "BSL"}),
+    ("search_trip_recommendations", search_trip_recommendations, {"location": "Zurich"}),
+    (
+        "plan_trip BSL-CDG",
+        PlanTrip(),
+        {
+            "origin": "BSL",
+            "destination": "CDG",
+            "departure_date": "2024-05-10",
+            "return_date": "2024-05-13",
+        },
+    ),  # noqa: E501
+    ("fetch_user_flight_information", fetch_user_flight_information, {}),
+]
+CONFIG = {"configurable": {"passenger_id": "0007 000007"}}
+
+
+def token_counter():
+    """tiktoken's o200k_base encoding if it can be loaded, else LangChain's estimate."""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        from langchain_core.messages.utils import count_tokens_approximately
+
+        print("tiktoken's o200k_base is unavailable; using approximate token counts")
+        return lambda text: count_tokens_approximately([("user", text)])
+    return lambda text: len(encoding.encode(text))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-rows", type=int, default=20)
+    args = parser.parse_args()
+    count = token_counter()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path)
+        db._pool = db.TravelDBPool(f"file:{path}?mode=rw", f"file:{path}?mode=ro")
+
+        print(f"{'query':<32}{'json tokens':>12}{'compact':>9}{'saved':>8}")
+        total_json = total_compact = 0
+        for label, tool, query in QUERIES:
+            call = {"name": tool.name, "args": query, "id": "bench", "type": "tool_call"}
+            message = tool.invoke(call, CONFIG)
+            compact = encode_tool_message(message, args.max_rows)
+            assert json.loads(message.content) is not None
+            json_tokens, compact_tokens = count(message.content), count(compact.content)
+            total_json += json_tokens
+            total_compact += compact_tokens
+            print(
+                f"{label:<32}{json_tokens:>12}{compact_tokens:>9}"
+                f"{1 - compact_tokens / json_tokens:>8.0%}"
+            )
+        itinerary = fetch_user_flight_information.invoke({}, CONFIG)
+        json_tokens = count(json.dumps(itinerary, default=str))
+        compact_tokens = count(encode(itinerary, args.max_rows))
+        total_json += json_tokens
+        total_compact += compact_tokens
+        print(
+            f"{'itinerary in the prompt':<32}{json_tokens:>12}{compact_tokens:>9}"
+            f"{1 - compact_tokens / json_tokens:>8.0%}"
+        )
+        print(
+            f"{'total':<32}{total_json:>12}{total_compact:>9}{1 - total_compact / total_json:>8.0%}"
+        )
+        db._pool.close()
+
+
+if __name__ == "__main__":
+    main()
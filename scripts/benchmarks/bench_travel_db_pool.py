@@ -0,0 +1,84 @@
+"""Compare connect-per-call SQLite access with the shared travel database pool.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmarks/bench_travel_db_pool.py [--calls 2000] [--threads 8]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic_travel_db import build_travel_db
+
+from agents.tools.db import TravelDBPool
+
+QUERIES = [
+    (
+        "SELECT * FROM flights WHERE departure_airport = ? AND arrival_airport = ? LIMIT 10",
+        ("BSL", "CDG"),
+    ),
+    ("SELECT * FROM hotels WHERE location LIKE ?", ("%Basel%",)),
+    ("SELECT * FROM tickets WHERE passenger_id = ?", ("0042 000042",)),
+]
+
+
+def connect_per_call(path: str, calls: int) -> None:
+    for i in range(calls):
+        query, params = QUERIES[i % len(QUERIES)]
+        conn = sqlite3.connect(path)
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+
+def pooled(pool: TravelDBPool, calls: int) -> None:
+    for i in range(calls):
+        query, params = QUERIES[i % len(QUERIES)]
+        with pool.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            cursor.fetchall()
+            cursor.close()
+
+
+def timed(fn, threads: int, calls: int) -> float:
+    start = time.perf_counter()
+    if threads == 1:
+        fn(calls)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(fn, calls // threads) for _ in range(threads)]:
+                future.result()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel.sqlite")
+        build_travel_db(path)
+        pool = TravelDBPool(f"file:{path}?mode=rw", f"file:{path}?mode=ro")
+
+        print(f"{'mode':<20}{'threads':>8}{'total s':>10}{'per call us':>14}")
+        for threads in (1, args.threads):
+            for name, fn in (
+                ("connect-per-call", lambda n: connect_per_call(path, n)),
+                ("pooled", lambda n: pooled(pool, n)),
+            ):
+                elapsed = timed(fn, threads, args.calls)
+                per_call = elapsed / args.calls * 1e6
+                print(f"{name:<20}{threads:>8}{elapsed:>10.3f}{per_call:>14.1f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
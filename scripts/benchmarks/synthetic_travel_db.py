@@ -0,0 +1,212 @@
+"""Build a synthetic travel.sqlite with the same layout as the downloaded database.
+
+The benchmarks use this so they can run without the real database and at any scale.
+"""
+
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+AIRPORTS = ["BSL", "CDG", "FRA", "LHR", "AMS", "ZRH", "MUC", "JFK", "SFO", "NRT", "SIN", "DXB"]
+CITIES = ["Basel", "Paris", "Frankfurt", "London", "Amsterdam", "Zurich", "Munich", "New York"]
+PRICE_TIERS = ["Economy", "Midscale", "Upper Midscale", "Upscale", "Luxury"]
+FARE_CONDITIONS = ["Economy", "Comfort", "Business"]
+VEHICLE_TYPES = ["Sedan", "SUV", "Van", "Luxury"]
+KEYWORDS = ["museum", "history", "hiking", "food", "wine", "beach", "art", "nightlife", "shopping"]
+
+SCHEMA = """
+CREATE TABLE flights (
+    flight_id INTEGER PRIMARY KEY,
+    flight_no TEXT,
+    scheduled_departure TEXT,
+    scheduled_arrival TEXT,
+    departure_airport TEXT,
+    arrival_airport TEXT,
+    status TEXT,
+    aircraft_code TEXT,
+    actual_departure TEXT,
+    actual_arrival TEXT
+);
+CREATE TABLE tickets (
+    ticket_no TEXT,
+    book_ref TEXT,
+    passenger_id TEXT,
+    flight_no TEXT,
+    flight_id TEXT
+);
+CREATE TABLE ticket_flights (
+    ticket_no TEXT,
+    flight_id INTEGER,
+    fare_conditions TEXT,
+    amount REAL
+);
+CREATE TABLE boarding_passes (
+    ticket_no TEXT,
+    flight_id INTEGER,
+    boarding_no INTEGER,
+    seat_no TEXT
+);
+CREATE TABLE hotels (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    location TEXT,
+    price_tier TEXT,
+    checkin_date TEXT,
+    checkout_date TEXT,
+    booked INTEGER
+);
+CREATE TABLE hotel_bookings (
+    booking_id TEXT,
+    hotel_id INTEGER,
+    passenger_id TEXT,
+    check_in_date TEXT,
+    check_out_date TEXT,
+    room_type TEXT,
+    num_guests INTEGER
+);
+CREATE TABLE car_rentals (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    location TEXT,
+    price_tier TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    booked INTEGER
+);
+CREATE TABLE car_rental_bookings (
+    rental_id INTEGER,
+    start_date TEXT,
+    end_date TEXT,
+    passenger_id TEXT
+);
+CREATE TABLE taxi (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    vehicle_type TEXT,
+    price_tier TEXT,
+    capacity INTEGER,
+    location TEXT
+);
+CREATE TABLE taxi_bookings (
+    id TEXT,
+    passenger_id TEXT,
+    vehicle_type TEXT,
+    pickup_time TEXT,
+    pickup_location TEXT,
+    dropoff_location TEXT
+);
+CREATE TABLE trip_recommendations (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    location TEXT,
+    keywords TEXT,
+    details TEXT,
+    booked INTEGER
+);
+"""
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f%z"
+
+
+def _timestamp(value: datetime) -> str:
+    text = value.strftime(TIMESTAMP_FORMAT)
+    # Match the "+03:00" offset style used by the real database.
+    return f"{text[:-2]}:{text[-2:]}"
+
+
+def build_travel_db(
+    path: str,
+    *,
+    flights: int = 20_000,
+    hotels: int = 2_000,
+    car_rentals: int = 2_000,
+    taxis: int = 500,
+    trips: int = 2_000,
+    passengers: int = 1_000,
+    tickets_per_passenger: int = 3,
+    seed: int = 7,
+) -> None:
+    rng = random.Random(seed)
+    start = datetime.fromisoformat("2024-05-01T00:00:00+03:00")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+
+    flight_rows = []
+    for flight_id in range(1, flights + 1):
+        departure_airport, arrival_airport = rng.sample(AIRPORTS, 2)
+        departure = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 90))
+        arrival = departure + timedelta(minutes=rng.randrange(45, 60 * 12))
+        flight_rows.append(
+            (
+                flight_id,
+                f"LX{rng.randrange(100, 9999):04d}",
+                _timestamp(departure),
+                _timestamp(arrival),
+                departure_airport,
+                arrival_airport,
+                "Scheduled",
+                "319",
+                None,
+                None,
+            )
+        )
+    conn.executemany(f"INSERT INTO flights VALUES ({','.join('?' * 10)})", flight_rows)
+
+    ticket_rows, ticket_flight_rows, boarding_rows = [], [], []
+    for passenger in range(passengers):
+        passenger_id = f"{passenger:04d} {passenger:06d}"
+        for n in range(tickets_per_passenger):
+            flight = flight_rows[rng.randrange(flights)]
+            ticket_no = f"{passenger:07d}{n:05d}"
+            ticket_rows.append((ticket_no, f"{passenger:06X}", passenger_id, flight[1], flight[0]))
+            ticket_flight_rows.append(
+                (ticket_no, flight[0], rng.choice(FARE_CONDITIONS), rng.randrange(50, 2000))
+            )
+            boarding_rows.append((ticket_no, flight[0], n + 1, f"{rng.randrange(1, 40)}A"))
+    conn.executemany("INSERT INTO tickets VALUES (?, ?, ?, ?, ?)", ticket_rows)
+    conn.executemany("INSERT INTO ticket_flights VALUES (?, ?, ?, ?)", ticket_flight_rows)
+    conn.executemany("INSERT INTO boarding_passes VALUES (?, ?, ?, ?)", boarding_rows)
+
+    conn.executemany(
+        "INSERT INTO hotels VALUES (?, ?, ?, ?, ?, ?, 0)",
+        [
+            (i, f"Hotel {i}", rng.choice(CITIES), rng.choice(PRICE_TIERS), None, None)
+            for i in range(1, hotels + 1)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO car_rentals VALUES (?, ?, ?, ?, ?, ?, 0)",
+        [
+            (i, f"Rental {i}", rng.choice(CITIES), rng.choice(PRICE_TIERS), None, None)
+            for i in range(1, car_rentals + 1)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO taxi VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (
+                i,
+                f"Taxi {i}",
+                rng.choice(VEHICLE_TYPES),
+                rng.choice(PRICE_TIERS),
+                rng.randrange(2, 8),
+                rng.choice(CITIES),
+            )
+            for i in range(1, taxis + 1)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO trip_recommendations VALUES (?, ?, ?, ?, ?, 0)",
+        [
+            (
+                i,
+                f"Trip {i}",
+                rng.choice(CITIES),
+                ", ".join(rng.sample(KEYWORDS, 3)),
+                f"Details for trip {i}",
+            )
+            for i in range(1, trips + 1)
+        ],
+    )
+    conn.commit()
+    conn.close()
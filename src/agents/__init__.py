@@ -1,3 +1,9 @@
-from agents.agents import DEFAULT_AGENT, get_agent, get_all_agent_info
+from agents.agents import (
+    DEFAULT_AGENT,
+    get_agent,
+    get_all_agent_info,
+    set_agent_memory,
+    warm_up,
+)
 
-__all__ = ["get_agent", "get_all_agent_info", "DEFAULT_AGENT"]
+__all__ = ["get_agent", "get_all_agent_info", "set_agent_memory", "warm_up", "DEFAULT_AGENT"]
@@ -1,23 +1,10 @@
+import threading
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
+from typing import Any
 
 from langgraph.pregel import Pregel
 
-from agents.order_assistant import order_assistant
-from agents.order_assistant_new import order_assistant_new
-
-# from agents.bg_task_agent.bg_task_agent import bg_task_agent
-# from agents.chatbot import chatbot
-# from agents.command_agent import command_agent
-# from agents.interrupt_agent import interrupt_agent
-# from agents.knowledge_base_agent import kb_agent
-# from agents.langgraph_supervisor_agent import langgraph_supervisor_agent
-# from agents.multi_agent_travel_planner import supervisor
-from agents.rag_assistant import rag_assistant
-from agents.research_assistant import research_assistant
-
-# from agents.supervisor_travel import supervisor_travel
-# from agents.travel_planner import travel_planner
-from agents.travel_agent_support import workflow
 from schema import AgentInfo
 
 DEFAULT_AGENT = "order-assistant"
@@ -26,17 +13,44 @@ DEFAULT_AGENT = "order-assistant"
 @dataclass
 class Agent:
     description: str
-    graph: Pregel
+    graph: Pregel | None = None
+    # Imports and compiles the graph. Agent modules build their prompts, models and graphs
+    # at import time, so they are only imported when the agent is first used.
+    factory: Callable[[], Pregel] | None = None
+
+
+def _order_assistant() -> Pregel:
+    from agents.order_assistant_new import order_assistant_new
+
+    return order_assistant_new
+
+
+def _research_assistant() -> Pregel:
+    from agents.research_assistant import research_assistant
+
+    return research_assistant
+
+
+def _rag_assistant() -> Pregel:
+    from agents.rag_assistant import rag_assistant
+
+    return rag_assistant
+
+
+def _travel_agent_support() -> Pregel:
+    from agents.travel_agent_support import workflow
+
+    return workflow
 
 
 agents: dict[str, Agent] = {
     "travel-agent-support": Agent(
         description="A multi-agent travel planner.",
-        graph=workflow,
+        factory=_travel_agent_support,
     ),
     "order-assistant": Agent(
         description="An order assistant that can handle orders and inventory.",
-        graph=order_assistant_new,
+        factory=_order_assistant,
     ),
     # "supervisor-travel": Agent(
     #     description="A multi-agent travel planner.",
@@ -49,10 +63,12 @@ agents: dict[str, Agent] = {
     # # "travel-planner": Agent(description="A travel planner agent.", graph=travel_planner),
     # "chatbot": Agent(description="A simple chatbot.", graph=chatbot),
     "research-assistant": Agent(
-        description="A research assistant with web search and calculator.", graph=research_assistant
+        description="A research assistant with web search and calculator.",
+        factory=_research_assistant,
     ),
     "rag-assistant": Agent(
-        description="A RAG assistant with access to information in a database.", graph=rag_assistant
+        description="A RAG assistant with access to information in a database.",
+        factory=_rag_assistant,
     ),
     # "command-agent": Agent(description="A command agent.", graph=command_agent),
     # "bg-task-agent": Agent(description="A background task agent.", graph=bg_task_agent),
@@ -67,8 +83,42 @@ agents: dict[str, Agent] = {
 }
 
 
+# Checkpointer and store given to every graph, including ones compiled after startup.
+_memory: dict[str, Any] = {}
+_lock = threading.Lock()
+
+
 def get_agent(agent_id: str) -> Pregel:
-    return agents[agent_id].graph
+    """The agent's graph, compiled on first use."""
+    agent = agents[agent_id]
+    graph = agent.graph
+    if graph is None:
+        if agent.factory is None:
+            raise ValueError(f"Agent {agent_id} has neither a graph nor a factory.")
+        with _lock:
+            if agent.graph is None:
+                compiled = agent.factory()
+                for name, value in _memory.items():
+                    setattr(compiled, name, value)
+                agent.graph = compiled
+            graph = agent.graph
+    return graph
+
+
+def set_agent_memory(checkpointer: Any, store: Any) -> None:
+    """Use ``checkpointer`` and ``store`` for compiled agents and all agents compiled later."""
+    with _lock:
+        _memory.update(checkpointer=checkpointer, store=store)
+        for agent in agents.values():
+            if agent.graph is not None:
+                agent.graph.checkpointer = checkpointer
+                agent.graph.store = store
+
+
+def warm_up(agent_ids: Iterable[str] | None = None) -> None:
+    """Compile ``agent_ids``, or every agent, ahead of the first request."""
+    for agent_id in agents if agent_ids is None else agent_ids:
+        get_agent(agent_id)
 
 
 def get_all_agent_info() -> list[AgentInfo]:
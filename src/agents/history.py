@@ -0,0 +1,192 @@
+import asyncio
+import contextvars
+import logging
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any, cast
+
+from langchain_core.messages import (
+    AnyMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    convert_to_messages,
+    get_buffer_string,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig
+from typing_extensions import TypedDict
+
+from core import get_model, metrics, settings
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You keep a running summary of a conversation between a user and an assistant. "
+    "Update the current summary with the new messages. Keep names, dates, places, booking, "
+    "ticket and passenger ids, prices and the user's preferences and open requests; leave "
+    "out small talk and tool output the assistant no longer needs. Reply with the summary only."
+)
+# Summaries of abandoned threads are never stored in state, so only this many are kept.
+MAX_PENDING_SUMMARIES = 1024
+
+
+class HistoryState(TypedDict, total=False):
+    # Rolling summary of the messages that fell out of the history window, and the id of the
+    # last message it covers.
+    summary: str
+    summarized_until: str
+
+
+# Summaries finished in the background but not yet stored in graph state, by thread id: the
+# summarized_until they extend, the new summarized_until and the summary.
+_pending: OrderedDict[str, tuple[str | None, str, str]] = OrderedDict()
+_running: set[str] = set()
+_tasks: set[asyncio.Task] = set()
+
+
+def truncate_tool_output(message: BaseMessage, limit: int) -> BaseMessage:
+    """``message`` with a tool output longer than ``limit`` characters cut short."""
+    content = message.content
+    if (
+        not isinstance(message, ToolMessage)
+        or not isinstance(content, str)
+        or len(content) <= limit
+    ):
+        return message
+    note = f"\n... [{len(content) - limit} more characters truncated]"
+    return message.model_copy(update={"content": content[:limit] + note})
+
+
+def split_turns(messages: Sequence[BaseMessage]) -> list[list[BaseMessage]]:
+    """Group messages into turns, each starting at a human message."""
+    turns: list[list[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def window(
+    messages: Sequence[BaseMessage], max_tokens: int
+) -> tuple[list[BaseMessage], list[BaseMessage]]:
+    """Split ``messages`` into the ones before the window and the window itself.
+
+    The window is the latest turn plus as many whole earlier turns as fit in ``max_tokens``,
+    so a tool call is never separated from its result.
+    """
+    turns = split_turns(messages)
+    kept = turns.pop() if turns else []
+    used = count_tokens_approximately(kept)
+    while turns:
+        tokens = count_tokens_approximately(turns[-1])
+        if used + tokens > max_tokens:
+            break
+        used += tokens
+        kept = turns.pop() + kept
+    return [message for turn in turns for message in turn], kept
+
+
+async def _summarize(
+    thread_id: str,
+    summary: str | None,
+    until: str | None,
+    last_id: str,
+    messages: list[BaseMessage],
+    model: Any,
+) -> None:
+    try:
+        prompt = (
+            f"Current summary:\n{summary or '(none)'}\n\n"
+            f"New messages:\n{get_buffer_string(messages)}"
+        )
+        response = await get_model(model).ainvoke(
+            [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=prompt)],
+            {"tags": ["skip_stream"]},
+        )
+        _pending[thread_id] = (until, last_id, response.text())
+        _pending.move_to_end(thread_id)
+        while len(_pending) > MAX_PENDING_SUMMARIES:
+            _pending.popitem(last=False)
+        metrics.increment("history.summaries")
+    except Exception as e:
+        logger.warning(f"Summarizing thread {thread_id} failed: {e}")
+        metrics.increment("history.summary_failures")
+    finally:
+        _running.discard(thread_id)
+
+
+def _summarize_in_background(
+    thread_id: str, summary: str | None, until: str | None, messages: list[BaseMessage], model: Any
+) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    # Without an id the summary can't say where it ends, so it would be redone every turn.
+    last_id = messages[-1].id
+    if thread_id in _running or last_id is None:
+        return
+    _running.add(thread_id)
+    # A fresh context keeps the summary out of the current run's callbacks and stream.
+    task = loop.create_task(
+        _summarize(thread_id, summary, until, last_id, messages, model),
+        context=contextvars.Context(),
+    )
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def windowed_history(
+    state: Mapping[str, Any], config: RunnableConfig
+) -> tuple[list[AnyMessage], HistoryState]:
+    """The messages to send to the model this turn, and the state update to return with it.
+
+    Tool outputs before the latest turn are truncated to HISTORY_TOOL_OUTPUT_CHARS and only
+    the most recent turns within HISTORY_MAX_TOKENS are kept. Once enough older messages
+    have fallen out of the window, they are folded into the thread's rolling summary in the
+    background; the finished summary is stored in state on a later turn and sent ahead of
+    the window, so the prompt stays about the same size however long the thread gets.
+    Summaries are only produced when called from a running event loop (``ainvoke`` and
+    ``astream``); a sync call drops the older turns without summarizing them. Return the
+    state update on every path, or a finished summary is lost and has to be redone.
+    """
+    messages = convert_to_messages(state["messages"])
+    summary, until = state.get("summary"), state.get("summarized_until")
+    update: HistoryState = {}
+    configurable = config.get("configurable", {})
+    thread_id = configurable.get("thread_id")
+    if thread_id and thread_id in _pending and _pending[thread_id][0] == until:
+        _, until, summary = _pending.pop(thread_id)
+        update = {"summary": summary, "summarized_until": until}
+
+    turns = split_turns(messages)
+    if settings.HISTORY_TOOL_OUTPUT_CHARS and len(turns) > 1:
+        limit = settings.HISTORY_TOOL_OUTPUT_CHARS
+        older = [truncate_tool_output(message, limit) for turn in turns[:-1] for message in turn]
+        messages = older + turns[-1]
+
+    if settings.HISTORY_MAX_TOKENS:
+        ids = [message.id for message in messages]
+        dropped, messages = window(messages, settings.HISTORY_MAX_TOKENS)
+        # The dropped messages are a prefix of the history; skip those already summarized.
+        unsummarized = dropped[ids.index(until) + 1 if until in ids else 0 :]
+        min_tokens = settings.HISTORY_MAX_TOKENS // 4
+        if (
+            settings.HISTORY_SUMMARIZE
+            and thread_id
+            and count_tokens_approximately(unsummarized) >= min_tokens
+        ):
+            model = settings.HISTORY_SUMMARY_MODEL or configurable.get("model")
+            _summarize_in_background(
+                thread_id, summary, until, unsummarized, model or settings.DEFAULT_MODEL
+            )
+
+    if summary:
+        note = SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+        messages = [note, *messages]
+    # convert_to_messages only produces the message classes AnyMessage is made of.
+    return cast(list[AnyMessage], messages), update
@@ -0,0 +1,85 @@
+import importlib
+import re
+import time
+from collections.abc import Callable
+from functools import cache
+
+from core import metrics, settings
+
+# A classifier maps the user's message to the name of a handoff tool of the primary
+# assistant and a confidence in [0, 1], or to None when it can't tell.
+IntentClassifier = Callable[[str], tuple[str | None, float]]
+
+RULE_CONFIDENCE = 0.9
+# Words that ask for something to be done, as opposed to a question about the trip.
+ACTION = re.compile(
+    r"\b(book|reserve|cancel|change|update|reschedule|move|switch|rent|hire|find|search|"
+    r"look for|get me|need|want|would like)\b",
+    re.IGNORECASE,
+)
+INTENT_RULES = {
+    "ToFlightBookingAssistant": re.compile(
+        r"\b(flights?|fly|flying|plane|boarding|seat|tickets?|departure|layover)\b", re.IGNORECASE
+    ),
+    "ToHotelBookingAssistant": re.compile(
+        r"\b(hotels?|rooms?|accommodation|lodging|check[- ]?(in|out))\b", re.IGNORECASE
+    ),
+    "ToBookCarRental": re.compile(
+        r"\b(car rentals?|rental cars?|rent(ing)? a car|hire a car|car hire)\b", re.IGNORECASE
+    ),
+    "ToTaxiBookingAssistant": re.compile(r"\b(taxis?|cabs?|transfer to|ride to)\b", re.IGNORECASE),
+    "ToTripBookingAssistant": re.compile(
+        r"\b(excursions?|tours?|things to do|activities|sightseeing|trip recommendations?)\b",
+        re.IGNORECASE,
+    ),
+}
+
+
+def classify_by_rules(text: str) -> tuple[str | None, float]:
+    """The one handoff whose keywords appear next to an action word in ``text``.
+
+    Messages that mention several kinds of booking, or none, or don't ask for anything are
+    left to the primary assistant.
+    """
+    if not ACTION.search(text):
+        return None, 0.0
+    matches = [intent for intent, pattern in INTENT_RULES.items() if pattern.search(text)]
+    if len(matches) != 1:
+        return None, 0.0
+    return matches[0], RULE_CONFIDENCE
+
+
+@cache
+def _load_classifier(path: str) -> IntentClassifier:
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def classify_intent(text: str) -> str | None:
+    """The handoff tool to route ``text`` to directly, or None to ask the primary assistant.
+
+    The keyword rules are tried first, then INTENT_CLASSIFIER (a ``module:function`` path,
+    e.g. a small local model) when they abstain. Turns, hits and the time spent and saved
+    are counted in core.metrics; the hit rate is intent_router.hits / intent_router.turns.
+    """
+    start = time.perf_counter()
+    intent, confidence = classify_by_rules(text)
+    if intent is None and settings.INTENT_CLASSIFIER:
+        intent, confidence = _load_classifier(settings.INTENT_CLASSIFIER)(text)
+    metrics.increment("intent_router.turns")
+    metrics.increment("intent_router.seconds", time.perf_counter() - start)
+    if intent not in INTENT_RULES or confidence < settings.INTENT_MIN_CONFIDENCE:
+        return None
+    metrics.increment("intent_router.hits")
+    # Each hit skips a primary assistant call that would have made the handoff, which takes
+    # as long as the handoffs it made itself on average.
+    if handoffs := metrics.get("intent_router.llm_handoffs"):
+        saved = metrics.get("intent_router.llm_handoff_seconds") / handoffs
+        metrics.increment("intent_router.seconds_saved", saved)
+    return intent
+
+
+def record_llm_handoff(seconds: float) -> None:
+    """Count a handoff the primary assistant made itself, and how long the call took."""
+    metrics.increment("intent_router.llm_handoffs")
+    metrics.increment("intent_router.llm_handoff_seconds", seconds)
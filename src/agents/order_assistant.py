@@ -2,7 +2,6 @@ from datetime import datetime
 from typing import Literal
 
 from langchain.tools import BaseTool
-from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnableSerializable
 from langgraph.checkpoint.memory import MemorySaver
@@ -12,12 +11,13 @@ from langgraph.prebuilt import ToolNode
 from pydantic import BaseModel, Field
 
 from agents.llama_guard import LlamaGuard, LlamaGuardOutput, SafetyAssessment
-from core import get_model, settings
+from core import get_bound_model, settings
 from data_products.customer_360 import Customer360
 from data_products.deals_360 import Deals360
 from data_products.inventory_360 import Inventory360
 from data_products.proposals_360 import Proposals360
 from data_products.reorder_360 import Reorder360
+from schema.models import AllModelEnum
 
 
 class OrderState(MessagesState, total=False):
@@ -161,8 +161,8 @@ Guidelines:
 """
 
 
-def wrap_model(model: BaseChatModel) -> RunnableSerializable[OrderState, AIMessage]:
-    bound_model = model.bind_tools(tools)
+def wrap_model(model_name: AllModelEnum) -> RunnableSerializable[OrderState, AIMessage]:
+    bound_model = get_bound_model(model_name, tools)
     preprocessor = RunnableLambda(
         lambda state: [SystemMessage(content=instructions)] + state["messages"],
         name="StateModifier",
@@ -178,8 +178,7 @@ def format_safety_message(safety: LlamaGuardOutput) -> AIMessage:
 
 
 async def acall_model(state: OrderState, config: RunnableConfig) -> OrderState:
-    m = get_model(config["configurable"].get("model", settings.DEFAULT_MODEL))
-    model_runnable = wrap_model(m)
+    model_runnable = wrap_model(config["configurable"].get("model", settings.DEFAULT_MODEL))
     response = await model_runnable.ainvoke(state, config)
 
     # Safety check
@@ -2,7 +2,6 @@ from datetime import datetime
 from typing import Literal
 
 from langchain.tools import BaseTool
-from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig, RunnableLambda, RunnableSerializable
 from langgraph.checkpoint.memory import MemorySaver
@@ -12,16 +11,19 @@ from langgraph.prebuilt import ToolNode
 from langgraph.store.memory import InMemoryStore
 from pydantic import BaseModel, Field
 
+from agents.history import HistoryState, windowed_history
 from agents.llama_guard import LlamaGuard, LlamaGuardOutput, SafetyAssessment
-from core import get_model, settings
+from core import get_bound_model, settings
+from core.response_cache import with_response_cache
 from data_products.customer_360 import Customer360
 from data_products.deals_360 import Deals360
 from data_products.inventory_360 import Inventory360
 from data_products.proposals_360 import Proposals360
 from data_products.reorder_360 import Reorder360
+from schema.models import AllModelEnum
 
 
-class OrderState(MessagesState, total=False):
+class OrderState(MessagesState, HistoryState, total=False):
     """`total=False` is PEP589 specs.
 
     documentation: https://typing.readthedocs.io/en/latest/spec/typeddict.html#totality
@@ -158,8 +160,10 @@ Guidelines:
     """
 
 
-def wrap_model(model: BaseChatModel) -> RunnableSerializable[OrderState, AIMessage]:
-    bound_model = model.bind_tools(tools)
+def wrap_model(model_name: AllModelEnum) -> RunnableSerializable[OrderState, AIMessage]:
+    bound_model = with_response_cache(
+        "order-assistant", model_name, tools, get_bound_model(model_name, tools)
+    )
     preprocessor = RunnableLambda(
         lambda state: [SystemMessage(content=instructions)] + state["messages"],
         name="StateModifier",
@@ -175,15 +179,19 @@ def format_safety_message(safety: LlamaGuardOutput) -> AIMessage:
 
 
 async def acall_model(state: OrderState, config: RunnableConfig) -> OrderState:
-    m = get_model(config["configurable"].get("model", settings.DEFAULT_MODEL))
-    model_runnable = wrap_model(m)
-    response = await model_runnable.ainvoke(state, config)
+    model_runnable = wrap_model(config["configurable"].get("model", settings.DEFAULT_MODEL))
+    messages, history = windowed_history(state, config)
+    response = await model_runnable.ainvoke({**state, "messages": messages}, config)
 
     # Run llama guard check here to avoid returning the message if it's unsafe
     llama_guard = LlamaGuard()
-    safety_output = await llama_guard.ainvoke("Agent", state["messages"] + [response])
+    safety_output = await llama_guard.ainvoke("Agent", messages + [response])
     if safety_output.safety_assessment == SafetyAssessment.UNSAFE:
-        return {"messages": [format_safety_message(safety_output)], "safety": safety_output}
+        return {
+            "messages": [format_safety_message(safety_output)],
+            "safety": safety_output,
+            **history,
+        }
 
     if state["remaining_steps"] < 2 and response.tool_calls:
         return {
@@ -192,10 +200,11 @@ async def acall_model(state: OrderState, config: RunnableConfig) -> OrderState:
                     id=response.id,
                     content="Sorry, need more steps to process this request.",
                 )
-            ]
+            ],
+            **history,
         }
     # We return a list, because this will get added to the existing list
-    return {"messages": [response]}
+    return {"messages": [response], **history}
 
 
 async def llama_guard_input(state: OrderState, config: RunnableConfig) -> OrderState:
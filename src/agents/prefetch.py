@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any
+
+from langchain_core.messages import ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+
+from agents.tools.base import is_read_only
+from agents.tools.car_rental_tools import SearchCarRental
+from agents.tools.db import get_executor
+from agents.tools.error_handling import ConcurrentToolNode
+from agents.tools.geo import AIRPORTS
+from agents.tools.hotel_tools import SearchHotel
+from core import metrics, settings
+
+logger = logging.getLogger(__name__)
+
+# How long a tool call waits for a prefetched search that is still running before it runs
+# the search itself.
+PREFETCH_WAIT_SECONDS = 2.0
+# Prefetches of abandoned threads are never consumed, so only this many are kept.
+MAX_PREFETCHED_THREADS = 1024
+
+_search_hotel = SearchHotel()
+_search_car_rental = SearchCarRental()
+
+# Searches still running or not yet used, by thread and then by call_key.
+_prefetched: OrderedDict[str, dict[str, Future[ToolMessage]]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def call_key(name: str, args: dict[str, Any]) -> str:
+    """Identify a tool call by its tool and arguments, ignoring arguments left unset."""
+    args = {key: value for key, value in args.items() if value is not None}
+    return json.dumps([name, args], sort_keys=True, default=str)
+
+
+def predict_searches(target: str, itinerary: dict) -> list[tuple[BaseTool, dict[str, Any]]]:
+    """The searches the ``target`` sub-assistant is likely to start with.
+
+    They are hotels or car rentals at the arrival airport and city of the user's first
+    booked flight. Flight changes get none: the flight assistant searches the day the user
+    asks for, which can't be predicted.
+    """
+    if target not in ("book_hotel", "book_car_rental"):
+        return []
+    flight = next(
+        (f for f in itinerary.get("flights", []) if f.get("departure_airport")),
+        None,
+    )
+    arrival = flight.get("arrival_airport") if flight else None
+    if not arrival:
+        return []
+    tool: BaseTool = _search_hotel if target == "book_hotel" else _search_car_rental
+    searches = [(tool, {"near": arrival})]
+    if arrival in AIRPORTS:
+        searches.append((tool, {"location": AIRPORTS[arrival][1]}))
+    return searches
+
+
+def _search(tool: BaseTool, args: dict[str, Any]) -> ToolMessage:
+    call = ToolCall(name=tool.name, args=args, id="prefetch", type="tool_call")
+    return tool.invoke(call)
+
+
+def _thread_id(config: RunnableConfig) -> str | None:
+    return config.get("configurable", {}).get("thread_id")
+
+
+def start(target: str, state: dict, config: RunnableConfig) -> None:
+    """Start the searches ``target`` is likely to need, replacing those of an earlier turn.
+
+    Called when the travel graph routes to a sub-assistant, so the searches run on the
+    travel database threads while the sub-assistant's first model call is in flight.
+    """
+    thread_id = _thread_id(config)
+    if not settings.PREFETCH or thread_id is None:
+        return
+    itinerary = state.get("itinerary")
+    if not isinstance(itinerary, dict):
+        return
+    searches = {
+        call_key(tool.name, args): get_executor().submit(_search, tool, args)
+        for tool, args in predict_searches(target, itinerary)
+    }
+    metrics.increment("prefetch.searches", len(searches))
+    with _lock:
+        _prefetched[thread_id] = searches
+        _prefetched.move_to_end(thread_id)
+        while len(_prefetched) > MAX_PREFETCHED_THREADS:
+            _prefetched.popitem(last=False)
+
+
+def discard(config: RunnableConfig) -> None:
+    """Forget the thread's prefetched searches, e.g. at the start of a turn or after a write."""
+    thread_id = _thread_id(config)
+    if thread_id is None:
+        return
+    with _lock:
+        _prefetched.pop(thread_id, None)
+
+
+def _take(config: RunnableConfig, call: ToolCall) -> Future[ToolMessage] | None:
+    """The prefetched search for ``call``, which is handed out only once."""
+    thread_id = _thread_id(config)
+    if thread_id is None:
+        return None
+    with _lock:
+        searches = _prefetched.get(thread_id)
+        if searches is None:
+            return None
+        future = searches.pop(call_key(call["name"], call["args"]), None)
+    metrics.increment("prefetch.hits" if future else "prefetch.misses")
+    return future
+
+
+def _answer(call: ToolCall, message: ToolMessage) -> ToolMessage | None:
+    if message.status == "error":
+        return None
+    return message.model_copy(update={"tool_call_id": call["id"]})
+
+
+def take(config: RunnableConfig, call: ToolCall) -> ToolMessage | None:
+    """The prefetched answer to ``call``, or None if it has to be run."""
+    if (future := _take(config, call)) is None:
+        return None
+    try:
+        return _answer(call, future.result(timeout=PREFETCH_WAIT_SECONDS))
+    except Exception:
+        logger.warning("Prefetched %s failed", call["name"], exc_info=True)
+        return None
+
+
+async def atake(config: RunnableConfig, call: ToolCall) -> ToolMessage | None:
+    """Async version of ``take``."""
+    if (future := _take(config, call)) is None:
+        return None
+    try:
+        message = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(future)), PREFETCH_WAIT_SECONDS
+        )
+        return _answer(call, message)
+    except Exception:
+        logger.warning("Prefetched %s failed", call["name"], exc_info=True)
+        return None
+
+
+class PrefetchToolNode(ConcurrentToolNode):
+    """ConcurrentToolNode that answers read-only calls from the thread's prefetched searches.
+
+    Calls that weren't prefetched run as usual. A call to a tool that writes drops what is
+    left, since the searches may no longer reflect the database.
+    """
+
+    def _run_one(self, call: ToolCall, input_type: Any, config: RunnableConfig) -> Any:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is not None and not is_read_only(tool):
+            discard(config)
+        elif tool is not None and (message := take(config, call)):
+            return message
+        return super()._run_one(call, input_type, config)
+
+    async def _arun_one(self, call: ToolCall, input_type: Any, config: RunnableConfig) -> Any:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is not None and not is_read_only(tool):
+            discard(config)
+        elif tool is not None and (message := await atake(config, call)):
+            return message
+        return await super()._arun_one(call, input_type, config)
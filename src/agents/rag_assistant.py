@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import Literal
 
-from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, SystemMessage
 from langchain_core.runnables import (
     RunnableConfig,
@@ -14,12 +13,15 @@ from langgraph.managed import RemainingSteps
 from langgraph.prebuilt import ToolNode
 from langgraph.store.memory import InMemoryStore
 
+from agents.history import HistoryState, windowed_history
 from agents.llama_guard import LlamaGuard, LlamaGuardOutput, SafetyAssessment
 from agents.rag_tools import database_search
-from core import get_model, settings
+from core import get_bound_model, settings
+from core.response_cache import with_response_cache
+from schema.models import AllModelEnum
 
 
-class AgentState(MessagesState, total=False):
+class AgentState(MessagesState, HistoryState, total=False):
     """`total=False` is PEP589 specs.
 
     documentation: https://typing.readthedocs.io/en/latest/spec/typeddict.html#totality
@@ -49,8 +51,10 @@ instructions = f"""
     """
 
 
-def wrap_model(model: BaseChatModel) -> RunnableSerializable[AgentState, AIMessage]:
-    bound_model = model.bind_tools(tools)
+def wrap_model(model_name: AllModelEnum) -> RunnableSerializable[AgentState, AIMessage]:
+    bound_model = with_response_cache(
+        "rag-assistant", model_name, tools, get_bound_model(model_name, tools)
+    )
     preprocessor = RunnableLambda(
         lambda state: [SystemMessage(content=instructions)] + state["messages"],
         name="StateModifier",
@@ -66,17 +70,18 @@ def format_safety_message(safety: LlamaGuardOutput) -> AIMessage:
 
 
 async def acall_model(state: AgentState, config: RunnableConfig) -> AgentState:
-    m = get_model(config["configurable"].get("model", settings.DEFAULT_MODEL))
-    model_runnable = wrap_model(m)
-    response = await model_runnable.ainvoke(state, config)
+    model_runnable = wrap_model(config["configurable"].get("model", settings.DEFAULT_MODEL))
+    messages, history = windowed_history(state, config)
+    response = await model_runnable.ainvoke({**state, "messages": messages}, config)
 
     # Run llama guard check here to avoid returning the message if it's unsafe
     llama_guard = LlamaGuard()
-    safety_output = await llama_guard.ainvoke("Agent", state["messages"] + [response])
+    safety_output = await llama_guard.ainvoke("Agent", messages + [response])
     if safety_output.safety_assessment == SafetyAssessment.UNSAFE:
         return {
             "messages": [format_safety_message(safety_output)],
             "safety": safety_output,
+            **history,
         }
 
     if state["remaining_steps"] < 2 and response.tool_calls:
@@ -86,10 +91,11 @@ async def acall_model(state: AgentState, config: RunnableConfig) -> AgentState:
                     id=response.id,
                     content="Sorry, need more steps to process this request.",
                 )
-            ]
+            ],
+            **history,
         }
     # We return a list, because this will get added to the existing list
-    return {"messages": [response]}
+    return {"messages": [response], **history}
 
 
 async def llama_guard_input(state: AgentState, config: RunnableConfig) -> AgentState:
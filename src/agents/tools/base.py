@@ -0,0 +1,84 @@
+import functools
+from collections.abc import Callable
+from inspect import signature
+from typing import Any, overload
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+
+from agents.tools.db import run_in_db_thread
+
+# Tool metadata for tools that only read. The tool node may run calls to them concurrently.
+READ_ONLY = {"read_only": True}
+
+
+def is_read_only(tool: BaseTool) -> bool:
+    return bool((tool.metadata or {}).get("read_only"))
+
+
+class _ToolCallIdMixin(BaseTool):
+    """Pass the id of the calling ToolCall to tools that take a ``tool_call_id`` argument.
+
+    Declare it as ``Annotated[str | None, InjectedToolArg] = None`` so the model never
+    sees it; it stays None when the tool is invoked with plain arguments.
+    """
+
+    def _to_args_and_kwargs(self, tool_input: Any, tool_call_id: str | None) -> tuple:
+        args, kwargs = super()._to_args_and_kwargs(tool_input, tool_call_id)
+        target = getattr(self, "func", None) or self._run
+        if tool_call_id and "tool_call_id" in signature(target).parameters:
+            kwargs.setdefault("tool_call_id", tool_call_id)
+        return args, kwargs
+
+
+class TravelDBTool(_ToolCallIdMixin):
+    """Base class for tools that query the travel database.
+
+    Subclasses only implement ``_run``; see ``_ToolCallIdMixin`` for ``tool_call_id``. Async
+    calls run it on the travel database thread pool rather than LangChain's default executor,
+    so concurrent requests share a bounded set of connections instead of blocking the event
+    loop.
+    """
+
+    async def _arun(self, *args: Any, config: RunnableConfig, **kwargs: Any) -> Any:
+        kwargs.pop("run_manager", None)
+        if "config" in signature(self._run).parameters:
+            kwargs["config"] = config
+        return await run_in_db_thread(self._run, *args, **kwargs)
+
+
+class DBStructuredTool(_ToolCallIdMixin, StructuredTool):
+    """StructuredTool built by ``db_tool``."""
+
+
+@overload
+def db_tool(func: Callable, *, read_only: bool = False) -> StructuredTool: ...
+
+
+@overload
+def db_tool(
+    func: None = None, *, read_only: bool = False
+) -> Callable[[Callable], StructuredTool]: ...
+
+
+def db_tool(
+    func: Callable | None = None, *, read_only: bool = False
+) -> StructuredTool | Callable[[Callable], StructuredTool]:
+    """Like ``@tool``, but async calls run ``func`` on the travel database thread pool.
+
+    Use as ``@db_tool``, or ``@db_tool(read_only=True)`` for tools that never write.
+    """
+    if func is None:
+
+        def decorator(func: Callable) -> StructuredTool:
+            return db_tool(func, read_only=read_only)
+
+        return decorator
+
+    @functools.wraps(func)
+    async def coroutine(*args: Any, **kwargs: Any) -> Any:
+        return await run_in_db_thread(func, *args, **kwargs)
+
+    return DBStructuredTool.from_function(
+        func, coroutine=coroutine, metadata=dict(READ_ONLY) if read_only else None
+    )
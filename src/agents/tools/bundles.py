@@ -0,0 +1,359 @@
+import asyncio
+import heapq
+import itertools
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from inspect import signature
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+
+from agents.tools.base import READ_ONLY, TravelDBTool
+from agents.tools.connections import find_connections, get_schedule
+from agents.tools.db import get_executor, read_connection, run_in_db_thread
+from agents.tools.geo import resolve_place, search_nearby
+from agents.tools.inventory import normalize_fare, stay_days
+from agents.tools.search import SEARCH_LIMIT
+
+TOP_K = 3
+# Options kept per category before combining them, by score and by cost: the best bundles
+# almost always use options that are good on their own.
+CANDIDATES = 6
+HOTEL_RADIUS_KM = 30
+CAR_RADIUS_KM = 30
+MAX_LEGS = 2
+
+# The database has no hotel or car prices and only the fares passengers actually paid, so
+# costs are estimated from the price tier, or the fare class when a flight has no fares.
+FARE_ESTIMATES = {"Economy": 150, "Comfort": 300, "Business": 600}
+HOTEL_NIGHTLY_ESTIMATES = {
+    "Economy": 80,
+    "Midscale": 120,
+    "Upper Midscale": 160,
+    "Upscale": 220,
+    "Upper Upscale": 300,
+    "Luxury": 450,
+}
+CAR_DAILY_ESTIMATES = {
+    "Economy": 45,
+    "Midscale": 60,
+    "Upper Midscale": 75,
+    "Upscale": 100,
+    "Luxury": 150,
+}
+DEFAULT_NIGHTLY = 150
+DEFAULT_DAILY = 70
+
+# Score weights: a bundle's score is its estimated cost plus these per-hour, per-stop and
+# per-kilometre penalties, so a slightly dearer but much shorter trip can still win.
+COST_PER_TRAVEL_HOUR = 25
+COST_PER_STOP = 40
+COST_PER_KM = 2
+
+
+def _day(value: date | datetime | str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value).strip()).date()
+
+
+def flight_options(
+    origin: str, destination: str, day: date | datetime | str, fare_conditions: str | None
+) -> list[dict]:
+    """Direct and connecting itineraries leaving on ``day``, with an estimated fare.
+
+    The fare of each leg is the lowest paid for that flight and class, or the class
+    estimate when there is none. Itineraries with a sold-out leg are left out.
+    """
+    fare = normalize_fare(fare_conditions)
+    first = _day(day)
+    with read_connection() as conn:
+        itineraries = find_connections(
+            get_schedule(conn),
+            origin,
+            destination,
+            first.isoformat(),
+            (first + timedelta(days=1)).isoformat(),
+            max_legs=MAX_LEGS,
+            limit=SEARCH_LIMIT,
+        )
+        flight_ids = sorted({leg["flight_id"] for i in itineraries for leg in i["legs"]})
+        marks = ", ".join("?" * len(flight_ids))
+        fares = dict(
+            conn.execute(
+                f"SELECT flight_id, MIN(amount) FROM ticket_flights WHERE flight_id IN ({marks}) "
+                "AND fare_conditions = ? GROUP BY flight_id",
+                [*flight_ids, fare],
+            ).fetchall()
+        )
+        sold_out = {
+            row[0]
+            for row in conn.execute(
+                f"SELECT flight_id FROM flight_inventory WHERE flight_id IN ({marks}) "
+                "AND fare_conditions = ? AND booked >= capacity",
+                [*flight_ids, fare],
+            )
+        }
+    options = []
+    for itinerary in itineraries:
+        ids = [leg["flight_id"] for leg in itinerary["legs"]]
+        if sold_out.intersection(ids):
+            continue
+        cost = sum(fares.get(flight_id) or FARE_ESTIMATES.get(fare, 150) for flight_id in ids)
+        options.append({**itinerary, "fare_conditions": fare, "estimated_cost": round(cost, 2)})
+    return options
+
+
+def _nearby_available(
+    table: str,
+    inventory: str,
+    key: str,
+    day_column: str,
+    place: str,
+    days: list[str],
+    rates: dict[str, int],
+    default_rate: int,
+    radius_km: float,
+    price_tier: str | None,
+) -> list[dict]:
+    with read_connection() as conn:
+        if resolve_place(conn, place) is None:
+            return []
+        rows = search_nearby(
+            conn,
+            table,
+            place,
+            radius_km=radius_km,
+            filters={"price_tier": price_tier},
+            columns="t.id, t.name, t.location, t.price_tier",
+            limit=SEARCH_LIMIT,
+        )
+        full = {
+            row[0]
+            for row in conn.execute(
+                f"SELECT DISTINCT {key} FROM {inventory} WHERE {day_column} BETWEEN ? AND ? "
+                "AND booked >= capacity",
+                (days[0], days[-1]),
+            )
+        }
+    return [
+        {**row, "estimated_cost": rates.get(row["price_tier"], default_rate) * len(days)}
+        for row in rows
+        if row["id"] not in full
+    ]
+
+
+def hotel_options(
+    destination: str,
+    check_in: date | datetime | str,
+    check_out: date | datetime | str,
+    price_tier: str | None = None,
+) -> list[dict]:
+    """Hotels near ``destination`` with a room free every night, with an estimated cost."""
+    return _nearby_available(
+        "hotels",
+        "room_inventory",
+        "hotel_id",
+        "night",
+        destination,
+        stay_days(check_in, check_out),
+        HOTEL_NIGHTLY_ESTIMATES,
+        DEFAULT_NIGHTLY,
+        HOTEL_RADIUS_KM,
+        price_tier,
+    )
+
+
+def car_options(
+    destination: str, start: date | datetime | str, end: date | datetime | str
+) -> list[dict]:
+    """Car rentals near ``destination`` free on every day, with an estimated cost."""
+    return _nearby_available(
+        "car_rentals",
+        "car_inventory",
+        "rental_id",
+        "day",
+        destination,
+        stay_days(start, end),
+        CAR_DAILY_ESTIMATES,
+        DEFAULT_DAILY,
+        CAR_RADIUS_KM,
+        None,
+    )
+
+
+def _penalty(option: dict | None) -> float:
+    """Score of one option: its cost plus travel time, stop and distance penalties."""
+    if option is None:
+        return 0.0
+    score = option["estimated_cost"]
+    score += option.get("duration_minutes", 0) / 60 * COST_PER_TRAVEL_HOUR
+    score += option.get("stops", 0) * COST_PER_STOP
+    return score + (option.get("distance_km") or 0) * COST_PER_KM
+
+
+def _candidates(options: list[dict] | None) -> list[dict | None]:
+    if options is None:
+        return [None]
+    best = heapq.nsmallest(CANDIDATES, options, key=_penalty)
+    cheapest = heapq.nsmallest(CANDIDATES, options, key=lambda option: option["estimated_cost"])
+    candidates: list[dict | None] = [*best]
+    candidates.extend(option for option in cheapest if option not in best)
+    return candidates
+
+
+def _fits(outbound: dict | None, inbound: dict | None) -> bool:
+    if outbound is None or inbound is None:
+        return True
+    arrives = datetime.fromisoformat(outbound["scheduled_arrival"])
+    return datetime.fromisoformat(inbound["scheduled_departure"]) > arrives
+
+
+def best_bundles(
+    outbound: list[dict],
+    inbound: list[dict] | None,
+    hotels: list[dict] | None,
+    cars: list[dict] | None,
+    *,
+    budget: float | None = None,
+    top_k: int = TOP_K,
+) -> list[dict]:
+    """The ``top_k`` lowest-scoring combinations of one option from each category.
+
+    ``None`` for a category leaves it out of the bundles. The return flight must leave
+    after the outbound one lands, and bundles over ``budget`` only appear when nothing
+    fits it, marked ``within_budget: False``.
+    """
+    scored = []
+    pools = map(_candidates, [outbound, inbound, hotels, cars])
+    for combo in itertools.product(*pools):
+        if not _fits(combo[0], combo[1]):
+            continue
+        total = round(sum(option["estimated_cost"] for option in combo if option), 2)
+        scored.append((sum(map(_penalty, combo)), total, combo))
+
+    fitting = [entry for entry in scored if budget is None or entry[1] <= budget]
+    chosen = heapq.nsmallest(top_k, fitting or scored, key=lambda entry: entry[:2])
+    return [
+        {
+            "rank": rank,
+            "estimated_total": total,
+            "within_budget": budget is None or total <= budget,
+            "outbound": combo[0],
+            "return": combo[1],
+            "hotel": combo[2],
+            "car": combo[3],
+        }
+        for rank, (_, total, combo) in enumerate(chosen, start=1)
+    ]
+
+
+class PlanTrip(TravelDBTool):
+    name: str = "plan_trip"
+    metadata: dict | None = READ_ONLY
+    description: str = """Plan a whole trip in one call: flights, a hotel and optionally a car.
+
+    Searches outbound and return flights (including connections), hotels and car rentals
+    near the destination airport at the same time, and returns the best `top_k` bundles
+    (default 3) by estimated cost, travel time and distance from the airport. Bundles over
+    `budget` are only returned when nothing fits, marked within_budget: false. Hotel and car
+    costs are estimates by price tier. Nothing is booked; use the booking tools with the ids
+    from the chosen bundle.
+
+    Args:
+        origin (str): IATA code of the departure airport, e.g. "BSL".
+        destination (str): IATA code of the destination airport, e.g. "CDG".
+        departure_date (date): Day of the outbound flight, which is also the hotel check-in.
+        return_date (Optional[date]): Day of the return flight and hotel check-out. Omit for a
+            one-way trip with one hotel night.
+        budget (Optional[float]): Maximum estimated total for the bundle.
+        fare_conditions (Optional[str]): Economy, Comfort or Business. Defaults to Economy.
+        hotel_price_tier (Optional[str]): Only consider hotels of this price tier.
+        include_car (bool): Whether to include a rental car. Defaults to True.
+        top_k (int): Number of bundles to return, at most 10. Defaults to 3.
+    """
+
+    def _searches(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date | datetime,
+        return_date: date | datetime | None,
+        fare_conditions: str | None,
+        hotel_price_tier: str | None,
+        include_car: bool,
+    ) -> dict[str, tuple[Callable[..., list[dict]], tuple]]:
+        print(
+            f"Executing plan_trip with origin={origin}, destination={destination}, "
+            f"departure_date={departure_date}, return_date={return_date}"
+        )
+        check_out = return_date or _day(departure_date) + timedelta(days=1)
+        searches: dict[str, tuple[Callable[..., list[dict]], tuple]] = {
+            "outbound": (flight_options, (origin, destination, departure_date, fare_conditions)),
+            "hotels": (hotel_options, (destination, departure_date, check_out, hotel_price_tier)),
+        }
+        if return_date:
+            searches["return"] = (
+                flight_options,
+                (destination, origin, return_date, fare_conditions),
+            )
+        if include_car:
+            searches["cars"] = (car_options, (destination, departure_date, check_out))
+        return searches
+
+    def _plan(self, results: dict[str, list[dict]], budget: float | None, top_k: int) -> dict:
+        bundles = []
+        # A round trip needs both directions; hotels and cars are left out if none are found.
+        if results["outbound"] and ("return" not in results or results["return"]):
+            bundles = best_bundles(
+                results["outbound"],
+                results.get("return"),
+                results["hotels"] or None,
+                results.get("cars") or None,
+                budget=budget,
+                top_k=max(1, min(top_k, 10)),
+            )
+        return {
+            "bundles": bundles,
+            "options_found": {name: len(options) for name, options in results.items()},
+        }
+
+    def _run(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date | datetime,
+        return_date: date | datetime | None = None,
+        budget: float | None = None,
+        fare_conditions: str | None = None,
+        hotel_price_tier: str | None = None,
+        include_car: bool = True,
+        top_k: int = TOP_K,
+    ) -> dict:
+        searches = self._searches(
+            origin,
+            destination,
+            departure_date,
+            return_date,
+            fare_conditions,
+            hotel_price_tier,
+            include_car,
+        )
+        futures = {name: get_executor().submit(fn, *args) for name, (fn, args) in searches.items()}
+        return self._plan(
+            {name: future.result() for name, future in futures.items()}, budget, top_k
+        )
+
+    async def _arun(self, *args: Any, config: RunnableConfig, **kwargs: Any) -> dict:
+        kwargs.pop("run_manager", None)
+        arguments = signature(self._run).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        options = arguments.arguments
+        budget, top_k = options.pop("budget"), options.pop("top_k")
+        searches = self._searches(**options)
+        results = await asyncio.gather(
+            *(run_in_db_thread(fn, *args) for fn, args in searches.values())
+        )
+        return self._plan(dict(zip(searches, results)), budget, top_k)
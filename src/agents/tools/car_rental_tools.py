@@ -1,22 +1,26 @@
-import os
 import sqlite3
 import warnings
 from datetime import date
+from typing import Annotated
 
 from dotenv import load_dotenv
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import BaseTool
+from langchain_core.tools import InjectedToolArg
+
+from agents.tools.base import READ_ONLY, TravelDBTool
+from agents.tools.db import read_connection, write_connection
+from agents.tools.geo import search_nearby
+from agents.tools.idempotency import run_once
+from agents.tools.inventory import hold_car, parse_id, release_holds
+from agents.tools.search import build_search_query, fts_column, fts_match
 
 load_dotenv()
 warnings.filterwarnings("ignore")
 
 
-db_dir = os.path.join(os.getcwd(), "agents", "db")
-db = os.path.join(db_dir, "travel.sqlite")
-
-
-class SearchCarRental(BaseTool):
+class SearchCarRental(TravelDBTool):
     name: str = "search_car_rental"
+    metadata: dict | None = READ_ONLY
     description: str = """
     Search for car rentals based on location, name, price tier, start date, and end date.
 
@@ -24,11 +28,15 @@ class SearchCarRental(BaseTool):
         location (Optional[str]): The location of the car rental. Defaults to None.
         name (Optional[str]): The name of the car rental company. Defaults to None.
         price_tier (Optional[str]): The price tier of the car rental. Defaults to None.
+        near (Optional[str]): An airport code (e.g. "ZRH") or city to search around. Results are then ordered by distance and include distance_km. Defaults to None.
+        radius_km (Optional[float]): With `near`, only return car rentals within this many kilometres. Without it the nearest car rentals are returned. Defaults to None.
         start_date (Optional[Union[datetime, date]]): The start date of the car rental. Defaults to None.
         end_date (Optional[Union[datetime, date]]): The end date of the car rental. Defaults to None.
+        limit (Optional[int]): The maximum number of car rentals to return, at most 20. Defaults to 10.
+        offset (Optional[int]): The number of car rentals to skip, for fetching the next page. Defaults to 0.
 
     Returns:
-        list[dict]: A list of car rental dictionaries matching the search criteria.
+        list[dict]: A list of car rental dictionaries matching the search criteria, best matches first.
     """
 
     def _run(
@@ -38,32 +46,51 @@ class SearchCarRental(BaseTool):
         price_tier: str | None = None,
         # start_date: date | datetime | None = None,
         # end_date: date | datetime | None = None,
+        near: str | None = None,
+        radius_km: float | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
     ) -> list[dict]:
-        print(f"Executing search_hotel with location={location}, price_tier={price_tier}")
-
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-
-        # query = "SELECT  FROM car_rentals WHERE 1=1"
-        query = "SELECT id, name, location, price_tier, booked FROM car_rentals WHERE 1=1"
-        params = []
-
-        if location:
-            query += " AND location LIKE ?"
-            params.append(f"%{location}%")
-        if name:
-            query += " AND name LIKE ?"
-            params.append(f"%{name}%")
+        print(
+            f"Executing search_car_rental with location={location}, price_tier={price_tier}, "
+            f"near={near}, radius_km={radius_km}"
+        )
 
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+        match = fts_match(fts_column("location", location), fts_column("name", name))
+        filters = {"price_tier": price_tier}
+        columns = "t.id, t.name, t.location, t.price_tier, t.booked"
+        if near:
+            with read_connection() as conn:
+                return search_nearby(
+                    conn,
+                    "car_rentals",
+                    near,
+                    radius_km=radius_km,
+                    match=match,
+                    filters=filters,
+                    columns=columns,
+                    limit=limit,
+                    offset=offset,
+                )
+
+        query, params = build_search_query(
+            "car_rentals",
+            match=match,
+            filters=filters,
+            columns=columns,
+            limit=limit,
+            offset=offset,
+        )
 
-        conn.close()
+        with read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            results = cursor.fetchall()
 
         return [dict(zip([column[0] for column in cursor.description], row)) for row in results]
 
 
-class BookCarRental(BaseTool):
+class BookCarRental(TravelDBTool):
     name: str = "book_car_rental"
     description: str = """
     Book a car rental by its ID.
@@ -81,6 +108,7 @@ class BookCarRental(BaseTool):
         rental_id: str,
         start_date: date,
         end_date: date,
+        tool_call_id: Annotated[str | None, InjectedToolArg] = None,
     ) -> str:
         print(
             f"Executing book_car_rental with rental_id={rental_id} with start_date={start_date} and end_date={end_date}"
@@ -89,23 +117,28 @@ class BookCarRental(BaseTool):
         passenger_id = configuration.get("passenger_id", None)
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
+        rental = parse_id(rental_id, "rental")
+
+        def book(conn: sqlite3.Connection) -> str:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT 1 FROM car_rentals WHERE id = ?", (rental_id,))
+            if not cursor.fetchone():
+                return f"No car rental found with ID {rental_id}."
+            hold_car(conn, rental, start_date, end_date, passenger_id=passenger_id, ttl=None)
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
+            query = "INSERT INTO car_rental_bookings (rental_id, start_date, end_date, passenger_id) VALUES (?,?,?,?)"
+            cursor.execute(query, (rental_id, start_date, end_date, passenger_id))
 
-        query = "INSERT INTO car_rental_bookings (rental_id, start_date, end_date, passenger_id) VALUES (?,?,?,?)"
-        cursor.execute(query, (rental_id, start_date, end_date, passenger_id))
-        conn.commit()
+            if cursor.rowcount > 0:
+                return f"Car rental {rental_id} successfully booked."
+            else:
+                return f"No car rental found with ID {rental_id}."
 
-        if cursor.rowcount > 0:
-            conn.close()
-            return f"Car rental {rental_id} successfully booked."
-        else:
-            conn.close()
-            return f"No car rental found with ID {rental_id}."
+        return run_once(self.name, tool_call_id, book)
 
 
-class UpdateCarRental(BaseTool):
+class UpdateCarRental(TravelDBTool):
     name: str = "update_car_rental"
     description: str = """
     Update a car rental's start and end dates by its ID.
@@ -130,31 +163,27 @@ class UpdateCarRental(BaseTool):
             f"Executing book_car_rental with rental_id={rental_id}, start_date={start_date}, end_date={end_date}"
         )
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
+        with write_connection() as conn:
+            cursor = conn.cursor()
 
-        if start_date:
-            cursor.execute(
-                "UPDATE car_rentals SET start_date = ? WHERE id = ?",
-                (start_date, rental_id),
-            )
-        if end_date:
-            cursor.execute(
-                "UPDATE car_rentals SET end_date = ? WHERE id = ?",
-                (end_date, rental_id),
-            )
-
-        conn.commit()
+            if start_date:
+                cursor.execute(
+                    "UPDATE car_rentals SET start_date = ? WHERE id = ?",
+                    (start_date, rental_id),
+                )
+            if end_date:
+                cursor.execute(
+                    "UPDATE car_rentals SET end_date = ? WHERE id = ?",
+                    (end_date, rental_id),
+                )
 
-        if cursor.rowcount > 0:
-            conn.close()
-            return f"Car rental {rental_id} successfully updated."
-        else:
-            conn.close()
-            return f"No car rental found with ID {rental_id}."
+            if cursor.rowcount > 0:
+                return f"Car rental {rental_id} successfully updated."
+            else:
+                return f"No car rental found with ID {rental_id}."
 
 
-class CancelCarRental(BaseTool):
+class CancelCarRental(TravelDBTool):
     name: str = "cancel_car_rental"
     description: str = """
     Cancel a car rental by its ID.
@@ -173,16 +202,23 @@ class CancelCarRental(BaseTool):
     ) -> str:
         print(f"Executing cancel_car_rental with rental_id={rental_id}")
 
-        conn = sqlite3.connect(db)
+        configuration = config.get("configurable", {})
+        passenger_id = configuration.get("passenger_id", None)
+        if not passenger_id:
+            raise ValueError("No passenger ID configured.")
+        rental = parse_id(rental_id, "rental")
 
-        cursor = conn.cursor()
+        with write_connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("UPDATE car_rentals SET booked = 0 WHERE id = ?", (rental_id,))
-        conn.commit()
+            cursor.execute(
+                "DELETE FROM car_rental_bookings WHERE rental_id = ? AND passenger_id = ?",
+                (rental_id, passenger_id),
+            )
+            release_holds(conn, "car", rental, passenger_id)
+            cursor.execute("UPDATE car_rentals SET booked = 0 WHERE id = ?", (rental_id,))
 
-        if cursor.rowcount > 0:
-            conn.close()
-            return f"Car rental {rental_id} successfully cancelled."
-        else:
-            conn.close()
-            return f"No car rental found with ID {rental_id}."
+            if cursor.rowcount > 0:
+                return f"Car rental {rental_id} successfully cancelled."
+            else:
+                return f"No car rental found with ID {rental_id}."
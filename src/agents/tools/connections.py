@@ -0,0 +1,181 @@
+import heapq
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import NamedTuple, TypedDict
+
+MIN_CONNECTION_MINUTES = 45
+MAX_LAYOVER_HOURS = 24
+MAX_LEGS = 3
+# Upper bound on legs whatever the caller asks for, to keep the search small.
+LEG_CAP = 4
+# How long a loaded schedule is trusted before the flights table is checked for changes.
+SCHEDULE_TTL_SECONDS = 600
+
+
+class Leg(NamedTuple):
+    departs: float
+    arrives: float
+    flight_id: int
+    flight_no: str
+    departure_airport: str
+    arrival_airport: str
+    scheduled_departure: str
+    scheduled_arrival: str
+
+
+class Connection(TypedDict):
+    legs: list[dict]
+    stops: int
+    scheduled_departure: str
+    scheduled_arrival: str
+    duration_minutes: int
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+class FlightSchedule:
+    """Departures grouped by airport and sorted by time, for connection search.
+
+    ``departures[airport]`` lists that airport's flights in departure order, and
+    ``times[airport]`` their departure times, so the flights leaving after a given
+    moment are found by bisection instead of a query per hop.
+    """
+
+    def __init__(self, legs: list[Leg], fingerprint: tuple = ()) -> None:
+        self.fingerprint = fingerprint
+        self.loaded_at = time.monotonic()
+        self.departures: dict[str, list[Leg]] = {}
+        for leg in sorted(legs):
+            self.departures.setdefault(leg.departure_airport, []).append(leg)
+        self.times = {
+            airport: [leg.departs for leg in legs] for airport, legs in self.departures.items()
+        }
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "FlightSchedule":
+        rows = conn.execute(
+            "SELECT flight_id, flight_no, departure_airport, arrival_airport, "
+            "scheduled_departure, scheduled_arrival FROM flights "
+            "WHERE status IS NULL OR status != 'Cancelled'"
+        ).fetchall()
+        legs = [
+            Leg(_timestamp(dep), _timestamp(arr), flight_id, flight_no, origin, dest, dep, arr)
+            for flight_id, flight_no, origin, dest, dep, arr in rows
+            if dep and arr
+        ]
+        return cls(legs, schedule_fingerprint(conn))
+
+    def leaving(self, airport: str, after: float, before: float) -> list[Leg]:
+        """Flights leaving ``airport`` at or after ``after`` and before ``before``."""
+        times = self.times.get(airport)
+        if not times:
+            return []
+        start = bisect_left(times, after)
+        end = bisect_left(times, before, lo=start)
+        return self.departures[airport][start:end]
+
+
+def schedule_fingerprint(conn: sqlite3.Connection) -> tuple:
+    return conn.execute(
+        "SELECT COUNT(*), MAX(flight_id), MAX(scheduled_departure) FROM flights"
+    ).fetchone()
+
+
+_schedules: dict[str, FlightSchedule] = {}
+_schedules_lock = threading.Lock()
+
+
+def get_schedule(conn: sqlite3.Connection) -> FlightSchedule:
+    """Return the cached schedule for ``conn``'s database, reloading it if flights changed.
+
+    The flights table is only checked for changes once the cached copy is older than
+    ``SCHEDULE_TTL_SECONDS``.
+    """
+    key = conn.execute("PRAGMA database_list").fetchone()[2]
+    with _schedules_lock:
+        schedule = _schedules.get(key)
+        if schedule is not None and time.monotonic() - schedule.loaded_at < SCHEDULE_TTL_SECONDS:
+            return schedule
+        if schedule is None or schedule.fingerprint != schedule_fingerprint(conn):
+            schedule = FlightSchedule.load(conn)
+        else:
+            schedule.loaded_at = time.monotonic()
+        _schedules[key] = schedule
+        return schedule
+
+
+def _as_connection(legs: tuple[Leg, ...]) -> Connection:
+    return {
+        "legs": [
+            {
+                "flight_id": leg.flight_id,
+                "flight_no": leg.flight_no,
+                "departure_airport": leg.departure_airport,
+                "arrival_airport": leg.arrival_airport,
+                "scheduled_departure": leg.scheduled_departure,
+                "scheduled_arrival": leg.scheduled_arrival,
+            }
+            for leg in legs
+        ],
+        "stops": len(legs) - 1,
+        "scheduled_departure": legs[0].scheduled_departure,
+        "scheduled_arrival": legs[-1].scheduled_arrival,
+        "duration_minutes": round((legs[-1].arrives - legs[0].departs) / 60),
+    }
+
+
+def find_connections(
+    schedule: FlightSchedule,
+    departure_airport: str,
+    arrival_airport: str,
+    window_start: str,
+    window_end: str,
+    *,
+    max_legs: int = MAX_LEGS,
+    min_connection_minutes: int = MIN_CONNECTION_MINUTES,
+    max_layover_hours: float = MAX_LAYOVER_HOURS,
+    limit: int = 5,
+) -> list[Connection]:
+    """Earliest-arrival itineraries from one airport to another.
+
+    The first leg must depart in ``[window_start, window_end)``, compared as ISO strings
+    the way the flights table stores them. Each connection leaves at least
+    ``min_connection_minutes`` and at most ``max_layover_hours`` after the previous leg
+    lands, and no airport is visited twice. Itineraries are found in order of arrival
+    time, ties going to fewer legs, and every airport is expanded at most ``limit``
+    times, which bounds the search on a dense schedule.
+    """
+    max_legs = max(1, min(max_legs, LEG_CAP))
+    min_connection = min_connection_minutes * 60
+    max_layover = max_layover_hours * 3600
+
+    # Ordered by arrival, then number of legs, then latest first departure (the shortest
+    # trip among those arriving together).
+    queue: list[tuple[float, int, float, tuple[Leg, ...]]] = []
+    for leg in schedule.departures.get(departure_airport, []):
+        if window_start <= leg.scheduled_departure < window_end:
+            queue.append((leg.arrives, 1, -leg.departs, (leg,)))
+    heapq.heapify(queue)
+
+    results: list[Connection] = []
+    expanded: dict[str, int] = {}
+    while queue and len(results) < limit:
+        arrives, legs_used, _, path = heapq.heappop(queue)
+        airport = path[-1].arrival_airport
+        if airport == arrival_airport:
+            results.append(_as_connection(path))
+            continue
+        if legs_used == max_legs or expanded.get(airport, 0) >= limit:
+            continue
+        expanded[airport] = expanded.get(airport, 0) + 1
+        visited = {departure_airport, *(leg.arrival_airport for leg in path)}
+        for leg in schedule.leaving(airport, arrives + min_connection, arrives + max_layover):
+            if leg.arrival_airport in visited:
+                continue
+            heapq.heappush(queue, (leg.arrives, legs_used + 1, -path[0].departs, path + (leg,)))
+    return results
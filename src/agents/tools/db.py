@@ -0,0 +1,178 @@
+import sqlite3
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import ParamSpec, TypeVar
+
+from langchain_core.runnables.config import run_in_executor
+
+from agents.tools.geo import register_functions
+from agents.tools.migrations import apply_migrations
+from core import settings
+
+# 256 MiB of the database file is memory-mapped; SQLite clamps this to the file size.
+MMAP_SIZE = 256 * 1024 * 1024
+BUSY_TIMEOUT_MS = 5000
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class TravelDBPool:
+    """Pool of SQLite connections to the travel database.
+
+    Every thread gets its own long-lived read connection, and all writes go through a
+    single shared connection guarded by a lock, so tools never pay for opening the file
+    and parsing the schema on each call. Pragmas are applied once when a connection is
+    created.
+
+    Both arguments are SQLite ``file:`` URIs; readers use ``read_only_uri`` when given.
+    """
+
+    def __init__(
+        self, uri: str, read_only_uri: str | None = None, mmap_size: int = MMAP_SIZE
+    ) -> None:
+        self.uri = uri
+        self.read_only_uri = read_only_uri or uri
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._writer: sqlite3.Connection | None = None
+        self._writer_lock = threading.RLock()
+
+    def _configure(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        register_functions(conn)
+        return conn
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        # The connection never leaves its thread; the flag only lets close() run anywhere.
+        conn = sqlite3.connect(self.read_only_uri, uri=True, check_same_thread=False)
+        return self._configure(conn)
+
+    def _connect_writer(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        # WAL is persistent in the database file, so it only has to be set by the writer.
+        conn.execute("PRAGMA journal_mode = WAL")
+        self._configure(conn)
+        apply_migrations(conn)
+        return conn
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow the calling thread's read connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Make sure the writer has switched the file to WAL and applied migrations
+            # before the first reader opens.
+            self._get_writer()
+            conn = self._connect_reader()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        yield conn
+
+    def _get_writer(self) -> sqlite3.Connection:
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect_writer()
+            return self._writer
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Borrow the serialized writer connection.
+
+        The block runs in a ``BEGIN IMMEDIATE`` transaction, so it holds the database
+        write lock from its first read and a read-then-write can't interleave with
+        another process. The transaction is committed when the block exits cleanly and
+        rolled back if it raises.
+        """
+        with self._writer_lock:
+            conn = self._get_writer()
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close(self) -> None:
+        """Close every connection opened by the pool."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_pool: TravelDBPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> TravelDBPool:
+    """Return the process-wide travel database pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                path = settings.travel_db_path()
+                if not path.exists():
+                    raise FileNotFoundError(
+                        f"Travel database not found at {path}. "
+                        "Run `python src/download_db.py` or set TRAVEL_DB_PATH."
+                    )
+                _pool = TravelDBPool(
+                    settings.travel_db_uri(), settings.travel_db_uri(read_only=True)
+                )
+    return _pool
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool that runs travel database work for async callers."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.TRAVEL_DB_WORKERS, thread_name_prefix="travel-db"
+                )
+    return _executor
+
+
+async def run_in_db_thread(func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Run blocking database code on the travel database thread pool.
+
+    The event loop stays free while the query runs, and since every worker keeps its
+    read connection open, at most ``TRAVEL_DB_WORKERS`` connections are ever in use.
+    """
+    return await run_in_executor(get_executor(), func, *args, **kwargs)
+
+
+def read_connection():
+    """Shortcut for ``get_pool().read()``."""
+    return get_pool().read()
+
+
+def write_connection():
+    """Shortcut for ``get_pool().write()``."""
+    return get_pool().write()
+
+
+def rows_to_dicts(cursor: sqlite3.Cursor, rows: list[tuple]) -> list[dict]:
+    column_names = [column[0] for column in cursor.description]
+    return [dict(zip(column_names, row)) for row in rows]
@@ -0,0 +1,125 @@
+import json
+import re
+import textwrap
+from typing import Any
+
+from langchain_core.messages import ToolMessage
+
+# "2024-05-01 07:30:00.000000+03:00" and "2024-05-01T07:30:00Z" style timestamps.
+ISO_TIMESTAMP = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2})(?::(\d{2})(?:\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$"
+)
+SEPARATOR = "|"
+
+
+def shorten_timestamp(value: str) -> str:
+    """``value`` without the "T", fractional seconds and zero seconds if it is a timestamp."""
+    match = ISO_TIMESTAMP.match(value)
+    if match is None:
+        return value
+    day, minutes, seconds, offset = match.groups()
+    if seconds and seconds != "00":
+        minutes = f"{minutes}:{seconds}"
+    return f"{day} {minutes}{offset or ''}"
+
+
+def _shortened(value: Any) -> Any:
+    """``value`` with timestamps shortened and empty fields dropped, at any depth."""
+    if isinstance(value, str):
+        return shorten_timestamp(value)
+    if isinstance(value, dict):
+        return {k: _shortened(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list | tuple):
+        return [_shortened(item) for item in value]
+    return value
+
+
+def _json(value: Any) -> str:
+    return json.dumps(_shortened(value), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, dict | list | tuple):
+        return _json(value)
+    text = shorten_timestamp(value) if isinstance(value, str) else str(value)
+    return _json(text) if SEPARATOR in text or "\n" in text else text
+
+
+def _indent(text: str) -> str:
+    return textwrap.indent(text, "  ", lambda line: True)
+
+
+def encode_rows(rows: list[dict], max_rows: int = 0) -> str:
+    """A header line of column names and one ``|``-separated line per row.
+
+    Columns that are empty in every row are left out, and columns with the same value in
+    every row are written once above the header instead. At most ``max_rows`` rows are
+    written (0 for all of them), followed by a note of how many more there are.
+    """
+    if not rows:
+        return "(no results)"
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    values = {column: [row.get(column) for row in rows] for column in columns}
+    columns = [column for column in columns if any(v is not None for v in values[column])]
+    constant = []
+    if len(rows) > 1:
+        constant = [c for c in columns if all(v == values[c][0] for v in values[c])]
+        columns = [c for c in columns if c not in constant]
+
+    lines = []
+    if constant:
+        lines.append("all rows: " + "; ".join(f"{c}={_cell(values[c][0])}" for c in constant))
+    if columns:
+        lines.append(SEPARATOR.join(columns))
+        shown = rows[:max_rows] if max_rows else rows
+        lines.extend(SEPARATOR.join(_cell(row.get(c)) for c in columns) for row in shown)
+    if max_rows and len(rows) > max_rows:
+        lines.append(f"... {len(rows) - max_rows} more available")
+    return "\n".join(lines)
+
+
+def encode(value: Any, max_rows: int = 0) -> str:
+    """A compact text rendering of a tool's output for the model.
+
+    Lists of records become tables (see ``encode_rows``), dicts become ``key: value`` lines
+    with nested values indented on the lines below their key, and timestamps are shortened.
+    Plain strings are returned as they are.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list | tuple):
+        if all(isinstance(item, dict) for item in value):
+            return encode_rows(list(value), max_rows)
+        if any(isinstance(item, dict | list | tuple) for item in value):
+            return "\n".join("- " + _indent(encode(item, max_rows))[2:] for item in value)
+        return ", ".join(_cell(item) for item in value) if value else "(no results)"
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if item is None:
+                continue
+            if isinstance(item, dict | list | tuple) and item:
+                lines.append(f"{key}:\n{_indent(encode(item, max_rows))}")
+            else:
+                lines.append(f"{key}: {_cell(item) if item or item == 0 else '(none)'}")
+        return "\n".join(lines)
+    return _cell(value)
+
+
+def encode_tool_message(message: ToolMessage, max_rows: int = 0) -> ToolMessage:
+    """``message`` with its JSON content re-encoded by ``encode``.
+
+    Tool outputs that aren't strings reach the ToolMessage as JSON; any other content is
+    left alone.
+    """
+    if message.status == "error" or not isinstance(message.content, str):
+        return message
+    try:
+        value = json.loads(message.content)
+    except ValueError:
+        return message
+    if isinstance(value, str):
+        return message
+    return message.model_copy(update={"content": encode(value, max_rows)})
@@ -1,7 +1,24 @@
 # Tool Error Handling
-from langchain_core.messages import ToolMessage
-from langchain_core.runnables import RunnableLambda
+import asyncio
+from typing import Any, Literal
+
+from langchain_core.messages import ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import get_config_list, get_executor_for_config
+from langgraph.errors import GraphBubbleUp
 from langgraph.prebuilt import ToolNode
+from langgraph.store.base import BaseStore
+
+from agents.tools.base import is_read_only
+from agents.tools.encoding import encode_tool_message
+from core import settings
+
+# Most read-only tool calls from one assistant turn that run at the same time.
+MAX_TOOL_CONCURRENCY = 4
+
+
+def format_tool_error(error: Exception) -> str:
+    return f"Error: {repr(error)}\n please fix your mistakes."
 
 
 def handle_tool_error(state) -> dict:
@@ -10,7 +27,7 @@ def handle_tool_error(state) -> dict:
     return {
         "messages": [
             ToolMessage(
-                content=f"Error: {repr(error)}\n please fix your mistakes.",
+                content=format_tool_error(error),
                 tool_call_id=tc["id"],
             )
             for tc in tool_calls
@@ -18,8 +35,116 @@ def handle_tool_error(state) -> dict:
     }
 
 
-def create_tool_node_with_fallback(tools: list) -> dict:
-    return ToolNode(tools).with_fallbacks(
+class ConcurrentToolNode(ToolNode):
+    """ToolNode that runs independent read-only calls concurrently.
+
+    Calls are taken in the order the model emitted them. Consecutive calls to read-only
+    tools (see ``is_read_only``) run together, at most ``max_concurrency`` at a time, and
+    every other call runs on its own, so writes keep their order. A failing call becomes
+    an error ToolMessage for that call only; the other results are kept. With
+    TOOL_OUTPUT_COMPACT, structured outputs are re-encoded by ``encode_tool_message``.
+    """
+
+    def __init__(self, tools: list, *, max_concurrency: int = MAX_TOOL_CONCURRENCY, **kwargs):
+        kwargs.setdefault("handle_tool_errors", format_tool_error)
+        super().__init__(tools, **kwargs)
+        self.max_concurrency = max_concurrency
+
+    def _batches(self, tool_calls: list[ToolCall]) -> list[list[int]]:
+        batches: list[list[int]] = []
+        reads: list[int] = []
+        for index, call in enumerate(tool_calls):
+            tool = self.tools_by_name.get(call["name"])
+            # Unknown tools only produce an error message, so they can't conflict.
+            if tool is None or is_read_only(tool):
+                reads.append(index)
+                continue
+            if reads:
+                batches.append(reads)
+                reads = []
+            batches.append([index])
+        if reads:
+            batches.append(reads)
+        return batches
+
+    def _error_message(self, call: ToolCall, error: Exception) -> ToolMessage:
+        return ToolMessage(
+            content=format_tool_error(error),
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    def _encoded(self, output: Any) -> Any:
+        if not settings.TOOL_OUTPUT_COMPACT or not isinstance(output, ToolMessage):
+            return output
+        return encode_tool_message(output, settings.TOOL_OUTPUT_MAX_ROWS)
+
+    def _run_isolated(
+        self,
+        call: ToolCall,
+        input_type: Literal["list", "dict", "tool_calls"],
+        config: RunnableConfig,
+    ) -> Any:
+        try:
+            return self._encoded(self._run_one(call, input_type, config))
+        except GraphBubbleUp:
+            raise
+        except Exception as e:
+            return self._error_message(call, e)
+
+    async def _arun_isolated(
+        self,
+        call: ToolCall,
+        input_type: Literal["list", "dict", "tool_calls"],
+        config: RunnableConfig,
+        semaphore: asyncio.Semaphore,
+    ) -> Any:
+        async with semaphore:
+            try:
+                return self._encoded(await self._arun_one(call, input_type, config))
+            except GraphBubbleUp:
+                raise
+            except Exception as e:
+                return self._error_message(call, e)
+
+    def _func(self, input: Any, config: RunnableConfig, *, store: BaseStore | None) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        config_list = get_config_list(config, len(tool_calls))
+        outputs: list = [None] * len(tool_calls)
+        with get_executor_for_config({**config, "max_concurrency": self.max_concurrency}) as ex:
+            for batch in self._batches(tool_calls):
+                results = ex.map(
+                    self._run_isolated,
+                    [tool_calls[i] for i in batch],
+                    [input_type] * len(batch),
+                    [config_list[i] for i in batch],
+                )
+                for index, result in zip(batch, results):
+                    outputs[index] = result
+        return self._combine_tool_outputs(outputs, input_type)
+
+    async def _afunc(self, input: Any, config: RunnableConfig, *, store: BaseStore | None) -> Any:
+        tool_calls, input_type = self._parse_input(input, store)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outputs: list = [None] * len(tool_calls)
+        for batch in self._batches(tool_calls):
+            results = await asyncio.gather(
+                *(self._arun_isolated(tool_calls[i], input_type, config, semaphore) for i in batch)
+            )
+            for index, result in zip(batch, results):
+                outputs[index] = result
+        return self._combine_tool_outputs(outputs, input_type)
+
+
+def create_tool_node_with_fallback(
+    tools: list,
+    max_concurrency: int = MAX_TOOL_CONCURRENCY,
+    node_class: type[ConcurrentToolNode] = ConcurrentToolNode,
+) -> dict:
+    # Errors are handled per call inside the node; the fallback only covers failures of
+    # the node itself, such as malformed input.
+    return node_class(tools, max_concurrency=max_concurrency).with_fallbacks(
         [RunnableLambda(handle_tool_error)], exception_key="error"
     )
 
@@ -1,22 +1,108 @@
-import os
 import sqlite3
-import uuid
 import warnings
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from typing import Annotated
 
 import pytz
 from dotenv import load_dotenv
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import BaseTool, tool
+from langchain_core.tools import InjectedToolArg
+
+from agents.tools.base import READ_ONLY, TravelDBTool, db_tool
+from agents.tools.connections import (
+    MAX_LEGS,
+    MIN_CONNECTION_MINUTES,
+    Connection,
+    find_connections,
+    get_schedule,
+)
+from agents.tools.db import read_connection, rows_to_dicts, write_connection
+from agents.tools.idempotency import new_booking_id, run_once
+from agents.tools.inventory import hold_seats, parse_id, release_booking
+from agents.tools.itinerary import Itinerary, fetch_itinerary
+from agents.tools.migrations import FARE_CLASSES
+from agents.tools.search import PAGE_SIZE, page
 
 load_dotenv()
 warnings.filterwarnings("ignore")
 
-db_dir = os.path.join(os.getcwd(), "src", "agents", "db")
-db = os.path.join(db_dir, "travel.sqlite")
 
+def _as_date(value: date | datetime | str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value).strip()).date()
 
-@tool
+
+def day_bounds(value: date | datetime | str) -> tuple[str, str]:
+    """Half-open ``[start, end)`` timestamp bounds covering the calendar day of ``value``.
+
+    scheduled_departure is stored as an ISO-8601 string, so comparing it against these
+    bounds is index-friendly, unlike wrapping the column in ``DATE()``.
+    """
+    day = _as_date(value)
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
+def build_flight_search_query(
+    departure_airport: str | None = None,
+    arrival_airport: str | None = None,
+    start_time: date | datetime | str | None = None,
+    end_time: date | datetime | str | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
+) -> tuple[str, list]:
+    query = "SELECT * FROM flights WHERE 1 = 1"
+    params: list = []
+    if departure_airport:
+        query += " AND departure_airport = ?"
+        params.append(departure_airport)
+
+    if arrival_airport:
+        query += " AND arrival_airport = ?"
+        params.append(arrival_airport)
+
+    if start_time:
+        query += " AND scheduled_departure >= ?"
+        params.append(day_bounds(start_time)[0])
+
+    if end_time:
+        query += " AND scheduled_departure < ?"
+        params.append(day_bounds(end_time)[1])
+    query += " ORDER BY scheduled_departure, flight_id LIMIT ? OFFSET ?"
+    params += page(limit, offset)
+    return query, params
+
+
+# Default and maximum number of days one fare calendar lookup covers.
+CALENDAR_DAYS = 31
+CALENDAR_MAX_DAYS = 62
+
+
+def build_calendar_query(
+    departure_airport: str,
+    arrival_airport: str,
+    start_date: date | datetime | str,
+    end_date: date | datetime | str | None = None,
+) -> tuple[str, list]:
+    """Query for a route's ``flight_calendar`` rows from ``start_date`` through ``end_date``.
+
+    The range covers ``CALENDAR_DAYS`` days when ``end_date`` is omitted and is cut to
+    ``CALENDAR_MAX_DAYS``. It is a single range scan of the calendar's primary key.
+    """
+    first = _as_date(start_date)
+    last = _as_date(end_date) if end_date else first + timedelta(days=CALENDAR_DAYS - 1)
+    last = min(last, first + timedelta(days=CALENDAR_MAX_DAYS - 1))
+    fares = ", ".join(f"min_fare_{fare.lower()}" for fare in FARE_CLASSES)
+    query = (
+        f"SELECT day, flights, first_departure, last_departure, {fares} FROM flight_calendar "
+        "WHERE departure_airport = ? AND arrival_airport = ? AND day BETWEEN ? AND ? ORDER BY day"
+    )
+    return query, [departure_airport, arrival_airport, first.isoformat(), last.isoformat()]
+
+
+@db_tool(read_only=True)
 def fetch_user_flight_information_og(config: RunnableConfig) -> list[dict]:
     """Fetch all tickets for the user along with corresponding flight information and seat assignments.
 
@@ -28,8 +114,6 @@ def fetch_user_flight_information_og(config: RunnableConfig) -> list[dict]:
     passenger_id = configuration.get("passenger_id", None)
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
 
     query = """
     SELECT 
@@ -44,130 +128,35 @@ def fetch_user_flight_information_og(config: RunnableConfig) -> list[dict]:
     WHERE 
         t.passenger_id = ?
     """
-    cursor.execute(query, (passenger_id,))
-    rows = cursor.fetchall()
-    column_names = [column[0] for column in cursor.description]
-    results = [dict(zip(column_names, row)) for row in rows]
-
-    cursor.close()
-    conn.close()
+    with read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (passenger_id,))
+        rows = cursor.fetchall()
+        results = rows_to_dicts(cursor, rows)
+        cursor.close()
 
     return results
 
 
-@tool
-def fetch_user_flight_information(config: RunnableConfig) -> dict:
-    """Fetch all tickets for the user along with corresponding flight information, hotel bookings, and taxi bookings.
+@db_tool(read_only=True)
+def fetch_user_flight_information(config: RunnableConfig) -> Itinerary:
+    """Fetch all tickets for the user along with corresponding flight information, hotel bookings, taxi bookings, and car rental bookings.
 
     Returns:
-        A dictionary containing flight tickets, hotel bookings, and taxi bookings for the user.
+        A dictionary containing the user's flights, hotels, taxis and car rentals, plus a summary of counts.
     """
     configuration = config.get("configurable", {})
     passenger_id = configuration.get("passenger_id", None)
     if not passenger_id:
         raise ValueError("No passenger ID configured.")
 
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    # Fetch flight tickets
-    ticket_query = """SELECT * FROM tickets WHERE passenger_id = ?"""
-    cursor.execute(ticket_query, (passenger_id,))
-    ticket_rows = cursor.fetchall()
-
-    flight_results = []
-    if ticket_rows:
-        ticket_column_names = [column[0] for column in cursor.description]
-
-        for ticket_row in ticket_rows:
-            ticket_dict = dict(zip(ticket_column_names, ticket_row))
-            flight_id = ticket_dict.get("flight_id")
-
-            if flight_id:
-                flight_query = """SELECT * FROM flights WHERE flight_id = ?"""
-                cursor.execute(flight_query, (flight_id,))
-                flight_row = cursor.fetchone()
-
-                if flight_row:
-                    flight_column_names = [column[0] for column in cursor.description]
-                    flight_dict = dict(zip(flight_column_names, flight_row))
-                    combined_info = {"ticket_info": ticket_dict, "flight_info": flight_dict}
-                    flight_results.append(combined_info)
-                else:
-                    combined_info = {"ticket_info": ticket_dict, "flight_info": None}
-                    flight_results.append(combined_info)
-            else:
-                combined_info = {"ticket_info": ticket_dict, "flight_info": None}
-                flight_results.append(combined_info)
-
-    # Fetch hotel bookings
-    hotel_query = """SELECT * FROM hotel_bookings WHERE passenger_id = ?"""
-    cursor.execute(hotel_query, (passenger_id,))
-    hotel_rows = cursor.fetchall()
-
-    hotel_results = []
-    hotel_info_rows = []
-    if hotel_rows:
-        hotel_column_names = [column[0] for column in cursor.description]
-        hotel_results = [dict(zip(hotel_column_names, row)) for row in hotel_rows]
-        hotel_ids = [hotel["hotel_id"] for hotel in hotel_results]
-
-        hotel_info_query = """SELECT * FROM hotels WHERE id IN ({})""".format(
-            ",".join("?" for _ in hotel_ids)
-        )
-        cursor.execute(hotel_info_query, hotel_ids)
-        hotel_info_rows = cursor.fetchall()
-
-    # Fetch taxi bookings
-    taxi_query = """SELECT * FROM taxi_bookings WHERE passenger_id = ?"""
-    cursor.execute(taxi_query, (passenger_id,))
-    taxi_rows = cursor.fetchall()
-
-    taxi_results = []
-    if taxi_rows:
-        taxi_column_names = [column[0] for column in cursor.description]
-        taxi_results = [dict(zip(taxi_column_names, row)) for row in taxi_rows]
-
-    # Fetch car rental bookings
-    car_rental_query = """SELECT * FROM car_rental_bookings WHERE passenger_id = ?"""
-    cursor.execute(car_rental_query, (passenger_id,))
-    car_rental_rows = cursor.fetchall()
-
-    car_rental_results = []
-    car_rental_info_rows = []
-    if car_rental_rows:
-        car_rental_column_names = [column[0] for column in cursor.description]
-        car_rental_results = [dict(zip(car_rental_column_names, row)) for row in car_rental_rows]
-        car_rental_ids = [car["rental_id"] for car in car_rental_results]
-
-        car_rental_info_query = """SELECT * FROM car_rentals WHERE id IN ({})""".format(
-            ",".join("?" for _ in car_rental_ids)
-        )
-        cursor.execute(car_rental_info_query, car_rental_ids)
-        car_rental_info_rows = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-
-    # Format and return all data
-    return {
-        "flights": flight_results,
-        "hotels_bookings": hotel_results,
-        "hotel_info": list(hotel_info_rows) if hotel_info_rows else [],
-        "taxis": taxi_results,
-        "car_rental_bookings": car_rental_results,
-        "car_rental_info": list(car_rental_info_rows) if car_rental_info_rows else [],
-        "summary": {
-            "total_flights": len(flight_results),
-            "total_hotels": len(hotel_results),
-            "total_taxis": len(taxi_results),
-            "total_car_rentals": len(car_rental_results),
-        },
-    }
-
-
-class FetchFlightDetails(BaseTool):
+    with read_connection() as conn:
+        return fetch_itinerary(conn, passenger_id)
+
+
+class FetchFlightDetails(TravelDBTool):
     name: str = "fetch_flight_details"
+    metadata: dict | None = READ_ONLY
     description: str = """Fetch all tickets for the user along with corresponding flight information and seat assignments.
 
     Returns:
@@ -184,36 +173,40 @@ class FetchFlightDetails(BaseTool):
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
+        with read_connection() as conn:
+            cursor = conn.cursor()
+
+            query = """
+            SELECT 
+                t.ticket_no, t.book_ref,
+                f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
+                bp.seat_no, tf.fare_conditions
+            FROM 
+                tickets t
+                JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
+                JOIN flights f ON tf.flight_id = f.flight_id
+                JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
+            WHERE 
+                t.passenger_id = ?
+            """
+            cursor.execute(query, (passenger_id,))
+            rows = cursor.fetchall()
+            column_names = [column[0] for column in cursor.description]
+            results = [dict(zip(column_names, row)) for row in rows]
 
-        query = """
-        SELECT 
-            t.ticket_no, t.book_ref,
-            f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
-            bp.seat_no, tf.fare_conditions
-        FROM 
-            tickets t
-            JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
-            JOIN flights f ON tf.flight_id = f.flight_id
-            JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
-        WHERE 
-            t.passenger_id = ?
-        """
-        cursor.execute(query, (passenger_id,))
-        rows = cursor.fetchall()
-        column_names = [column[0] for column in cursor.description]
-        results = [dict(zip(column_names, row)) for row in rows]
-
-        cursor.close()
-        conn.close()
+            cursor.close()
 
         return results
 
 
-class SearchFlights(BaseTool):
+class SearchFlights(TravelDBTool):
     name: str = "search_flights"
-    description: str = """Search for flights based on departure airport, arrival airport, and departure time range."""
+    metadata: dict | None = READ_ONLY
+    description: str = """Search for flights based on departure airport, arrival airport, and departure time range.
+
+    Results are ordered by departure time. At most `limit` flights (up to 20, default 10) are
+    returned; pass `offset` to fetch the next page.
+    """
 
     def _run(
         self,
@@ -221,46 +214,102 @@ class SearchFlights(BaseTool):
         arrival_airport: str = None,
         start_time: date | datetime | None = None,
         end_time: date | datetime | None = None,
-        limit: int = 10,
+        limit: int | None = None,
+        offset: int | None = None,
     ) -> str:
         print(
             f"Executing search_flights with departure_airport={departure_airport}, "
             f"arrival_airport={arrival_airport}, start_time={start_time}, end_time={end_time}"
         )
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM flights WHERE 1 = 1"
-        params = []
-        if departure_airport:
-            query += " AND departure_airport = ?"
-            params.append(departure_airport)
-
-        if arrival_airport:
-            query += " AND arrival_airport = ?"
-            params.append(arrival_airport)
-
-        if start_time:
-            query += " AND DATE(scheduled_departure) >= DATE(?)"
-            params.append(start_time)
-
-        if end_time:
-            query += " AND DATE(scheduled_departure) <= DATE(?)"
-            params.append(end_time)
-        query += " LIMIT ?"
-        params.append(limit)
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        column_names = [column[0] for column in cursor.description]
-        results = [dict(zip(column_names, row)) for row in rows]
+        query, params = build_flight_search_query(
+            departure_airport, arrival_airport, start_time, end_time, limit, offset
+        )
+        with read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            column_names = [column[0] for column in cursor.description]
+            results = [dict(zip(column_names, row)) for row in rows]
 
-        cursor.close()
-        conn.close()
+            cursor.close()
 
         return results
 
 
-class BookFlight(BaseTool):
+class SearchConnectingFlights(TravelDBTool):
+    name: str = "search_connecting_flights"
+    metadata: dict | None = READ_ONLY
+    description: str = """Search for itineraries between two airports, including connecting flights.
+
+    Use this when search_flights finds no direct flight. The first leg departs between
+    start_time and end_time (the same day when end_time is omitted). Itineraries are ranked
+    by arrival time, each connection leaves at least `min_connection_minutes` after the
+    previous leg lands, and at most `max_legs` flights are used (up to 4, default 3).
+    """
+
+    def _run(
+        self,
+        departure_airport: str,
+        arrival_airport: str,
+        start_time: date | datetime,
+        end_time: date | datetime | None = None,
+        max_legs: int = MAX_LEGS,
+        min_connection_minutes: int = MIN_CONNECTION_MINUTES,
+        limit: int | None = None,
+    ) -> list[Connection]:
+        print(
+            f"Executing search_connecting_flights with departure_airport={departure_airport}, "
+            f"arrival_airport={arrival_airport}, start_time={start_time}, end_time={end_time}, "
+            f"max_legs={max_legs}"
+        )
+        window_start = day_bounds(start_time)[0]
+        window_end = day_bounds(end_time or start_time)[1]
+        limit = page(limit or PAGE_SIZE // 2, 0)[0]
+        with read_connection() as conn:
+            schedule = get_schedule(conn)
+        return find_connections(
+            schedule,
+            departure_airport,
+            arrival_airport,
+            window_start,
+            window_end,
+            max_legs=max_legs,
+            min_connection_minutes=max(min_connection_minutes, 0),
+            limit=limit,
+        )
+
+
+class SearchFlightCalendar(TravelDBTool):
+    name: str = "search_flight_calendar"
+    metadata: dict | None = READ_ONLY
+    description: str = """Show, day by day, how many flights a route has and the lowest fares.
+
+    Use this instead of calling search_flights once per day when the user asks which day is
+    cheapest or has flights. Covers start_date through end_date (31 days by default, at most
+    62). Each day lists the number of flights, the first and last departure, and the
+    minimum fare per class; days without flights are left out.
+    """
+
+    def _run(
+        self,
+        departure_airport: str,
+        arrival_airport: str,
+        start_date: date | datetime,
+        end_date: date | datetime | None = None,
+    ) -> list[dict]:
+        print(
+            f"Executing search_flight_calendar with departure_airport={departure_airport}, "
+            f"arrival_airport={arrival_airport}, start_date={start_date}, end_date={end_date}"
+        )
+        query, params = build_calendar_query(
+            departure_airport, arrival_airport, start_date, end_date
+        )
+        with read_connection() as conn:
+            cursor = conn.execute(query, params)
+            return rows_to_dicts(cursor, cursor.fetchall())
+
+
+class BookFlight(TravelDBTool):
     name: str = "book_flight"
     description: str = """
     Book a flight using the provided flight number, departure date, and booking reference.
@@ -275,6 +324,7 @@ class BookFlight(BaseTool):
         fare_conditions: str | None = "None",
         meal_preference: str | None = "None",
         special_assistance: str | None = "None",
+        tool_call_id: Annotated[str | None, InjectedToolArg] = None,
     ) -> str:
         print(
             f"Executing book_flight with flight_no={flight_no}, book_ref={1234}, fare_conditions={fare_conditions}, meal_preference={meal_preference}, special_assistance={special_assistance}"
@@ -285,39 +335,45 @@ class BookFlight(BaseTool):
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
+        def book(conn: sqlite3.Connection) -> str:
+            cursor = conn.cursor()
+
+            # Get flight details
+            query = (
+                "SELECT * FROM flights WHERE flight_no = ? "
+                "AND scheduled_departure >= ? AND scheduled_departure < ?"
+            )
+            cursor.execute(query, (flight_no, *day_bounds(departure)))
+            flight_details = cursor.fetchone()
+
+            print(f"Flight details fetched: {flight_details}")
+            if not flight_details:
+                raise ValueError(f"Flight with number {flight_no} not found.")
+
+            ticket_no = new_booking_id(conn, "tickets", "ticket_no")
+            hold_seats(
+                conn,
+                flight_details[0],
+                fare_conditions,
+                passenger_id=passenger_id,
+                booking_ref=ticket_no,
+                ttl=None,
+            )
+            query = "INSERT INTO tickets (ticket_no, book_ref, passenger_id, flight_no, flight_id) VALUES (?, ?, ?, ?, ?)"
+            cursor.execute(
+                query,
+                (
+                    ticket_no,
+                    "1234",
+                    passenger_id,
+                    flight_details[1],
+                    str(flight_details[0]),
+                ),
+            )
+            cursor.close()
+            return f"Flight booked successfully with ticket no: {ticket_no}"
 
-        # Get flight details
-        query = "SELECT * FROM flights WHERE flight_no = ? AND DATE(scheduled_departure) = DATE(?)"
-        cursor.execute(
-            query,
-            (
-                flight_no,
-                departure,
-            ),
-        )
-        flight_details = cursor.fetchone()
-
-        print(f"Flight details fetched: {flight_details}")
-        if not flight_details:
-            raise ValueError(f"Flight with number {flight_no} not found.")
-
-        query = "INSERT INTO tickets (ticket_no, book_ref, passenger_id, flight_no, flight_id) VALUES (?, ?, ?, ?, ?)"
-        cursor.execute(
-            query,
-            (
-                uuid.uuid4().hex[:8].upper(),
-                "1234",
-                passenger_id,
-                flight_details[1],
-                str(flight_details[0]),
-            ),
-        )
-        conn.commit()
-        ticket_no = cursor.lastrowid
-        cursor.close()
-        conn.close()
+        return run_once(self.name, tool_call_id, book)
 
         # Get ticket
         # query = (
@@ -351,10 +407,8 @@ class BookFlight(BaseTool):
         # cursor.close()
         # conn.close()
 
-        return f"Flight booked successfully with ticket no: {ticket_no}"
-
 
-class CancelFlight(BaseTool):
+class CancelFlight(TravelDBTool):
     name: str = "cancel_flight"
     description: str = """Cancel the user's ticket and remove it from the database."""
 
@@ -365,37 +419,34 @@ class CancelFlight(BaseTool):
         passenger_id = configuration.get("passenger_id", None)
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
+        with write_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (ticket_no,))
+            existing_ticket = cursor.fetchone()
+            if not existing_ticket:
+                cursor.close()
+                return "No existing ticket found for the given ticket number."
+
+            # Check the signed-in user actually has this ticket
+            cursor.execute(
+                "SELECT ticket_no FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
+                (ticket_no, passenger_id),
+            )
+            current_ticket = cursor.fetchone()
+            if not current_ticket:
+                cursor.close()
+                return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
+
+            cursor.execute("DELETE FROM tickets WHERE ticket_no = ?", (ticket_no,))
+            release_booking(conn, ticket_no)
 
-        cursor.execute("SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (ticket_no,))
-        existing_ticket = cursor.fetchone()
-        if not existing_ticket:
             cursor.close()
-            conn.close()
-            return "No existing ticket found for the given ticket number."
-
-        # Check the signed-in user actually has this ticket
-        cursor.execute(
-            "SELECT ticket_no FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-            (ticket_no, passenger_id),
-        )
-        current_ticket = cursor.fetchone()
-        if not current_ticket:
-            cursor.close()
-            conn.close()
-            return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
-
-        cursor.execute("DELETE FROM tickets WHERE ticket_no = ?", (ticket_no,))
-        conn.commit()
-
-        cursor.close()
-        conn.close()
 
         return f"Flight with ticket ID {ticket_no} has been successfully canceled."
 
 
-class UpdateFlight(BaseTool):
+class UpdateFlight(TravelDBTool):
     name: str = "update_flight"
     description: str = """Update the user's ticket to a new valid flight."""
 
@@ -409,53 +460,64 @@ class UpdateFlight(BaseTool):
         passenger_id = configuration.get("passenger_id", None)
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
+        flight_id = parse_id(new_flight_id, "flight")
+
+        with write_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "SELECT departure_airport, arrival_airport, scheduled_departure FROM flights WHERE flight_id = ?",
+                (new_flight_id,),
+            )
+            new_flight = cursor.fetchone()
+            if not new_flight:
+                cursor.close()
+                return "Invalid new flight ID provided."
+            column_names = [column[0] for column in cursor.description]
+            new_flight_dict = dict(zip(column_names, new_flight))
+            timezone = pytz.timezone("Etc/GMT-3")
+            current_time = datetime.now(tz=timezone)
+            departure_time = datetime.strptime(
+                new_flight_dict["scheduled_departure"], "%Y-%m-%d %H:%M:%S.%f%z"
+            )
+            time_until = (departure_time - current_time).total_seconds()
+            if time_until < (3 * 3600):
+                return f"Not permitted to reschedule to a flight that is less than 3 hours from the current time. Selected flight is at {departure_time}."
+
+            cursor.execute(
+                "SELECT flight_id, fare_conditions FROM ticket_flights WHERE ticket_no = ?",
+                (ticket_no,),
+            )
+            current_flight = cursor.fetchone()
+            if not current_flight:
+                cursor.close()
+                return "No existing ticket found for the given ticket number."
+            fare_conditions = current_flight[1]
+
+            cursor.execute(
+                "SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
+                (ticket_no, passenger_id),
+            )
+            current_ticket = cursor.fetchone()
+            if not current_ticket:
+                cursor.close()
+                return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
+
+            # Move the seat to the new flight, in the same fare class. The holds of the
+            # ticket record the flight they are on, so this gives back the old seat.
+            release_booking(conn, ticket_no)
+            hold_seats(
+                conn,
+                flight_id,
+                fare_conditions,
+                passenger_id=passenger_id,
+                booking_ref=ticket_no,
+                ttl=None,
+            )
+            cursor.execute(
+                "UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?",
+                (new_flight_id, ticket_no),
+            )
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT departure_airport, arrival_airport, scheduled_departure FROM flights WHERE flight_id = ?",
-            (new_flight_id,),
-        )
-        new_flight = cursor.fetchone()
-        if not new_flight:
-            cursor.close()
-            conn.close()
-            return "Invalid new flight ID provided."
-        column_names = [column[0] for column in cursor.description]
-        new_flight_dict = dict(zip(column_names, new_flight))
-        timezone = pytz.timezone("Etc/GMT-3")
-        current_time = datetime.now(tz=timezone)
-        departure_time = datetime.strptime(
-            new_flight_dict["scheduled_departure"], "%Y-%m-%d %H:%M:%S.%f%z"
-        )
-        time_until = (departure_time - current_time).total_seconds()
-        if time_until < (3 * 3600):
-            return f"Not permitted to reschedule to a flight that is less than 3 hours from the current time. Selected flight is at {departure_time}."
-
-        cursor.execute("SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (ticket_no,))
-        current_flight = cursor.fetchone()
-        if not current_flight:
-            cursor.close()
-            conn.close()
-            return "No existing ticket found for the given ticket number."
-
-        cursor.execute(
-            "SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-            (ticket_no, passenger_id),
-        )
-        current_ticket = cursor.fetchone()
-        if not current_ticket:
             cursor.close()
-            conn.close()
-            return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
-
-        cursor.execute(
-            "UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?",
-            (new_flight_id, ticket_no),
-        )
-        conn.commit()
-
-        cursor.close()
-        conn.close()
         return "Ticket successfully updated to new flight."
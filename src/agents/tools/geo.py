@@ -0,0 +1,232 @@
+import math
+import sqlite3
+
+from agents.tools.search import filter_clauses, page
+
+EARTH_RADIUS_KM = 6371.0
+# Nearest-N lookups search a growing radius, starting here and giving up past the maximum.
+NEAREST_START_KM = 5.0
+MAX_RADIUS_KM = 1000.0
+
+# Airports by IATA code: name, city, latitude, longitude.
+AIRPORTS: dict[str, tuple[str, str, float, float]] = {
+    "BSL": ("EuroAirport Basel-Mulhouse-Freiburg", "Basel", 47.5896, 7.5299),
+    "ZRH": ("Zurich Airport", "Zurich", 47.4647, 8.5492),
+    "GVA": ("Geneva Airport", "Geneva", 46.2381, 6.1090),
+    "BRN": ("Bern Airport", "Bern", 46.9141, 7.4997),
+    "LUG": ("Lugano Airport", "Lugano", 46.0040, 8.9106),
+    "CDG": ("Paris Charles de Gaulle Airport", "Paris", 49.0097, 2.5479),
+    "ORY": ("Paris Orly Airport", "Paris", 48.7262, 2.3652),
+    "LHR": ("London Heathrow Airport", "London", 51.4700, -0.4543),
+    "LGW": ("London Gatwick Airport", "London", 51.1537, -0.1821),
+    "FRA": ("Frankfurt Airport", "Frankfurt", 50.0379, 8.5622),
+    "MUC": ("Munich Airport", "Munich", 48.3538, 11.7861),
+    "DUS": ("Düsseldorf Airport", "Düsseldorf", 51.2895, 6.7668),
+    "BER": ("Berlin Brandenburg Airport", "Berlin", 52.3667, 13.5033),
+    "HAM": ("Hamburg Airport", "Hamburg", 53.6304, 9.9882),
+    "AMS": ("Amsterdam Airport Schiphol", "Amsterdam", 52.3105, 4.7683),
+    "BRU": ("Brussels Airport", "Brussels", 50.9014, 4.4844),
+    "VIE": ("Vienna International Airport", "Vienna", 48.1103, 16.5697),
+    "PRG": ("Václav Havel Airport Prague", "Prague", 50.1008, 14.2600),
+    "WAW": ("Warsaw Chopin Airport", "Warsaw", 52.1657, 20.9671),
+    "BUD": ("Budapest Ferenc Liszt International Airport", "Budapest", 47.4298, 19.2611),
+    "CPH": ("Copenhagen Airport", "Copenhagen", 55.6180, 12.6508),
+    "ARN": ("Stockholm Arlanda Airport", "Stockholm", 59.6498, 17.9238),
+    "OSL": ("Oslo Airport, Gardermoen", "Oslo", 60.1976, 11.1004),
+    "HEL": ("Helsinki Airport", "Helsinki", 60.3172, 24.9633),
+    "DUB": ("Dublin Airport", "Dublin", 53.4264, -6.2499),
+    "MAD": ("Adolfo Suárez Madrid-Barajas Airport", "Madrid", 40.4983, -3.5676),
+    "BCN": ("Josep Tarradellas Barcelona-El Prat Airport", "Barcelona", 41.2974, 2.0833),
+    "LIS": ("Humberto Delgado Airport", "Lisbon", 38.7742, -9.1342),
+    "FCO": ("Rome Fiumicino Airport", "Rome", 41.8003, 12.2389),
+    "MXP": ("Milan Malpensa Airport", "Milan", 45.6306, 8.7281),
+    "NCE": ("Nice Côte d'Azur Airport", "Nice", 43.6584, 7.2159),
+    "LYS": ("Lyon-Saint Exupéry Airport", "Lyon", 45.7256, 5.0811),
+    "ATH": ("Athens International Airport", "Athens", 37.9364, 23.9445),
+    "IST": ("Istanbul Airport", "Istanbul", 41.2753, 28.7519),
+    "DXB": ("Dubai International Airport", "Dubai", 25.2532, 55.3657),
+    "DOH": ("Hamad International Airport", "Doha", 25.2731, 51.6081),
+    "JFK": ("John F. Kennedy International Airport", "New York", 40.6413, -73.7781),
+    "EWR": ("Newark Liberty International Airport", "New York", 40.6895, -74.1745),
+    "BOS": ("Boston Logan International Airport", "Boston", 42.3656, -71.0096),
+    "ORD": ("Chicago O'Hare International Airport", "Chicago", 41.9742, -87.9073),
+    "ATL": ("Hartsfield-Jackson Atlanta International Airport", "Atlanta", 33.6407, -84.4277),
+    "MIA": ("Miami International Airport", "Miami", 25.7959, -80.2870),
+    "LAX": ("Los Angeles International Airport", "Los Angeles", 33.9416, -118.4085),
+    "SFO": ("San Francisco International Airport", "San Francisco", 37.6213, -122.3790),
+    "SEA": ("Seattle-Tacoma International Airport", "Seattle", 47.4502, -122.3088),
+    "YYZ": ("Toronto Pearson International Airport", "Toronto", 43.6777, -79.6248),
+    "YUL": ("Montréal-Trudeau International Airport", "Montreal", 45.4706, -73.7408),
+    "GRU": ("São Paulo/Guarulhos International Airport", "São Paulo", -23.4356, -46.4731),
+    "NRT": ("Narita International Airport", "Tokyo", 35.7720, 140.3929),
+    "HND": ("Tokyo Haneda Airport", "Tokyo", 35.5494, 139.7798),
+    "ICN": ("Incheon International Airport", "Seoul", 37.4602, 126.4407),
+    "PEK": ("Beijing Capital International Airport", "Beijing", 40.0799, 116.6031),
+    "PVG": ("Shanghai Pudong International Airport", "Shanghai", 31.1443, 121.8083),
+    "SHA": ("Shanghai Hongqiao International Airport", "Shanghai", 31.1979, 121.3363),
+    "HKG": ("Hong Kong International Airport", "Hong Kong", 22.3080, 113.9185),
+    "SIN": ("Singapore Changi Airport", "Singapore", 1.3644, 103.9915),
+    "BKK": ("Suvarnabhumi Airport", "Bangkok", 13.6900, 100.7501),
+    "DEL": ("Indira Gandhi International Airport", "Delhi", 28.5562, 77.1000),
+    "BOM": ("Chhatrapati Shivaji Maharaj International Airport", "Mumbai", 19.0896, 72.8656),
+    "SYD": ("Sydney Kingsford Smith Airport", "Sydney", -33.9399, 151.1753),
+    "JNB": ("O. R. Tambo International Airport", "Johannesburg", -26.1367, 28.2411),
+}
+
+# City centres, used to place hotels, car rentals and taxis whose rows only name a city.
+CITIES: dict[str, tuple[float, float]] = {
+    "Basel": (47.5596, 7.5886),
+    "Zurich": (47.3769, 8.5417),
+    "Zürich": (47.3769, 8.5417),
+    "Geneva": (46.2044, 6.1432),
+    "Bern": (46.9480, 7.4474),
+    "Lucerne": (47.0502, 8.3093),
+    "Luzern": (47.0502, 8.3093),
+    "Lugano": (46.0037, 8.9511),
+    "Lausanne": (46.5197, 6.6323),
+    "Interlaken": (46.6863, 7.8632),
+    "Zermatt": (46.0207, 7.7491),
+    "St. Moritz": (46.4908, 9.8355),
+    "Paris": (48.8566, 2.3522),
+    "London": (51.5074, -0.1278),
+    "Frankfurt": (50.1109, 8.6821),
+    "Munich": (48.1351, 11.5820),
+    "Berlin": (52.5200, 13.4050),
+    "Amsterdam": (52.3676, 4.9041),
+    "Brussels": (50.8503, 4.3517),
+    "Vienna": (48.2082, 16.3738),
+    "Milan": (45.4642, 9.1900),
+    "Rome": (41.9028, 12.4964),
+    "Barcelona": (41.3874, 2.1686),
+    "Madrid": (40.4168, -3.7038),
+    "Lisbon": (38.7223, -9.1393),
+    "Dubai": (25.2048, 55.2708),
+    "New York": (40.7128, -74.0060),
+    "San Francisco": (37.7749, -122.4194),
+    "Tokyo": (35.6762, 139.6503),
+    "Singapore": (1.3521, 103.8198),
+}
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float | None:
+    """Great-circle (haversine) distance in kilometres, or None if a coordinate is missing."""
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> list[float]:
+    """``[min_lat, max_lat, min_lon, max_lon]`` of a box containing the radius.
+
+    Near the poles, or when the box would cross the antimeridian, every longitude is
+    included rather than splitting the box in two.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - dlat, latitude + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return [max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0]
+    # Degrees of longitude shrink towards the poles, so size the box at its widest edge.
+    widest = max(abs(min_lat), abs(max_lat))
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(widest))))
+    if longitude - dlon < -180 or longitude + dlon > 180:
+        return [min_lat, max_lat, -180.0, 180.0]
+    return [min_lat, max_lat, longitude - dlon, longitude + dlon]
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """Make ``distance_km(lat1, lon1, lat2, lon2)`` available to SQL on ``conn``."""
+    conn.create_function("distance_km", 4, distance_km, deterministic=True)
+
+
+def resolve_place(conn: sqlite3.Connection, place: str | None) -> tuple[float, float] | None:
+    """Coordinates of an airport code or a known city name, or None if it isn't known.
+
+    Only the part before the first comma is used, so "Basel, Switzerland" finds Basel.
+    """
+    name = (place or "").split(",")[0].strip()
+    if not name:
+        return None
+    row = conn.execute(
+        "SELECT latitude, longitude FROM airports WHERE iata_code = ?", (name.upper(),)
+    ).fetchone()
+    if row is None:
+        row = conn.execute(
+            "SELECT latitude, longitude FROM places WHERE name = ?", (name,)
+        ).fetchone()
+    return tuple(row) if row else None
+
+
+def build_nearby_query(
+    table: str,
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    *,
+    match: str | None = None,
+    filters: dict[str, str | None] | None = None,
+    columns: str = "t.*",
+    limit: int | None = None,
+    offset: int | None = None,
+) -> tuple[str, list]:
+    """Build a paged search of ``table`` rows within ``radius_km`` of a point, nearest first.
+
+    Candidates come from the table's ``<table>_geo`` R*Tree by bounding box, and only those
+    are checked against the exact distance. ``match`` and ``filters`` work as in
+    ``build_search_query``. Rows gain a ``distance_km`` column.
+    """
+    geo = f"{table}_geo"
+    distance = "distance_km(?, ?, t.latitude, t.longitude)"
+    query = (
+        f"SELECT {columns}, round({distance}, 2) AS distance_km FROM {geo} "
+        f"JOIN {table} t ON t.id = {geo}.id "
+        f"WHERE {geo}.max_lat >= ? AND {geo}.min_lat <= ? "
+        f"AND {geo}.max_lon >= ? AND {geo}.min_lon <= ? AND {distance} <= ?"
+    )
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    params: list = [latitude, longitude, min_lat, max_lat, min_lon, max_lon]
+    params += [latitude, longitude, radius_km]
+    if match:
+        query += f" AND t.id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)"
+        params.append(match)
+    clauses, filter_params = filter_clauses(filters)
+    query += clauses + " ORDER BY distance_km, t.id LIMIT ? OFFSET ?"
+    params += filter_params + page(limit, offset)
+    return query, params
+
+
+def search_nearby(
+    conn: sqlite3.Connection,
+    table: str,
+    place: str,
+    *,
+    radius_km: float | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
+    **kwargs,
+) -> list[dict]:
+    """Rows of ``table`` around an airport code or city, nearest first.
+
+    With ``radius_km`` only rows that close are returned. Without it the nearest rows are
+    returned, found by widening the radius until a full page fits inside it.
+    """
+    point = resolve_place(conn, place)
+    if point is None:
+        raise ValueError(
+            f"Unknown location '{place}'. Use an airport code like 'BSL' or a city name."
+        )
+    radius = min(radius_km, MAX_RADIUS_KM) if radius_km else NEAREST_START_KM
+    size = page(limit, offset)[0]
+    while True:
+        query, params = build_nearby_query(
+            table, *point, radius, limit=limit, offset=offset, **kwargs
+        )
+        cursor = conn.execute(query, params)
+        rows = cursor.fetchall()
+        # Every row outside the radius is farther than every row inside it, so a full page
+        # within the radius is the same page the unbounded search would return.
+        if radius_km or len(rows) == size or radius >= MAX_RADIUS_KM:
+            return [dict(zip([column[0] for column in cursor.description], row)) for row in rows]
+        radius = min(radius * 4, MAX_RADIUS_KM)
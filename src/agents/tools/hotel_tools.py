@@ -1,22 +1,26 @@
-import os
 import sqlite3
-import uuid
 import warnings
 from datetime import date
+from typing import Annotated
 
 from dotenv import load_dotenv
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import BaseTool
+from langchain_core.tools import InjectedToolArg
+
+from agents.tools.base import READ_ONLY, TravelDBTool
+from agents.tools.db import read_connection, write_connection
+from agents.tools.geo import search_nearby
+from agents.tools.idempotency import new_booking_id, run_once
+from agents.tools.inventory import hold_rooms, parse_id, release_booking
+from agents.tools.search import build_search_query, fts_column, fts_match
 
 load_dotenv()
 warnings.filterwarnings("ignore")
 
-db_dir = os.path.join(os.getcwd(), "agents", "db")
-db = os.path.join(db_dir, "travel.sqlite")
-
 
-class SearchHotel(BaseTool):
+class SearchHotel(TravelDBTool):
     name: str = "search_hotel"
+    metadata: dict | None = READ_ONLY
     description: str = """
     Search for hotels based on location, name, price tier, check-in date, and check-out date.
 
@@ -24,9 +28,13 @@ class SearchHotel(BaseTool):
         location (Optional[str]): The location of the hotel. Defaults to None.
         name (Optional[str]): The name of the hotel. Defaults to None.
         price_tier (Optional[str]): The price tier of the hotel. Defaults to None. Examples: Midscale, Upper Midscale, Upscale, Luxury
+        near (Optional[str]): An airport code (e.g. "BSL") or city to search around. Results are then ordered by distance and include distance_km. Defaults to None.
+        radius_km (Optional[float]): With `near`, only return hotels within this many kilometres. Without it the nearest hotels are returned. Defaults to None.
+        limit (Optional[int]): The maximum number of hotels to return, at most 20. Defaults to 10.
+        offset (Optional[int]): The number of hotels to skip, for fetching the next page. Defaults to 0.
 
     Returns:
-        list[dict]: A list of hotel dictionaries matching the search criteria.
+        list[dict]: A list of hotel dictionaries matching the search criteria, best matches first.
     """
 
     def _run(
@@ -34,31 +42,44 @@ class SearchHotel(BaseTool):
         location: str = None,
         name: str | None = None,
         price_tier: str | None = None,
+        near: str | None = None,
+        radius_km: float | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
     ) -> list[dict]:
-        print(f"Executing search_hotel with location={location}, price_tier={price_tier}")
-
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM hotels WHERE 1=1"
-        params = []
-
-        if location:
-            query += " AND location LIKE ?"
-            params.append(f"%{location}%")
-        if name:
-            query += " AND name LIKE ?"
-            params.append(f"%{name}%")
+        print(
+            f"Executing search_hotel with location={location}, price_tier={price_tier}, "
+            f"near={near}, radius_km={radius_km}"
+        )
 
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+        match = fts_match(fts_column("location", location), fts_column("name", name))
+        filters = {"price_tier": price_tier}
+        if near:
+            with read_connection() as conn:
+                return search_nearby(
+                    conn,
+                    "hotels",
+                    near,
+                    radius_km=radius_km,
+                    match=match,
+                    filters=filters,
+                    limit=limit,
+                    offset=offset,
+                )
+
+        query, params = build_search_query(
+            "hotels", match=match, filters=filters, limit=limit, offset=offset
+        )
 
-        conn.close()
+        with read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            results = cursor.fetchall()
 
         return [dict(zip([column[0] for column in cursor.description], row)) for row in results]
 
 
-class BookHotel(BaseTool):
+class BookHotel(TravelDBTool):
     name: str = "book_hotel"
     description: str = """
     Book a hotel by its ID.
@@ -78,6 +99,7 @@ class BookHotel(BaseTool):
         check_out_date: date,
         room_type: str = None,
         num_guests: int = 1,
+        tool_call_id: Annotated[str | None, InjectedToolArg] = None,
     ) -> str:
         print(
             f"Executing book_hotel with hotel_id={hotel_id}, check_in_date={check_in_date}, check_out_date={check_out_date}, num_guests={num_guests}"
@@ -87,44 +109,52 @@ class BookHotel(BaseTool):
         passenger_id = configuration.get("passenger_id", None)
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
+        hotel = parse_id(hotel_id, "hotel")
+
+        def book(conn: sqlite3.Connection) -> str:
+            cursor = conn.cursor()
+
+            # Get hotel details
+            query = "SELECT * FROM hotels WHERE id = ?"
+            cursor.execute(query, (hotel_id,))
+            hotel_details = cursor.fetchone()
+            if not hotel_details:
+                raise ValueError(f"Hotel with ID {hotel_id} not found.")
+
+            # Book the hotel
+            booking_id = new_booking_id(conn, "hotel_bookings", "booking_id")
+            hold_rooms(
+                conn,
+                hotel,
+                check_in_date,
+                check_out_date,
+                passenger_id=passenger_id,
+                booking_ref=booking_id,
+                ttl=None,
+            )
+            query = (
+                "INSERT INTO hotel_bookings (booking_id, hotel_id, passenger_id, check_in_date, check_out_date, room_type, num_guests) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)"
+            )
+            params = [
+                booking_id,
+                hotel_id,
+                passenger_id,
+                check_in_date,
+                check_out_date,
+                room_type,
+                num_guests,
+            ]
+
+            cursor.execute(query, params)
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-
-        # Get hotel details
-        query = "SELECT * FROM hotels WHERE id = ?"
-        cursor.execute(query, (hotel_id,))
-        hotel_details = cursor.fetchone()
-        if not hotel_details:
-            raise ValueError(f"Hotel with ID {hotel_id} not found.")
-
-        # Book the hotel
-        booking_id = uuid.uuid4().hex[:8].upper()
-        query = (
-            "INSERT INTO hotel_bookings (booking_id, hotel_id, passenger_id, check_in_date, check_out_date, room_type, num_guests) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?)"
-        )
-        params = [
-            booking_id,
-            hotel_id,
-            passenger_id,
-            check_in_date,
-            check_out_date,
-            room_type,
-            num_guests,
-        ]
-
-        cursor.execute(query, params)
-        conn.commit()
-        booking_id = cursor.lastrowid
-
-        cursor.close()
-        conn.close()
+            cursor.close()
+            return f"Hotel booked successfully with booking ID: {booking_id}"
 
-        return f"Hotel booked successfully with booking ID: {booking_id}"
+        return run_once(self.name, tool_call_id, book)
 
 
-class UpdateHotelBooking(BaseTool):
+class UpdateHotelBooking(TravelDBTool):
     name: str = "update_hotel_booking"
     description: str = """
     Update a hotel's check-in and check-out dates by its ID.
@@ -153,37 +183,44 @@ class UpdateHotelBooking(BaseTool):
         if not passenger_id:
             raise ValueError("No booking ID configured.")
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-
-        # Get Booking ID
-        query = "SELECT * FROM hotel_bookings WHERE passenger_id = ?"
-        cursor.execute(query, (passenger_id,))
-        booking_details = cursor.fetchone()
-        print(booking_details)
+        with write_connection() as conn:
+            cursor = conn.cursor()
+
+            # Get Booking ID
+            query = "SELECT * FROM hotel_bookings WHERE passenger_id = ?"
+            cursor.execute(query, (passenger_id,))
+            booking_details = cursor.fetchone()
+            print(booking_details)
+
+            if not booking_details:
+                cursor.close()
+                return "No existing booking found for the given passenger ID."
+            booking_id = booking_details[0]
+
+            # Move the room to the new nights
+            release_booking(conn, booking_id)
+            hold_rooms(
+                conn,
+                booking_details[1],
+                new_check_in_date,
+                new_check_out_date,
+                passenger_id=passenger_id,
+                booking_ref=booking_id,
+                ttl=None,
+            )
+
+            # Update the hotel booking
+            query = "UPDATE hotel_bookings SET check_in_date = ?, check_out_date = ? WHERE booking_id = ?"
+            params = [new_check_in_date, new_check_out_date, booking_id]
+
+            cursor.execute(query, params)
 
-        if not booking_details:
             cursor.close()
-            conn.close()
-            return "No existing booking found for the given passenger ID."
-        booking_id = booking_details[0]
-
-        # Update the hotel booking
-        query = (
-            "UPDATE hotel_bookings SET check_in_date = ?, check_out_date = ? WHERE booking_id = ?"
-        )
-        params = [new_check_in_date, new_check_out_date, booking_id]
-
-        cursor.execute(query, params)
-        conn.commit()
-
-        cursor.close()
-        conn.close()
 
         return f"Hotel booking with ID {booking_id} successfully updated."
 
 
-class CancelHotelBooking(BaseTool):
+class CancelHotelBooking(TravelDBTool):
     name: str = "cancel_hotel_booking"
     description: str = """
     Cancel a hotel by its ID.
@@ -203,25 +240,23 @@ class CancelHotelBooking(BaseTool):
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
+        with write_connection() as conn:
+            cursor = conn.cursor()
 
-        # Check if the booking exists
-        query = "SELECT * FROM hotel_bookings WHERE passenger_id = ?"
-        cursor.execute(query, (passenger_id,))
-        existing_booking = cursor.fetchone()
-        if not existing_booking:
-            cursor.close()
-            conn.close()
-            return "No existing booking found for the given booking ID."
+            # Check if the booking exists
+            query = "SELECT * FROM hotel_bookings WHERE passenger_id = ?"
+            cursor.execute(query, (passenger_id,))
+            existing_booking = cursor.fetchone()
+            if not existing_booking:
+                cursor.close()
+                return "No existing booking found for the given booking ID."
 
-        # Cancel the hotel booking
-        booking_id = existing_booking[0]
-        query = "DELETE FROM hotel_bookings WHERE booking_id = ?"
-        cursor.execute(query, (booking_id,))
-        conn.commit()
+            # Cancel the hotel booking
+            booking_id = existing_booking[0]
+            query = "DELETE FROM hotel_bookings WHERE booking_id = ?"
+            cursor.execute(query, (booking_id,))
+            release_booking(conn, booking_id)
 
-        cursor.close()
-        conn.close()
+            cursor.close()
 
         return f"Hotel booking with ID {booking_id} has been successfully canceled."
@@ -0,0 +1,42 @@
+import sqlite3
+import uuid
+from collections.abc import Callable
+
+from agents.tools.db import write_connection
+
+
+def new_booking_id(conn: sqlite3.Connection, table: str, column: str) -> str:
+    """Generate a short booking reference that isn't used in ``table.column`` yet.
+
+    Call it inside a write transaction so that no other writer can take the same id
+    before it is inserted.
+    """
+    while True:
+        booking_id = uuid.uuid4().hex[:8].upper()
+        taken = conn.execute(f"SELECT 1 FROM {table} WHERE {column} = ?", (booking_id,))
+        if taken.fetchone() is None:
+            return booking_id
+
+
+def run_once(tool: str, key: str | None, write: Callable[[sqlite3.Connection], str]) -> str:
+    """Run a booking write at most once per idempotency key and return its result.
+
+    ``key`` is the id of the tool call. When a call with the same key has already
+    succeeded, its recorded result is returned and nothing is written. The lookup, the
+    write and the record share one immediate transaction; a write that raises records
+    nothing, so it can be retried. Without a key ``write`` simply runs.
+    """
+    with write_connection() as conn:
+        if key:
+            recorded = conn.execute(
+                "SELECT result FROM tool_results WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+            if recorded:
+                return recorded[0]
+        result = write(conn)
+        if key:
+            conn.execute(
+                "INSERT INTO tool_results (idempotency_key, tool, result) VALUES (?, ?, ?)",
+                (key, tool, result),
+            )
+        return result
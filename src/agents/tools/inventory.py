@@ -0,0 +1,340 @@
+import sqlite3
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+# How long an unconfirmed hold keeps its seats, rooms or car before it lapses.
+HOLD_TTL_SECONDS = 15 * 60
+
+# Capacity used when the database has no seat map for a flight's aircraft, and for
+# hotels and cars, which have no capacity data at all. Each car_rentals row is one car.
+DEFAULT_SEATS = {"Economy": 120, "Comfort": 24, "Business": 12}
+DEFAULT_ROOMS_PER_NIGHT = 20
+DEFAULT_FARE = "Economy"
+
+HoldKind = Literal["seat", "room", "car"]
+# What the resource_id of each kind of hold refers to.
+RESOURCES = {"seat": "flight", "room": "hotel", "car": "rental"}
+
+
+class SoldOut(ValueError):
+    """Raised when a hold asks for more seats, rooms or car days than are left."""
+
+
+def _day(value: date | datetime | str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value).strip()).date()
+
+
+def stay_days(start: date | datetime | str, end: date | datetime | str) -> list[str]:
+    """The ISO dates from ``start`` up to, but not including, ``end``.
+
+    A same-day range counts as one day, so a car picked up and returned on the same day
+    still occupies it.
+    """
+    first, last = _day(start), _day(end)
+    if last < first:
+        raise ValueError(f"End date {last} is before start date {first}.")
+    count = max((last - first).days, 1)
+    return [(first + timedelta(days=i)).isoformat() for i in range(count)]
+
+
+def normalize_fare(fare_conditions: str | None) -> str:
+    if not fare_conditions or fare_conditions == "None":
+        return DEFAULT_FARE
+    return fare_conditions.strip().title()
+
+
+def parse_id(value: int | str, what: str) -> int:
+    """``value`` as a numeric id; tools receive ids from the model as strings.
+
+    Raises ``ValueError`` naming ``what`` ("hotel", "flight", ...) if it isn't a number.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {what} ID {value!r}: expected a number.") from None
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return row.fetchone() is not None
+
+
+def _ensure_flight(conn: sqlite3.Connection, flight_id: int) -> None:
+    """Create the seat counters for a flight on first use.
+
+    Capacity comes from the aircraft's seat map when the database has one; seats already
+    sold through ticket_flights count as booked.
+    """
+    exists = conn.execute("SELECT 1 FROM flight_inventory WHERE flight_id = ?", (flight_id,))
+    if exists.fetchone():
+        return
+    capacity: dict[str, int] = {}
+    if _has_table(conn, "seats"):
+        capacity = dict(
+            conn.execute(
+                "SELECT s.fare_conditions, COUNT(*) FROM flights f "
+                "JOIN seats s ON s.aircraft_code = f.aircraft_code "
+                "WHERE f.flight_id = ? GROUP BY s.fare_conditions",
+                (flight_id,),
+            ).fetchall()
+        )
+    capacity = capacity or DEFAULT_SEATS
+    sold = dict(
+        conn.execute(
+            "SELECT fare_conditions, COUNT(*) FROM ticket_flights "
+            "WHERE flight_id = ? GROUP BY fare_conditions",
+            (flight_id,),
+        ).fetchall()
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO flight_inventory (flight_id, fare_conditions, capacity, booked) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (flight_id, fare, seats, min(sold.get(fare, 0), seats))
+            for fare, seats in capacity.items()
+        ],
+    )
+
+
+def _ensure_days(conn: sqlite3.Connection, kind: HoldKind, resource_id: int, days: list[str]):
+    """Create the per-day counters for a hotel or car on first use of each day.
+
+    Bookings made before the inventory existed count as booked.
+    """
+    if kind == "room":
+        conn.executemany(
+            "INSERT OR IGNORE INTO room_inventory (hotel_id, night, capacity, booked) "
+            "SELECT ?, ?, ?, MIN(COUNT(*), ?) FROM hotel_bookings WHERE hotel_id = ? "
+            "AND substr(check_in_date, 1, 10) <= ? AND substr(check_out_date, 1, 10) > ?",
+            [
+                (resource_id, day, DEFAULT_ROOMS_PER_NIGHT, DEFAULT_ROOMS_PER_NIGHT)
+                + (resource_id, day, day)
+                for day in days
+            ],
+        )
+    else:
+        conn.executemany(
+            "INSERT OR IGNORE INTO car_inventory (rental_id, day, capacity, booked) "
+            "SELECT ?, ?, 1, MIN(COUNT(*), 1) FROM car_rental_bookings WHERE rental_id = ? "
+            "AND substr(start_date, 1, 10) <= ? "
+            "AND (substr(end_date, 1, 10) > ? OR substr(start_date, 1, 10) = ?)",
+            [(resource_id, day, resource_id, day, day, day) for day in days],
+        )
+
+
+def _adjust(
+    conn: sqlite3.Connection,
+    kind: HoldKind,
+    resource_id: int,
+    fare_conditions: str | None,
+    days: list[str],
+    quantity: int,
+) -> int:
+    """Add ``quantity`` (negative to release) to the booked counters; return rows changed.
+
+    The capacity check is part of the UPDATE, so concurrent writers can never push a
+    counter past capacity.
+    """
+    if kind == "seat":
+        cursor = conn.execute(
+            "UPDATE flight_inventory SET booked = booked + ? "
+            "WHERE flight_id = ? AND fare_conditions = ? AND booked + ? BETWEEN 0 AND capacity",
+            (quantity, resource_id, fare_conditions, quantity),
+        )
+        return cursor.rowcount
+    if kind == "room":
+        table, column, day_column = "room_inventory", "hotel_id", "night"
+    else:
+        table, column, day_column = "car_inventory", "rental_id", "day"
+    cursor = conn.executemany(
+        f"UPDATE {table} SET booked = booked + ? "
+        f"WHERE {column} = ? AND {day_column} = ? AND booked + ? BETWEEN 0 AND capacity",
+        [(quantity, resource_id, day, quantity) for day in days],
+    )
+    return cursor.rowcount
+
+
+def release_expired(conn: sqlite3.Connection, now: float | None = None) -> int:
+    """Return the inventory of lapsed, unconfirmed holds and delete them."""
+    expired = conn.execute(
+        "SELECT hold_id FROM inventory_holds WHERE expires_at IS NOT NULL AND expires_at <= ?",
+        (time.time() if now is None else now,),
+    ).fetchall()
+    for (hold_id,) in expired:
+        release_hold(conn, hold_id)
+    return len(expired)
+
+
+def _hold(
+    conn: sqlite3.Connection,
+    kind: HoldKind,
+    resource_id: int,
+    *,
+    fare_conditions: str | None = None,
+    days: list[str] | None = None,
+    quantity: int = 1,
+    passenger_id: str | None = None,
+    booking_ref: str | None = None,
+    ttl: float | None = HOLD_TTL_SECONDS,
+) -> str:
+    if quantity < 1:
+        raise ValueError("Quantity must be at least 1.")
+    release_expired(conn)
+    days = days or []
+    if kind == "seat":
+        _ensure_flight(conn, resource_id)
+    else:
+        _ensure_days(conn, kind, resource_id, days)
+    expected = 1 if kind == "seat" else len(days)
+    # A savepoint undoes the days that did fit when a later one doesn't, so the caller
+    # can catch SoldOut and carry on with the rest of its transaction.
+    conn.execute("SAVEPOINT inventory_hold")
+    changed = _adjust(conn, kind, resource_id, fare_conditions, days, quantity)
+    if changed != expected:
+        conn.execute("ROLLBACK TO inventory_hold")
+    conn.execute("RELEASE inventory_hold")
+    if changed != expected:
+        raise SoldOut(
+            {
+                "seat": f"No {fare_conditions} seats left on flight {resource_id}.",
+                "room": f"Hotel {resource_id} has no rooms left on some of those nights.",
+                "car": f"Car rental {resource_id} is not available on some of those days.",
+            }[kind]
+        )
+
+    hold_id = uuid.uuid4().hex
+    conn.execute(
+        "INSERT INTO inventory_holds (hold_id, booking_ref, passenger_id, kind, resource_id, "
+        "fare_conditions, start_day, end_day, quantity, expires_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            hold_id,
+            booking_ref,
+            passenger_id,
+            kind,
+            resource_id,
+            fare_conditions,
+            days[0] if days else None,
+            days[-1] if days else None,
+            quantity,
+            None if ttl is None else time.time() + ttl,
+        ),
+    )
+    return hold_id
+
+
+def hold_seats(
+    conn: sqlite3.Connection,
+    flight_id: int | str,
+    fare_conditions: str | None = None,
+    quantity: int = 1,
+    **kwargs,
+) -> str:
+    """Hold seats on a flight and return the hold id. Raises ``SoldOut`` if full.
+
+    The hold lapses after ``ttl`` seconds (``HOLD_TTL_SECONDS`` by default) unless it is
+    confirmed. Tools that book outright pass ``ttl=None`` and the ``booking_ref`` the
+    hold belongs to.
+    """
+    fare = normalize_fare(fare_conditions)
+    return _hold(
+        conn,
+        "seat",
+        parse_id(flight_id, "flight"),
+        fare_conditions=fare,
+        quantity=quantity,
+        **kwargs,
+    )
+
+
+def hold_rooms(
+    conn: sqlite3.Connection,
+    hotel_id: int | str,
+    check_in: date | datetime | str,
+    check_out: date | datetime | str,
+    rooms: int = 1,
+    **kwargs,
+) -> str:
+    """Hold rooms for every night of a stay. See ``hold_seats``."""
+    days = stay_days(check_in, check_out)
+    return _hold(conn, "room", parse_id(hotel_id, "hotel"), days=days, quantity=rooms, **kwargs)
+
+
+def hold_car(
+    conn: sqlite3.Connection,
+    rental_id: int | str,
+    start: date | datetime | str,
+    end: date | datetime | str,
+    **kwargs,
+) -> str:
+    """Hold a rental car for every day of a window. See ``hold_seats``."""
+    days = stay_days(start, end)
+    return _hold(conn, "car", parse_id(rental_id, "rental"), days=days, **kwargs)
+
+
+def confirm_hold(conn: sqlite3.Connection, hold_id: str, booking_ref: str | None = None) -> None:
+    """Turn a hold into a booking so it no longer expires."""
+    cursor = conn.execute(
+        "UPDATE inventory_holds SET expires_at = NULL, booking_ref = ? "
+        "WHERE hold_id = ? AND (expires_at IS NULL OR expires_at > ?)",
+        (booking_ref, hold_id, time.time()),
+    )
+    if cursor.rowcount != 1:
+        raise ValueError(f"Hold {hold_id} has expired or does not exist.")
+
+
+def release_hold(conn: sqlite3.Connection, hold_id: str) -> bool:
+    """Give back a hold's inventory and delete it. Returns False if it doesn't exist."""
+    row = conn.execute(
+        "SELECT kind, resource_id, fare_conditions, start_day, end_day, quantity "
+        "FROM inventory_holds WHERE hold_id = ?",
+        (hold_id,),
+    ).fetchone()
+    if not row:
+        return False
+    kind, resource_id, fare, start_day, end_day, quantity = row
+    days = stay_days(start_day, _day(end_day) + timedelta(days=1)) if start_day else []
+    _adjust(conn, kind, resource_id, fare, days, -quantity)
+    conn.execute("DELETE FROM inventory_holds WHERE hold_id = ?", (hold_id,))
+    return True
+
+
+def release_booking(conn: sqlite3.Connection, booking_ref: str) -> int:
+    """Release every hold confirmed under ``booking_ref``; return how many there were."""
+    holds = conn.execute(
+        "SELECT hold_id FROM inventory_holds WHERE booking_ref = ?", (booking_ref,)
+    ).fetchall()
+    for (hold_id,) in holds:
+        release_hold(conn, hold_id)
+    return len(holds)
+
+
+def release_holds(
+    conn: sqlite3.Connection, kind: HoldKind, resource_id: int | str, passenger_id: str
+) -> int:
+    """Release a passenger's holds on one flight, hotel or car; return how many there were."""
+    holds = conn.execute(
+        "SELECT hold_id FROM inventory_holds "
+        "WHERE kind = ? AND resource_id = ? AND passenger_id = ?",
+        (kind, parse_id(resource_id, RESOURCES[kind]), passenger_id),
+    ).fetchall()
+    for (hold_id,) in holds:
+        release_hold(conn, hold_id)
+    return len(holds)
+
+
+def seats_left(conn: sqlite3.Connection, flight_id: int, fare_conditions: str | None = None):
+    """Seats left on a flight for one fare, or None if none have been booked yet."""
+    fare = normalize_fare(fare_conditions)
+    row = conn.execute(
+        "SELECT capacity - booked FROM flight_inventory "
+        "WHERE flight_id = ? AND fare_conditions = ?",
+        (flight_id, fare),
+    ).fetchone()
+    return row[0] if row else None
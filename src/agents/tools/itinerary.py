@@ -0,0 +1,126 @@
+import sqlite3
+from typing import TypedDict
+
+from agents.tools.db import rows_to_dicts
+
+
+class FlightTicket(TypedDict):
+    ticket_no: str
+    book_ref: str
+    flight_id: int | None
+    flight_no: str | None
+    departure_airport: str | None
+    arrival_airport: str | None
+    scheduled_departure: str | None
+    scheduled_arrival: str | None
+    status: str | None
+
+
+class HotelBooking(TypedDict):
+    booking_id: str
+    hotel_id: int
+    name: str | None
+    location: str | None
+    price_tier: str | None
+    check_in_date: str | None
+    check_out_date: str | None
+    room_type: str | None
+    num_guests: int | None
+
+
+class TaxiBooking(TypedDict):
+    id: str
+    vehicle_type: str | None
+    pickup_time: str | None
+    pickup_location: str | None
+    dropoff_location: str | None
+
+
+class CarRentalBooking(TypedDict):
+    rental_id: int
+    name: str | None
+    location: str | None
+    price_tier: str | None
+    start_date: str | None
+    end_date: str | None
+
+
+class ItinerarySummary(TypedDict):
+    total_flights: int
+    total_hotels: int
+    total_taxis: int
+    total_car_rentals: int
+
+
+class Itinerary(TypedDict):
+    flights: list[FlightTicket]
+    hotels: list[HotelBooking]
+    taxis: list[TaxiBooking]
+    car_rentals: list[CarRentalBooking]
+    summary: ItinerarySummary
+
+
+# One query per booking type, however many bookings the passenger has. Details of the
+# booked flight, hotel and car are joined in rather than fetched row by row.
+FLIGHTS_QUERY = """
+SELECT
+    t.ticket_no, t.book_ref, f.flight_id, COALESCE(f.flight_no, t.flight_no) AS flight_no,
+    f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
+    f.status
+FROM tickets t
+LEFT JOIN flights f ON f.flight_id = t.flight_id
+WHERE t.passenger_id = ?
+ORDER BY f.scheduled_departure, t.ticket_no
+"""
+
+HOTELS_QUERY = """
+SELECT
+    hb.booking_id, hb.hotel_id, h.name, h.location, h.price_tier,
+    hb.check_in_date, hb.check_out_date, hb.room_type, hb.num_guests
+FROM hotel_bookings hb
+LEFT JOIN hotels h ON h.id = hb.hotel_id
+WHERE hb.passenger_id = ?
+ORDER BY hb.check_in_date, hb.booking_id
+"""
+
+TAXIS_QUERY = """
+SELECT id, vehicle_type, pickup_time, pickup_location, dropoff_location
+FROM taxi_bookings
+WHERE passenger_id = ?
+ORDER BY pickup_time, id
+"""
+
+CAR_RENTALS_QUERY = """
+SELECT cb.rental_id, c.name, c.location, c.price_tier, cb.start_date, cb.end_date
+FROM car_rental_bookings cb
+LEFT JOIN car_rentals c ON c.id = cb.rental_id
+WHERE cb.passenger_id = ?
+ORDER BY cb.start_date, cb.rental_id
+"""
+
+
+def _fetch(conn: sqlite3.Connection, query: str, passenger_id: str) -> list:
+    cursor = conn.execute(query, (passenger_id,))
+    rows = rows_to_dicts(cursor, cursor.fetchall())
+    cursor.close()
+    return rows
+
+
+def fetch_itinerary(conn: sqlite3.Connection, passenger_id: str) -> Itinerary:
+    """Load every flight, hotel, taxi and car rental booking for a passenger."""
+    flights: list[FlightTicket] = _fetch(conn, FLIGHTS_QUERY, passenger_id)
+    hotels: list[HotelBooking] = _fetch(conn, HOTELS_QUERY, passenger_id)
+    taxis: list[TaxiBooking] = _fetch(conn, TAXIS_QUERY, passenger_id)
+    car_rentals: list[CarRentalBooking] = _fetch(conn, CAR_RENTALS_QUERY, passenger_id)
+    return {
+        "flights": flights,
+        "hotels": hotels,
+        "taxis": taxis,
+        "car_rentals": car_rentals,
+        "summary": {
+            "total_flights": len(flights),
+            "total_hotels": len(hotels),
+            "total_taxis": len(taxis),
+            "total_car_rentals": len(car_rentals),
+        },
+    }
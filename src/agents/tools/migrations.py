@@ -0,0 +1,252 @@
+import logging
+import sqlite3
+
+from agents.tools.geo import AIRPORTS, CITIES
+
+logger = logging.getLogger(__name__)
+
+
+def _fts_index(table: str, columns: list[str]) -> list[str]:
+    """Statements for an FTS5 index over ``table`` named ``<table>_fts``.
+
+    The index is external-content (it stores no copy of the rows) and is kept in sync
+    by triggers. Updates that don't touch the indexed columns, like flipping ``booked``,
+    leave it alone.
+    """
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    insert = f"INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new});"
+    delete = f"INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+        "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+FARE_CLASSES = ["Economy", "Comfort", "Business"]
+
+
+def _calendar_aggregate(where: str) -> str:
+    """INSERT of the ``flight_calendar`` rows for the flights matching ``where``."""
+    fares = ", ".join(f"min_fare_{fare.lower()}" for fare in FARE_CLASSES)
+    min_fares = ", ".join(
+        f"MIN(CASE WHEN tf.fare_conditions = '{fare}' THEN tf.amount END)" for fare in FARE_CLASSES
+    )
+    day = "substr(f.scheduled_departure, 1, 10)"
+    return (
+        "INSERT OR REPLACE INTO flight_calendar (departure_airport, arrival_airport, day, "
+        f"flights, first_departure, last_departure, {fares}) "
+        f"SELECT f.departure_airport, f.arrival_airport, {day}, COUNT(DISTINCT f.flight_id), "
+        f"MIN(f.scheduled_departure), MAX(f.scheduled_departure), {min_fares} "
+        "FROM flights f LEFT JOIN ticket_flights tf ON tf.flight_id = f.flight_id "
+        f"WHERE {where} AND (f.status IS NULL OR f.status != 'Cancelled') "
+        f"GROUP BY f.departure_airport, f.arrival_airport, {day}"
+    )
+
+
+def _calendar_refresh(departure_airport: str, arrival_airport: str, day: str) -> str:
+    """Statements recomputing one route's ``flight_calendar`` row for one day.
+
+    The arguments are SQL expressions, so triggers can pass ``new.`` and ``old.`` columns.
+    The flights are read through the route/departure index, which keeps a refresh as
+    cheap as a single-day flight search.
+    """
+    route = f"departure_airport = {departure_airport} AND arrival_airport = {arrival_airport}"
+    where = (
+        f"f.{route.replace(' AND ', ' AND f.')} AND f.scheduled_departure >= {day} "
+        f"AND f.scheduled_departure < date({day}, '+1 day')"
+    )
+    return (
+        f"DELETE FROM flight_calendar WHERE {route} AND day = {day}; {_calendar_aggregate(where)};"
+    )
+
+
+def _flight_route_day(row: str) -> tuple[str, str, str]:
+    """Route and day of the flight a ``ticket_flights`` trigger row belongs to."""
+    lookup = f"FROM flights WHERE flight_id = {row}.flight_id"
+    return (
+        f"(SELECT departure_airport {lookup})",
+        f"(SELECT arrival_airport {lookup})",
+        f"(SELECT substr(scheduled_departure, 1, 10) {lookup})",
+    )
+
+
+def _calendar_table() -> list[str]:
+    """Statements for ``flight_calendar``, a per-route daily summary of the flights table.
+
+    It is filled once here and kept current by triggers on flights and ticket_flights,
+    which recompute only the route-days a change touches. Minimum fares are the lowest
+    ``amount`` paid per fare class, since the database has no separate fare table.
+    """
+    fares = ", ".join(f"min_fare_{fare.lower()} REAL" for fare in FARE_CLASSES)
+    new = ("new.departure_airport", "new.arrival_airport", "substr(new.scheduled_departure, 1, 10)")
+    old = ("old.departure_airport", "old.arrival_airport", "substr(old.scheduled_departure, 1, 10)")
+    return [
+        "CREATE TABLE IF NOT EXISTS flight_calendar ("
+        "departure_airport TEXT NOT NULL, arrival_airport TEXT NOT NULL, day TEXT NOT NULL, "
+        f"flights INTEGER NOT NULL, first_departure TEXT, last_departure TEXT, {fares}, "
+        "PRIMARY KEY (departure_airport, arrival_airport, day)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_ticket_flights_flight "
+        "ON ticket_flights (flight_id, fare_conditions, amount)",
+        _calendar_aggregate("f.scheduled_departure IS NOT NULL"),
+        "CREATE TRIGGER IF NOT EXISTS flights_calendar_insert AFTER INSERT ON flights "
+        f"BEGIN {_calendar_refresh(*new)} END",
+        "CREATE TRIGGER IF NOT EXISTS flights_calendar_delete AFTER DELETE ON flights "
+        f"BEGIN {_calendar_refresh(*old)} END",
+        "CREATE TRIGGER IF NOT EXISTS flights_calendar_update AFTER UPDATE OF "
+        "scheduled_departure, departure_airport, arrival_airport, status ON flights "
+        f"BEGIN {_calendar_refresh(*old)} {_calendar_refresh(*new)} END",
+        "CREATE TRIGGER IF NOT EXISTS ticket_flights_calendar_insert "
+        f"AFTER INSERT ON ticket_flights BEGIN {_calendar_refresh(*_flight_route_day('new'))} END",
+        "CREATE TRIGGER IF NOT EXISTS ticket_flights_calendar_delete "
+        f"AFTER DELETE ON ticket_flights BEGIN {_calendar_refresh(*_flight_route_day('old'))} END",
+        "CREATE TRIGGER IF NOT EXISTS ticket_flights_calendar_update "
+        "AFTER UPDATE OF flight_id, fare_conditions, amount ON ticket_flights BEGIN "
+        f"{_calendar_refresh(*_flight_route_day('old'))} "
+        f"{_calendar_refresh(*_flight_route_day('new'))} END",
+    ]
+
+
+def _sql(value) -> str:
+    return "'" + value.replace("'", "''") + "'" if isinstance(value, str) else repr(value)
+
+
+def _values(rows) -> str:
+    return ", ".join("(" + ", ".join(map(_sql, row)) + ")" for row in rows)
+
+
+def _geo_index(table: str) -> list[str]:
+    """Statements adding coordinates to ``table`` and an R*Tree over them named ``<table>_geo``.
+
+    Rows are placed at the centre of the city their ``location`` names, when that city is
+    in ``places``, including rows inserted later without coordinates. Setting real
+    coordinates on a row moves it in the index.
+    """
+    geo = f"{table}_geo"
+    point = "new.id, new.latitude, new.latitude, new.longitude, new.longitude"
+    insert = (
+        f"INSERT INTO {geo} (id, min_lat, max_lat, min_lon, max_lon) SELECT {point} "
+        "WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;"
+    )
+    return [
+        f"ALTER TABLE {table} ADD COLUMN latitude REAL",
+        f"ALTER TABLE {table} ADD COLUMN longitude REAL",
+        f"UPDATE {table} SET (latitude, longitude) = "
+        f"(SELECT latitude, longitude FROM places WHERE name = {table}.location)",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {geo} "
+        "USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+        f"INSERT INTO {geo} SELECT id, latitude, latitude, longitude, longitude FROM {table} "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_geo_insert AFTER INSERT ON {table} BEGIN "
+        f"UPDATE {table} SET (latitude, longitude) = "
+        f"(SELECT latitude, longitude FROM places WHERE name = new.location) "
+        "WHERE id = new.id AND new.latitude IS NULL; "
+        f"{insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_geo_delete AFTER DELETE ON {table} "
+        f"BEGIN DELETE FROM {geo} WHERE id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_geo_update "
+        f"AFTER UPDATE OF latitude, longitude ON {table} "
+        f"BEGIN DELETE FROM {geo} WHERE id = old.id; {insert} END",
+    ]
+
+
+# Schema changes layered on top of the downloaded travel database. Each entry is applied
+# once, in order, and the number applied so far is kept in PRAGMA user_version. Only ever
+# append to this list.
+MIGRATIONS: list[list[str]] = [
+    # Indexes for flight search, booking by flight number and per-passenger lookups.
+    [
+        "CREATE INDEX IF NOT EXISTS idx_flights_route_departure "
+        "ON flights (departure_airport, arrival_airport, scheduled_departure)",
+        "CREATE INDEX IF NOT EXISTS idx_flights_no_departure "
+        "ON flights (flight_no, scheduled_departure)",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_passenger ON tickets (passenger_id)",
+        "CREATE INDEX IF NOT EXISTS idx_ticket_flights_ticket ON ticket_flights (ticket_no)",
+        "CREATE INDEX IF NOT EXISTS idx_hotel_bookings_passenger ON hotel_bookings (passenger_id)",
+        "CREATE INDEX IF NOT EXISTS idx_taxi_bookings_passenger ON taxi_bookings (passenger_id)",
+        "CREATE INDEX IF NOT EXISTS idx_car_rental_bookings_passenger "
+        "ON car_rental_bookings (passenger_id)",
+    ],
+    # Full-text indexes for hotel, car rental and trip recommendation search.
+    [
+        *_fts_index("hotels", ["name", "location"]),
+        *_fts_index("car_rentals", ["name", "location"]),
+        *_fts_index("trip_recommendations", ["name", "location", "keywords"]),
+    ],
+    # Idempotent booking writes and per-passenger trip bookings.
+    [
+        "CREATE TABLE IF NOT EXISTS tool_results ("
+        "idempotency_key TEXT PRIMARY KEY, tool TEXT NOT NULL, result TEXT NOT NULL, "
+        "created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)",
+        "CREATE TABLE IF NOT EXISTS trip_bookings ("
+        "booking_id TEXT PRIMARY KEY, recommendation_id INTEGER NOT NULL, "
+        "passenger_id TEXT NOT NULL, UNIQUE (passenger_id, recommendation_id))",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_ticket_no ON tickets (ticket_no)",
+        "CREATE INDEX IF NOT EXISTS idx_hotel_bookings_booking ON hotel_bookings (booking_id)",
+        "CREATE INDEX IF NOT EXISTS idx_taxi_bookings_id ON taxi_bookings (id)",
+    ],
+    # Seat, room and car inventory with expiring holds. Counters are created lazily by
+    # agents.tools.inventory the first time a flight, hotel night or car day is held.
+    [
+        "CREATE TABLE IF NOT EXISTS flight_inventory ("
+        "flight_id INTEGER NOT NULL, fare_conditions TEXT NOT NULL, "
+        "capacity INTEGER NOT NULL, booked INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (flight_id, fare_conditions), CHECK (booked BETWEEN 0 AND capacity))",
+        "CREATE TABLE IF NOT EXISTS room_inventory ("
+        "hotel_id INTEGER NOT NULL, night TEXT NOT NULL, "
+        "capacity INTEGER NOT NULL, booked INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (hotel_id, night), CHECK (booked BETWEEN 0 AND capacity))",
+        "CREATE TABLE IF NOT EXISTS car_inventory ("
+        "rental_id INTEGER NOT NULL, day TEXT NOT NULL, "
+        "capacity INTEGER NOT NULL, booked INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (rental_id, day), CHECK (booked BETWEEN 0 AND capacity))",
+        "CREATE TABLE IF NOT EXISTS inventory_holds ("
+        "hold_id TEXT PRIMARY KEY, booking_ref TEXT, passenger_id TEXT, "
+        "kind TEXT NOT NULL, resource_id INTEGER NOT NULL, fare_conditions TEXT, "
+        "start_day TEXT, end_day TEXT, quantity INTEGER NOT NULL, expires_at REAL)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_holds_expiry "
+        "ON inventory_holds (expires_at) WHERE expires_at IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_holds_booking ON inventory_holds (booking_ref)",
+    ],
+    # Daily flight counts, departure range and minimum fares per route for the fare calendar.
+    _calendar_table(),
+    # Airport and city coordinates, and spatial indexes for hotels, car rentals and taxis.
+    [
+        "CREATE TABLE IF NOT EXISTS airports (iata_code TEXT PRIMARY KEY, name TEXT NOT NULL, "
+        "city TEXT, latitude REAL NOT NULL, longitude REAL NOT NULL) WITHOUT ROWID",
+        "INSERT OR IGNORE INTO airports (iata_code, name, city, latitude, longitude) VALUES "
+        + _values((code, *airport) for code, airport in AIRPORTS.items()),
+        "CREATE TABLE IF NOT EXISTS places (name TEXT PRIMARY KEY COLLATE NOCASE, "
+        "latitude REAL NOT NULL, longitude REAL NOT NULL) WITHOUT ROWID",
+        "INSERT OR IGNORE INTO places (name, latitude, longitude) VALUES "
+        + _values((city, *point) for city, point in CITIES.items()),
+        *_geo_index("hotels"),
+        *_geo_index("car_rentals"),
+        *_geo_index("taxi"),
+        "ALTER TABLE taxi_bookings ADD COLUMN pickup_latitude REAL",
+        "ALTER TABLE taxi_bookings ADD COLUMN pickup_longitude REAL",
+    ],
+]
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """Bring the travel database up to date and return its schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        logger.info(f"Applying travel database migration {number}")
+        with conn:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+        version = number
+    return version
@@ -0,0 +1,88 @@
+import re
+
+# Rows per page returned by the search tools, and the most a caller may ask for. Keeping
+# pages small keeps tool output, and so the prompt, small.
+PAGE_SIZE = 10
+SEARCH_LIMIT = 20
+
+_WORD = re.compile(r"\w+")
+
+
+def fts_phrase(text: str | None) -> str | None:
+    """Turn free text into a quoted FTS5 prefix phrase, e.g. ``New York`` -> ``"new york"*``.
+
+    Only word characters are kept, so user input can never inject FTS5 query syntax.
+    """
+    terms = _WORD.findall((text or "").lower())
+    if not terms:
+        return None
+    return f'"{" ".join(terms)}"*'
+
+
+def fts_column(column: str, text: str | None) -> str | None:
+    """Match ``text`` as a phrase in a single FTS5 column."""
+    phrase = fts_phrase(text)
+    return f"{column} : {phrase}" if phrase else None
+
+
+def fts_any(column: str, texts: list[str]) -> str | None:
+    """Match any of ``texts`` in a single FTS5 column."""
+    phrases = [phrase for phrase in map(fts_phrase, texts) if phrase]
+    if not phrases:
+        return None
+    return f"{column} : ({' OR '.join(phrases)})"
+
+
+def fts_match(*clauses: str | None) -> str | None:
+    """AND together the non-empty clauses into one MATCH expression."""
+    parts = [clause for clause in clauses if clause]
+    return " AND ".join(parts) if parts else None
+
+
+def page(limit: int | None = None, offset: int | None = None) -> list[int]:
+    """``LIMIT ? OFFSET ?`` parameters, with ``limit`` clamped to ``1..SEARCH_LIMIT``."""
+    limit = PAGE_SIZE if limit is None else min(max(int(limit), 1), SEARCH_LIMIT)
+    return [limit, max(int(offset or 0), 0)]
+
+
+def filter_clauses(filters: dict[str, str | None] | None) -> tuple[str, list]:
+    """Case-insensitive equality predicates on ``t`` for the non-empty ``filters``."""
+    query, params = "", []
+    for column, value in (filters or {}).items():
+        if value and value.strip():
+            query += f" AND t.{column} = ? COLLATE NOCASE"
+            params.append(value.strip())
+    return query, params
+
+
+def build_search_query(
+    table: str,
+    *,
+    match: str | None = None,
+    filters: dict[str, str | None] | None = None,
+    columns: str = "t.*",
+    limit: int | None = None,
+    offset: int | None = None,
+) -> tuple[str, list]:
+    """Build a paged search over ``table``, aliased as ``t``.
+
+    With a ``match`` expression rows come from the table's FTS5 index ranked by bm25,
+    otherwise straight from the table. Non-empty ``filters`` become case-insensitive
+    equality predicates. Ties are broken by id so that pages are stable.
+    """
+    params: list = []
+    if match:
+        fts = f"{table}_fts"
+        query = (
+            f"SELECT {columns} FROM {fts} JOIN {table} t ON t.id = {fts}.rowid WHERE {fts} MATCH ?"
+        )
+        order = f"bm25({fts}), t.id"
+        params.append(match)
+    else:
+        query = f"SELECT {columns} FROM {table} t WHERE 1 = 1"
+        order = "t.id"
+
+    clauses, filter_params = filter_clauses(filters)
+    query += clauses + f" ORDER BY {order} LIMIT ? OFFSET ?"
+    params += filter_params + page(limit, offset)
+    return query, params
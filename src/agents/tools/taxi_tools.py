@@ -1,29 +1,35 @@
-import os
 import sqlite3
 import warnings
 from datetime import date, datetime
+from typing import Annotated
 
 from dotenv import load_dotenv
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import BaseTool
+from langchain_core.tools import InjectedToolArg
+
+from agents.tools.base import READ_ONLY, TravelDBTool
+from agents.tools.db import read_connection, write_connection
+from agents.tools.geo import resolve_place, search_nearby
+from agents.tools.idempotency import new_booking_id, run_once
+from agents.tools.search import build_search_query
 
 load_dotenv()
 warnings.filterwarnings("ignore")
 
 
-db_dir = os.path.join(os.getcwd(), "src", "agents", "db")
-db = os.path.join(db_dir, "travel.sqlite")
-
-
-class SearchTaxi(BaseTool):
+class SearchTaxi(TravelDBTool):
     name: str = "search_taxi"
+    metadata: dict | None = READ_ONLY
     description: str = """
-    Search for taxi based on passenger count, vehicle type, and price tier.
+    Search for taxi based on vehicle type, price tier and pickup location.
 
     Args:
-        passenger_count (int, optional): The number of passengers. Defaults to None.
         vehicle_type (str, optional): The type of vehicle to search for. Defaults to None.
         price_tier (str, optional): The price tier of the taxi. Defaults to None.
+        pickup_location (str, optional): An airport code (e.g. "BSL") or city the passenger will be picked up at. Taxis are then ordered by distance and include distance_km. Defaults to None.
+        radius_km (float, optional): With `pickup_location`, only return taxis within this many kilometres. Defaults to None.
+        limit (int, optional): The maximum number of taxis to return, at most 20. Defaults to 10.
+        offset (int, optional): The number of taxis to skip, for fetching the next page. Defaults to 0.
 
     Returns:
         list[dict]: A list of taxi dictionaries matching the search criteria.
@@ -33,30 +39,44 @@ class SearchTaxi(BaseTool):
         self,
         vehicle_type: str | None = None,
         price_tier: str | None = None,
+        pickup_location: str | None = None,
+        radius_km: float | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
     ) -> list[dict]:
-        print(f"Executing search_taxis with vehicle_type={vehicle_type}, price_tier={price_tier}")
-
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM taxi WHERE 1=1"
-        params = []
-
-        cursor.execute(query, params)
-        results = cursor.fetchall()
+        print(
+            f"Executing search_taxis with vehicle_type={vehicle_type}, price_tier={price_tier}, "
+            f"pickup_location={pickup_location}"
+        )
 
-        conn.close()
+        filters = {"vehicle_type": vehicle_type, "price_tier": price_tier}
+        if pickup_location:
+            with read_connection() as conn:
+                return search_nearby(
+                    conn,
+                    "taxi",
+                    pickup_location,
+                    radius_km=radius_km,
+                    filters=filters,
+                    limit=limit,
+                    offset=offset,
+                )
+
+        query, params = build_search_query("taxi", filters=filters, limit=limit, offset=offset)
+        with read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            results = cursor.fetchall()
 
         return [dict(zip([column[0] for column in cursor.description], row)) for row in results]
 
 
-class BookTaxi(BaseTool):
+class BookTaxi(TravelDBTool):
     name: str = "book_taxi"
     description: str = """
     Book a taxi for a passenger
 
     Args:
-        id (str): The ID of the passenger.
         vehicle_type (str): The type of vehicle to book.
         pickup_time (Union[datetime, date]): The time when the taxi should pick up the passenger.
         pickup_location (str): The location where the passenger will be picked up.
@@ -69,46 +89,59 @@ class BookTaxi(BaseTool):
     def _run(
         self,
         config: RunnableConfig,
-        id: str,
         vehicle_type: str,
         pickup_time: date | datetime,
         pickup_location: str,
         dropoff_location: str,
+        tool_call_id: Annotated[str | None, InjectedToolArg] = None,
     ) -> str:
-        print(f"Executing book_car_rental with id={id}, vehicle_type={vehicle_type}, ")
+        print(f"Executing book_taxi with vehicle_type={vehicle_type}, pickup_time={pickup_time}")
 
         configuration = config.get("configurable", {})
         passenger_id = configuration.get("passenger_id", None)
         if not passenger_id:
             raise ValueError("No passenger ID configured.")
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
 
-        query = "INSERT INTO taxi_bookings (id, passenger_id, vehicle_type, pickup_time, pickup_location, dropoff_location) VALUES (?, ?, ?, ?, ?, ?)"
-        params = (id, passenger_id, vehicle_type, pickup_time, pickup_location, dropoff_location)
+        def book(conn: sqlite3.Connection) -> str:
+            cursor = conn.cursor()
+
+            booking_id = new_booking_id(conn, "taxi_bookings", "id")
+            # Keep the pickup point when the location is a known airport or city, so
+            # bookings can be matched to nearby taxis without parsing the free text.
+            pickup_latitude, pickup_longitude = resolve_place(conn, pickup_location) or (None, None)
+            query = "INSERT INTO taxi_bookings (id, passenger_id, vehicle_type, pickup_time, pickup_location, dropoff_location, pickup_latitude, pickup_longitude) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            params = (
+                booking_id,
+                passenger_id,
+                vehicle_type,
+                pickup_time,
+                pickup_location,
+                dropoff_location,
+                pickup_latitude,
+                pickup_longitude,
+            )
+
+            cursor.execute(query, params)
 
-        cursor.execute(query, params)
-        conn.commit()
+            if cursor.rowcount > 0:
+                return f"Taxi booked successfully with booking ID: {booking_id}"
+            else:
+                return f"Failed to book taxi for passenger {passenger_id}."
 
-        if cursor.rowcount > 0:
-            conn.close()
-            return f"Taxi successfully booked for passenger {id}."
-        else:
-            conn.close()
-            return f"Failed to book taxi for passenger {id}."
+            # cursor.execute("UPDATE car_rentals SET booked = 1 WHERE id = ?", (rental_id,))
+            # conn.commit()
 
-        # cursor.execute("UPDATE car_rentals SET booked = 1 WHERE id = ?", (rental_id,))
-        # conn.commit()
+            # if cursor.rowcount > 0:
+            #     conn.close()
+            #     return f"Car rental {rental_id} successfully booked."
+            # else:
+            #     conn.close()
+            #     return f"No car rental found with ID {rental_id}."
 
-        # if cursor.rowcount > 0:
-        #     conn.close()
-        #     return f"Car rental {rental_id} successfully booked."
-        # else:
-        #     conn.close()
-        #     return f"No car rental found with ID {rental_id}."
+        return run_once(self.name, tool_call_id, book)
 
 
-class UpdateCarRental(BaseTool):
+class UpdateCarRental(TravelDBTool):
     name: str = "update_car_rental"
     description: str = """
     Update a car rental's start and end dates by its ID.
@@ -133,31 +166,27 @@ class UpdateCarRental(BaseTool):
             f"Executing book_car_rental with rental_id={rental_id}, start_date={start_date}, end_date={end_date}"
         )
 
-        conn = sqlite3.connect(db)
-        cursor = conn.cursor()
+        with write_connection() as conn:
+            cursor = conn.cursor()
 
-        if start_date:
-            cursor.execute(
-                "UPDATE car_rentals SET start_date = ? WHERE id = ?",
-                (start_date, rental_id),
-            )
-        if end_date:
-            cursor.execute(
-                "UPDATE car_rentals SET end_date = ? WHERE id = ?",
-                (end_date, rental_id),
-            )
-
-        conn.commit()
+            if start_date:
+                cursor.execute(
+                    "UPDATE car_rentals SET start_date = ? WHERE id = ?",
+                    (start_date, rental_id),
+                )
+            if end_date:
+                cursor.execute(
+                    "UPDATE car_rentals SET end_date = ? WHERE id = ?",
+                    (end_date, rental_id),
+                )
 
-        if cursor.rowcount > 0:
-            conn.close()
-            return f"Car rental {rental_id} successfully updated."
-        else:
-            conn.close()
-            return f"No car rental found with ID {rental_id}."
+            if cursor.rowcount > 0:
+                return f"Car rental {rental_id} successfully updated."
+            else:
+                return f"No car rental found with ID {rental_id}."
 
 
-class CancelCarRental(BaseTool):
+class CancelCarRental(TravelDBTool):
     name: str = "cancel_car_rental"
     description: str = """
     Cancel a car rental by its ID.
@@ -176,16 +205,12 @@ class CancelCarRental(BaseTool):
     ) -> str:
         print(f"Executing cancel_car_rental with rental_id={rental_id}")
 
-        conn = sqlite3.connect(db)
-
-        cursor = conn.cursor()
+        with write_connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("UPDATE car_rentals SET booked = 0 WHERE id = ?", (rental_id,))
-        conn.commit()
+            cursor.execute("UPDATE car_rentals SET booked = 0 WHERE id = ?", (rental_id,))
 
-        if cursor.rowcount > 0:
-            conn.close()
-            return f"Car rental {rental_id} successfully cancelled."
-        else:
-            conn.close()
-            return f"No car rental found with ID {rental_id}."
+            if cursor.rowcount > 0:
+                return f"Car rental {rental_id} successfully cancelled."
+            else:
+                return f"No car rental found with ID {rental_id}."
@@ -1,22 +1,27 @@
-import os
 import sqlite3
 import warnings
+from typing import Annotated
 
 from dotenv import load_dotenv
-from langchain.tools import tool
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import InjectedToolArg
+
+from agents.tools.base import db_tool
+from agents.tools.db import read_connection, write_connection
+from agents.tools.idempotency import new_booking_id, run_once
+from agents.tools.search import build_search_query, fts_any, fts_column, fts_match
 
 load_dotenv()
 warnings.filterwarnings("ignore")
 
-db_dir = os.path.join(os.getcwd(), "src", "agents", "db")
-db = os.path.join(db_dir, "travel.sqlite")
-
 
-@tool
+@db_tool(read_only=True)
 def search_trip_recommendations(
     location: str | None = None,
     name: str | None = None,
     keywords: str | None = None,
+    limit: int | None = None,
+    offset: int | None = None,
 ) -> list[dict]:
     """
     Search for trip recommendations based on location, name, and keywords.
@@ -25,38 +30,37 @@ def search_trip_recommendations(
         location (Optional[str]): The location of the trip recommendation. Defaults to None.
         name (Optional[str]): The name of the trip recommendation. Defaults to None.
         keywords (Optional[str]): The keywords associated with the trip recommendation. Defaults to None.
+        limit (Optional[int]): The maximum number of recommendations to return, at most 20. Defaults to 10.
+        offset (Optional[int]): The number of recommendations to skip, for fetching the next page. Defaults to 0.
 
     Returns:
-        list[dict]: A list of trip recommendation dictionaries matching the search criteria.
+        list[dict]: A list of trip recommendation dictionaries matching the search criteria, best matches first.
     """
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    query = "SELECT * FROM trip_recommendations WHERE 1=1"
-    params = []
-
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    if name:
-        query += " AND name LIKE ?"
-        params.append(f"%{name}%")
-    if keywords:
-        keyword_list = keywords.split(",")
-        keyword_conditions = " OR ".join(["keywords LIKE ?" for _ in keyword_list])
-        query += f" AND ({keyword_conditions})"
-        params.extend([f"%{keyword.strip()}%" for keyword in keyword_list])
-
-    cursor.execute(query, params)
-    results = cursor.fetchall()
+    query, params = build_search_query(
+        "trip_recommendations",
+        match=fts_match(
+            fts_column("location", location),
+            fts_column("name", name),
+            fts_any("keywords", keywords.split(",")) if keywords else None,
+        ),
+        limit=limit,
+        offset=offset,
+    )
 
-    conn.close()
+    with read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        results = cursor.fetchall()
 
     return [dict(zip([column[0] for column in cursor.description], row)) for row in results]
 
 
-@tool
-def book_trip(recommendation_id: int) -> str:
+@db_tool
+def book_trip(
+    recommendation_id: int,
+    config: RunnableConfig,
+    tool_call_id: Annotated[str | None, InjectedToolArg] = None,
+) -> str:
     """
     Book a trip by its recommendation ID.
 
@@ -66,21 +70,38 @@ def book_trip(recommendation_id: int) -> str:
     Returns:
         str: A message indicating whether the trip recommendation was successfully booked or not.
     """
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE trip_recommendations SET booked = 1 WHERE id = ?", (recommendation_id,))
-    conn.commit()
-
-    if cursor.rowcount > 0:
-        conn.close()
-        return f"Trip recommendation {recommendation_id} successfully booked."
-    else:
-        conn.close()
-        return f"No trip recommendation found with ID {recommendation_id}."
-
-
-@tool
+    configuration = config.get("configurable", {})
+    passenger_id = configuration.get("passenger_id", None)
+    if not passenger_id:
+        raise ValueError("No passenger ID configured.")
+
+    def book(conn: sqlite3.Connection) -> str:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT 1 FROM trip_recommendations WHERE id = ?", (recommendation_id,))
+        if not cursor.fetchone():
+            return f"No trip recommendation found with ID {recommendation_id}."
+
+        # The unique (passenger_id, recommendation_id) key makes a repeat booking a no-op.
+        cursor.execute(
+            "INSERT INTO trip_bookings (booking_id, recommendation_id, passenger_id) "
+            "VALUES (?, ?, ?) ON CONFLICT (passenger_id, recommendation_id) DO NOTHING",
+            (new_booking_id(conn, "trip_bookings", "booking_id"), recommendation_id, passenger_id),
+        )
+        cursor.execute(
+            "SELECT booking_id FROM trip_bookings WHERE passenger_id = ? AND recommendation_id = ?",
+            (passenger_id, recommendation_id),
+        )
+        booking_id = cursor.fetchone()[0]
+        return (
+            f"Trip recommendation {recommendation_id} successfully booked "
+            f"with booking ID: {booking_id}"
+        )
+
+    return run_once("book_trip", tool_call_id, book)
+
+
+@db_tool
 def update_trip(recommendation_id: int, details: str) -> str:
     """
     Update a trip recommendation's details by its ID.
@@ -92,25 +113,22 @@ def update_trip(recommendation_id: int, details: str) -> str:
     Returns:
         str: A message indicating whether the trip recommendation was successfully updated or not.
     """
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
+    with write_connection() as conn:
+        cursor = conn.cursor()
 
-    cursor.execute(
-        "UPDATE trip_recommendations SET details = ? WHERE id = ?",
-        (details, recommendation_id),
-    )
-    conn.commit()
+        cursor.execute(
+            "UPDATE trip_recommendations SET details = ? WHERE id = ?",
+            (details, recommendation_id),
+        )
 
-    if cursor.rowcount > 0:
-        conn.close()
-        return f"Trip recommendation {recommendation_id} successfully updated."
-    else:
-        conn.close()
-        return f"No trip recommendation found with ID {recommendation_id}."
+        if cursor.rowcount > 0:
+            return f"Trip recommendation {recommendation_id} successfully updated."
+        else:
+            return f"No trip recommendation found with ID {recommendation_id}."
 
 
-@tool
-def cancel_trip(recommendation_id: int) -> str:
+@db_tool
+def cancel_trip(recommendation_id: int, config: RunnableConfig) -> str:
     """
     Cancel a trip recommendation by its ID.
 
@@ -120,15 +138,20 @@ def cancel_trip(recommendation_id: int) -> str:
     Returns:
         str: A message indicating whether the trip recommendation was successfully cancelled or not.
     """
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute("UPDATE trip_recommendations SET booked = 0 WHERE id = ?", (recommendation_id,))
-    conn.commit()
-
-    if cursor.rowcount > 0:
-        conn.close()
-        return f"Trip recommendation {recommendation_id} successfully cancelled."
-    else:
-        conn.close()
-        return f"No trip recommendation found with ID {recommendation_id}."
+    configuration = config.get("configurable", {})
+    passenger_id = configuration.get("passenger_id", None)
+    if not passenger_id:
+        raise ValueError("No passenger ID configured.")
+
+    with write_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            "DELETE FROM trip_bookings WHERE passenger_id = ? AND recommendation_id = ?",
+            (passenger_id, recommendation_id),
+        )
+
+        if cursor.rowcount > 0:
+            return f"Trip recommendation {recommendation_id} successfully cancelled."
+        else:
+            return f"No trip recommendation found with ID {recommendation_id}."
@@ -1,30 +1,43 @@
-from collections.abc import Callable
+import asyncio
+import json
+import time
+from collections.abc import Callable, Iterator
 from datetime import datetime
+from functools import partial
 from typing import Annotated, Literal
+from uuid import uuid4
 
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
 from langchain_tavily import TavilySearch
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
-from langgraph.graph.message import AnyMessage, add_messages
+from langgraph.graph.message import add_messages
 from langgraph.prebuilt import tools_condition
 from pydantic import BaseModel, Field
-from typing_extensions import TypedDict
 
+from agents import prefetch
+from agents.history import HistoryState, windowed_history
+from agents.intent_router import classify_intent, record_llm_handoff
 from agents.llama_guard import LlamaGuard, LlamaGuardOutput, SafetyAssessment
+from agents.prefetch import PrefetchToolNode
+from agents.tools.base import READ_ONLY
+from agents.tools.bundles import PlanTrip
 from agents.tools.car_rental_tools import (
     BookCarRental,
     CancelCarRental,
     SearchCarRental,
     UpdateCarRental,
 )
+from agents.tools.encoding import encode
 from agents.tools.error_handling import create_tool_node_with_fallback  # , handle_tool_error
 from agents.tools.flight_tools import (
     BookFlight,
     CancelFlight,
     # FetchFlightDetails,
+    SearchConnectingFlights,
+    SearchFlightCalendar,
     SearchFlights,
     UpdateFlight,
     fetch_user_flight_information,
@@ -45,7 +58,9 @@ from agents.tools.trip_recommendations import (
     search_trip_recommendations,
     update_trip,
 )
-from core import get_model, settings
+from core import get_bound_model, metrics, settings
+from core.prompt_cache import mark_cache_prefix, record_prompt_cache
+from schema.models import AllModelEnum
 
 
 def update_dialog_stack(left: list[str], right: str | None) -> list[str]:
@@ -57,9 +72,15 @@ def update_dialog_stack(left: list[str], right: str | None) -> list[str]:
     return left + [right]
 
 
-class State(TypedDict):
+class State(HistoryState):
     messages: Annotated[list[AnyMessage], add_messages]
     user_info: str
+    # The itinerary user_info is written from, for code that needs its fields.
+    itinerary: dict
+    # Passenger the cached user_info belongs to, and the last message already checked
+    # for bookings that would change it.
+    user_info_passenger: str | None
+    user_info_checked_id: str | None
     safety: LlamaGuardOutput
     dialog_state: Annotated[
         list[
@@ -78,27 +99,103 @@ class State(TypedDict):
     ]
 
 
-llm = get_model(settings.DEFAULT_MODEL)
+REPROMPT = ("user", "Respond with a real output.")
+GIVE_UP_MESSAGE = "Sorry, I couldn't come up with an answer. Could you rephrase your request?"
 
 
-class Assistant:
-    def __init__(self, runnable: Runnable):
-        self.runnable = runnable
+def is_empty_response(result: AIMessage) -> bool:
+    return not result.tool_calls and (
+        not result.content or isinstance(result.content, list) and not result.content[0].get("text")
+    )
+
+
+class Assistant(RunnableLambda):
+    """Calls the model chosen for the request and re-prompts it when it answers with nothing.
+
+    The model sees the windowed history from agents.history. Re-prompts are bounded by
+    ASSISTANT_MAX_REPROMPTS with exponential backoff, after which ASSISTANT_FALLBACK_MODEL
+    gets one try. Every wasted call is counted in core.metrics.
+    """
+
+    def __init__(self, prompt: ChatPromptTemplate, tools: list):
+        super().__init__(self._call, afunc=self._acall, name="Assistant")
+        self.prompt = prompt
+        self.tools = tools
+
+    def runnable(self, model: AllModelEnum) -> Runnable:
+        """The prompt, marked for prompt caching, piped into ``model`` bound to the tools."""
+        cache_prefix = RunnableLambda(partial(mark_cache_prefix, model), name="CachePrefix")
+        return self.prompt | cache_prefix | get_bound_model(model, self.tools)
+
+    def _attempts(self, state: State, config: RunnableConfig) -> Iterator[tuple[Runnable, dict]]:
+        """The runnable and input of each call to make, in order, until one gives an answer."""
+        model = config.get("configurable", {}).get("model") or settings.DEFAULT_MODEL
+        runnable = self.runnable(model)
+        yield runnable, state
+        for reprompts in range(1, settings.ASSISTANT_MAX_REPROMPTS + 1):
+            metrics.increment("assistant.reprompts")
+            yield runnable, {**state, "messages": state["messages"] + [REPROMPT] * reprompts}
+        fallback = settings.ASSISTANT_FALLBACK_MODEL
+        if fallback and fallback != model:
+            metrics.increment("assistant.fallbacks")
+            yield self.runnable(fallback), state
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return settings.ASSISTANT_REPROMPT_BACKOFF * 2 ** (attempt - 1) if attempt else 0
+
+    @staticmethod
+    def _record_handoff(result: AIMessage, start: float) -> None:
+        """Time handoffs to a specialized assistant, for the intent router's savings."""
+        if result.tool_calls and result.tool_calls[0]["name"] in handoff_tools:
+            record_llm_handoff(time.perf_counter() - start)
+
+    @staticmethod
+    def _give_up() -> dict:
+        metrics.increment("assistant.exhausted")
+        return {"messages": AIMessage(content=GIVE_UP_MESSAGE)}
+
+    def _call(self, state: State, config: RunnableConfig) -> dict:
+        messages, history = windowed_history(state, config)
+        state = {**state, "messages": messages}
+        for attempt, (runnable, attempt_state) in enumerate(self._attempts(state, config)):
+            time.sleep(self._backoff(attempt))
+            start = time.perf_counter()
+            result = runnable.invoke(attempt_state, config)
+            record_prompt_cache(result)
+            if not is_empty_response(result):
+                self._record_handoff(result, start)
+                return {"messages": result, **history}
+            metrics.increment("assistant.empty_responses")
+        return {**self._give_up(), **history}
+
+    async def _acall(self, state: State, config: RunnableConfig) -> dict:
+        messages, history = windowed_history(state, config)
+        state = {**state, "messages": messages}
+        for attempt, (runnable, attempt_state) in enumerate(self._attempts(state, config)):
+            await asyncio.sleep(self._backoff(attempt))
+            start = time.perf_counter()
+            result = await runnable.ainvoke(attempt_state, config)
+            record_prompt_cache(result)
+            if not is_empty_response(result):
+                self._record_handoff(result, start)
+                return {"messages": result, **history}
+            metrics.increment("assistant.empty_responses")
+        return {**self._give_up(), **history}
+
+
+# The assistant prompts start with their static instructions and keep what changes between
+# calls (the time, the user's itinerary) in a second system message, so that the tool schemas
+# and instructions form a prefix that providers can cache across turns and users.
+TIME_CONTEXT = "Current time: {time}."
+ITINERARY_CONTEXT = (
+    "Current user flight information:\n<Flights>\n{user_info}\n</Flights>\n" + TIME_CONTEXT
+)
 
-    def __call__(self, state: State, config: RunnableConfig):
-        while True:
-            result = self.runnable.invoke(state)
 
-            if not result.tool_calls and (
-                not result.content
-                or isinstance(result.content, list)
-                and not result.content[0].get("text")
-            ):
-                messages = state["messages"] + [("user", "Respond with a real output.")]
-                state = {**state, "messages": messages}
-            else:
-                break
-        return {"messages": result}
+def current_minute() -> str:
+    """The current time to the minute, which keeps the prompt the same within a minute."""
+    return datetime.now().strftime("%Y-%m-%d %H:%M")
 
 
 class Escalate(BaseModel):
@@ -121,26 +218,33 @@ flight_booking_prompt = ChatPromptTemplate.from_messages(
             "When booking flights, confirm all details with the customer before proceeding. "
             "Confirm the updated flight details with the customer and inform them of any additional fees. "
             "When searching, be persistent. Expand your query bounds if the first search returns no results. "
+            "If there is no direct flight between two airports, use SearchConnectingFlights to find "
+            "itineraries with connections instead of repeatedly widening the search. "
+            "When the user asks which day has flights or is cheapest, use SearchFlightCalendar "
+            "once rather than searching each day. "
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant. "
             "Remember that a booking isn't completed until after the relevant tool has successfully been used. "
-            "You have access to the following tools: SearchFlights, BookFlight, UpdateFlight, and CancelFlight."
-            "\n\nCurrent user flight information:\n<Flights>\n{user_info}\n</Flights>"
-            "\nCurrent time: {time}."
+            "You have access to the following tools: SearchFlights, SearchConnectingFlights, SearchFlightCalendar, BookFlight, UpdateFlight, and CancelFlight."
             "\n\nIf the user needs help, and none of your tools are appropriate for it, then"
             ' "Escalate" the dialog to the host assistant. Do not waste the user\'s time. Do not make up invalid tools or functions.',
         ),
+        ("system", ITINERARY_CONTEXT),
         ("placeholder", "{messages}"),
     ]
-).partial(time=datetime.now)
+).partial(time=current_minute)
 
 # Define tool categories
-update_flight_safe_tools = [SearchFlights(), UpdateFlight(), CancelFlight(), BookFlight()]
+update_flight_safe_tools = [
+    SearchFlights(),
+    SearchConnectingFlights(),
+    SearchFlightCalendar(),
+    UpdateFlight(),
+    CancelFlight(),
+    BookFlight(),
+]
 update_flight_sensitive_tools = []
 update_flight_tools = update_flight_safe_tools + update_flight_sensitive_tools
 
-# Create the runnable with all tools
-update_flight_runnable = flight_booking_prompt | llm.bind_tools(update_flight_tools + [Escalate])
-
 # Hotel Booking Assistant
 book_hotel_prompt = ChatPromptTemplate.from_messages(
     [
@@ -150,10 +254,10 @@ book_hotel_prompt = ChatPromptTemplate.from_messages(
             "The primary assistant delegates work to you whenever the user needs help booking a hotel. "
             "Format your responses properly."
             "Search for available hotels based on the user's preferences and confirm the booking details with the customer. "
+            "To find hotels close to an airport or city, search with `near` (and `radius_km`) instead of guessing location names. "
             " When searching, be persistent. Expand your query bounds if the first search returns no results. "
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
             " Remember that a booking isn't completed until after the relevant tool has successfully been used."
-            "\nCurrent time: {time}."
             '\n\nIf the user needs help, and none of your tools are appropriate for it, then "Escalate" the dialog to the host assistant.'
             " Do not waste the user's time. Do not make up invalid tools or functions."
             "\n\nSome examples for which you should Escalate:\n"
@@ -163,14 +267,14 @@ book_hotel_prompt = ChatPromptTemplate.from_messages(
             " - 'Oh wait i haven't booked my flight yet i'll do that first'\n"
             " - 'Hotel booking confirmed'",
         ),
+        ("system", TIME_CONTEXT),
         ("placeholder", "{messages}"),
     ]
-).partial(time=datetime.now)
+).partial(time=current_minute)
 
 book_hotel_safe_tools = [SearchHotel(), BookHotel(), UpdateHotelBooking(), CancelHotelBooking()]
 book_hotel_sensitive_tools = []
 book_hotel_tools = book_hotel_safe_tools + book_hotel_sensitive_tools
-book_hotel_runnable = book_hotel_prompt | llm.bind_tools(book_hotel_tools + [Escalate])
 
 
 # Car Rental Assistant
@@ -182,10 +286,10 @@ book_car_rental_prompt = ChatPromptTemplate.from_messages(
             "The primary assistant delegates work to you whenever the user needs help booking a car rental. "
             "Format your responses properly."
             "Search for available car rentals based on the user's preferences and confirm the booking details with the customer. "
+            "To find car rentals close to an airport or city, search with `near` (and `radius_km`) instead of guessing location names. "
             " When searching, be persistent. Expand your query bounds if the first search returns no results. "
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
             " Remember that a booking isn't completed until after the relevant tool has successfully been used."
-            "\nCurrent time: {time}."
             "\n\nIf the user needs help, and none of your tools are appropriate for it, then "
             '"Escalate" the dialog to the host assistant. Do not waste the user\'s time. Do not make up invalid tools or functions.'
             "\n\nSome examples for which you should Escalate:\n"
@@ -195,9 +299,10 @@ book_car_rental_prompt = ChatPromptTemplate.from_messages(
             " - 'Oh wait i haven't booked my flight yet i'll do that first'\n"
             " - 'Car rental booking confirmed'",
         ),
+        ("system", TIME_CONTEXT),
         ("placeholder", "{messages}"),
     ]
-).partial(time=datetime.now)
+).partial(time=current_minute)
 
 book_car_rental_safe_tools = [
     SearchCarRental(),
@@ -207,9 +312,6 @@ book_car_rental_safe_tools = [
 ]
 book_car_rental_sensitive_tools = []
 book_car_rental_tools = book_car_rental_safe_tools + book_car_rental_sensitive_tools
-book_car_rental_runnable = book_car_rental_prompt | llm.bind_tools(
-    book_car_rental_tools + [Escalate]
-)
 
 # Taxi Booking Assistant
 taxi_booking_prompt = ChatPromptTemplate.from_messages(
@@ -220,9 +322,9 @@ taxi_booking_prompt = ChatPromptTemplate.from_messages(
             "The primary assistant delegates work to you whenever the user needs help booking a taxi. "
             "Format your responses properly."
             "Search for available taxis based on the user's preferences and confirm the booking details with the customer. "
+            "Pass the pickup airport or city as `pickup_location` when searching to get the closest taxis first. "
             " When searching, be persistent. Expand your query bounds if the first search returns no results. "
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
-            "\nCurrent time: {time}."
             "\n\nIf the user needs help, and none of your tools are appropriate for it, then "
             '"Escalate" the dialog to the host assistant. Do not waste the user\'s time. Do not make up invalid tools or functions.'
             "\n\nSome examples for which you should Escalate:\n"
@@ -232,14 +334,14 @@ taxi_booking_prompt = ChatPromptTemplate.from_messages(
             " - 'Oh wait i haven't booked my flight yet i'll do that first'\n"
             " - 'Car rental booking confirmed'",
         ),
+        ("system", TIME_CONTEXT),
         ("placeholder", "{messages}"),
     ]
-).partial(time=datetime.now)
+).partial(time=current_minute)
 
 taxi_booking_safe_tools = [SearchTaxi(), BookTaxi()]
 taxi_booking_sensitive_tools = []
 taxi_booking_tools = taxi_booking_safe_tools + taxi_booking_sensitive_tools
-taxi_booking_runnable = taxi_booking_prompt | llm.bind_tools(taxi_booking_tools + [Escalate])
 
 book_trip_prompt = ChatPromptTemplate.from_messages(
     [
@@ -251,7 +353,6 @@ book_trip_prompt = ChatPromptTemplate.from_messages(
             "If you need more information or the customer changes their mind, escalate the task back to the main assistant."
             " When searching, be persistent. Expand your query bounds if the first search returns no results. "
             " Remember that a booking isn't completed until after the relevant tool has successfully been used."
-            "\nCurrent time: {time}."
             '\n\nIf the user needs help, and none of your tools are appropriate for it, then "Escalate" the dialog to the host assistant. Do not waste the user\'s time. Do not make up invalid tools or functions.'
             "\n\nSome examples for which you should Escalate:\n"
             " - 'nevermind i think I'll book separately'\n"
@@ -259,14 +360,14 @@ book_trip_prompt = ChatPromptTemplate.from_messages(
             " - 'Oh wait i haven't booked my flight yet i'll do that first'\n"
             " - 'Trip booking confirmed!'",
         ),
+        ("system", TIME_CONTEXT),
         ("placeholder", "{messages}"),
     ]
-).partial(time=datetime.now)
+).partial(time=current_minute)
 
 book_trip_safe_tools = [search_trip_recommendations, book_trip, update_trip, cancel_trip]
 book_trip_sensitive_tools = []
 book_trip_tools = book_trip_safe_tools + book_trip_sensitive_tools
-book_trip_runnable = book_trip_prompt | llm.bind_tools(book_trip_tools + [Escalate])
 
 
 # Primary Assistant
@@ -322,6 +423,14 @@ class ToTripBookingAssistant(BaseModel):
     )
 
 
+handoff_tools = {
+    ToFlightBookingAssistant.__name__,
+    ToBookCarRental.__name__,
+    ToHotelBookingAssistant.__name__,
+    ToTaxiBookingAssistant.__name__,
+    ToTripBookingAssistant.__name__,
+}
+
 primary_assistant_prompt = ChatPromptTemplate.from_messages(
     [
         (
@@ -337,31 +446,32 @@ primary_assistant_prompt = ChatPromptTemplate.from_messages(
             "For car rentals, use ToBookCarRental. For hotel bookings, use ToHotelBookingAssistant. "
             "For taxi bookings, use ToTaxiBookingAssistant. "
             "For trip recommendations, use ToTripBookingAssistant."
+            " When the customer wants to plan a whole trip (flights plus a hotel and/or car) and has given the airports and dates, "
+            "call PlanTrip once and present its bundles instead of searching each part separately; "
+            "then delegate the bookings for the bundle they choose."
             "Provide detailed information to the customer, and always double-check the database before concluding that information is unavailable. "
             " When searching, be persistent. Expand your query bounds if the first search returns no results. "
-            " If a search comes up empty, expand your search before giving up."
-            "\n\nCurrent user flight information:\n<Flights>\n{user_info}\n</Flights>"
-            "\nCurrent time: {time}.",
+            " If a search comes up empty, expand your search before giving up.",
         ),
+        ("system", ITINERARY_CONTEXT),
         ("placeholder", "{messages}"),
     ]
-).partial(time=datetime.now)
+).partial(time=current_minute)
 
 primary_assistant_tools = [
-    TavilySearch(max_results=2),
+    TavilySearch(max_results=2, metadata=READ_ONLY),
+    PlanTrip(),
     # fetch_user_flight_information,
 ]
 
-assistant_runnable = primary_assistant_prompt | llm.bind_tools(
-    primary_assistant_tools
-    + [
-        ToFlightBookingAssistant,
-        ToBookCarRental,
-        ToHotelBookingAssistant,
-        ToTaxiBookingAssistant,
-        ToTripBookingAssistant,
-    ]
-)
+# The primary assistant can call its own tools or hand off to a specialized assistant.
+primary_assistant_bound_tools = primary_assistant_tools + [
+    ToFlightBookingAssistant,
+    ToBookCarRental,
+    ToHotelBookingAssistant,
+    ToTaxiBookingAssistant,
+    ToTripBookingAssistant,
+]
 
 
 def create_entry_node(assistant_name: str, new_dialog_state: str) -> Callable:
@@ -414,9 +524,70 @@ def check_safety(state: State) -> Literal["unsafe", "safe"]:
 
 builder = StateGraph(State)
 
+# Tools whose success changes what fetch_user_flight_information returns.
+itinerary_write_tools = {
+    tool.name
+    for tool in [
+        BookFlight(),
+        UpdateFlight(),
+        CancelFlight(),
+        BookHotel(),
+        UpdateHotelBooking(),
+        CancelHotelBooking(),
+        BookCarRental(),
+        UpdateCarRental(),
+        CancelCarRental(),
+        BookTaxi(),
+    ]
+}
+
+
+def itinerary_changed(messages: list[AnyMessage], checked_id: str | None) -> bool:
+    """Whether a booking tool succeeded after the message with id ``checked_id``."""
+    for message in reversed(messages):
+        if checked_id is not None and message.id == checked_id:
+            return False
+        if (
+            isinstance(message, ToolMessage)
+            and message.name in itinerary_write_tools
+            and message.status != "error"
+        ):
+            return True
+    return False
+
+
+def itinerary_prompt(itinerary: dict) -> str:
+    """The itinerary as it is written into every prompt, compacted like tool outputs."""
+    if settings.TOOL_OUTPUT_COMPACT:
+        return encode(itinerary, settings.TOOL_OUTPUT_MAX_ROWS)
+    return json.dumps(itinerary, default=str)
+
+
+def user_info(state: State, config: RunnableConfig):
+    """Load the user's itinerary into the prompt, reusing the cached copy when possible.
 
-def user_info(state: State):
-    return {"user_info": fetch_user_flight_information.invoke({})}
+    The itinerary is only read from the database again when the passenger changes or a
+    booking, update or cancel tool has succeeded since it was cached.
+    """
+    # Every turn starts here; searches prefetched for an earlier turn are no longer used.
+    prefetch.discard(config)
+    passenger_id = config.get("configurable", {}).get("passenger_id")
+    messages = state["messages"]
+    checked_id = messages[-1].id if messages else None
+    if (
+        state.get("user_info")
+        and state.get("user_info_passenger") == passenger_id
+        and not itinerary_changed(messages, state.get("user_info_checked_id"))
+    ):
+        return {"user_info_checked_id": checked_id}
+
+    itinerary = fetch_user_flight_information.invoke({}, config)
+    return {
+        "user_info": itinerary_prompt(itinerary),
+        "itinerary": itinerary,
+        "user_info_passenger": passenger_id,
+        "user_info_checked_id": checked_id,
+    }
 
 
 builder.add_node("fetch_user_info", user_info)
@@ -433,7 +604,9 @@ builder.add_node(
     "enter_update_flight",
     create_entry_node("Flight Updates & Booking Assistant", "update_flight"),
 )
-builder.add_node("update_flight", Assistant(update_flight_runnable))
+builder.add_node(
+    "update_flight", Assistant(flight_booking_prompt, update_flight_tools + [Escalate])
+)
 builder.add_edge("enter_update_flight", "update_flight")
 
 # Tool execution nodes
@@ -511,15 +684,17 @@ builder.add_node(
     "enter_book_car_rental",
     create_entry_node("Car Rental Assistant", "book_car_rental"),
 )
-builder.add_node("book_car_rental", Assistant(book_car_rental_runnable))
+builder.add_node(
+    "book_car_rental", Assistant(book_car_rental_prompt, book_car_rental_tools + [Escalate])
+)
 builder.add_edge("enter_book_car_rental", "book_car_rental")
 builder.add_node(
     "book_car_rental_safe_tools",
-    create_tool_node_with_fallback(book_car_rental_safe_tools),
+    create_tool_node_with_fallback(book_car_rental_safe_tools, node_class=PrefetchToolNode),
 )
 builder.add_node(
     "book_car_rental_sensitive_tools",
-    create_tool_node_with_fallback(book_car_rental_sensitive_tools),
+    create_tool_node_with_fallback(book_car_rental_sensitive_tools, node_class=PrefetchToolNode),
 )
 
 
@@ -558,7 +733,7 @@ builder.add_node(
     "enter_book_taxi",
     create_entry_node("Taxi Booking Assistant", "book_taxi"),
 )
-builder.add_node("book_taxi", Assistant(taxi_booking_runnable))
+builder.add_node("book_taxi", Assistant(taxi_booking_prompt, taxi_booking_tools + [Escalate]))
 builder.add_edge("enter_book_taxi", "book_taxi")
 builder.add_node(
     "book_taxi_safe_tools",
@@ -605,7 +780,7 @@ builder.add_node(
     "enter_book_trip",
     create_entry_node("Taxi Booking Assistant", "book_trip"),
 )
-builder.add_node("book_trip", Assistant(book_trip_runnable))
+builder.add_node("book_trip", Assistant(book_trip_prompt, book_trip_tools + [Escalate]))
 builder.add_edge("enter_book_trip", "book_trip")
 builder.add_node(
     "book_trip_safe_tools",
@@ -648,15 +823,15 @@ builder.add_conditional_edges(
 
 # Hotel booking assistant
 builder.add_node("enter_book_hotel", create_entry_node("Hotel Booking Assistant", "book_hotel"))
-builder.add_node("book_hotel", Assistant(book_hotel_runnable))
+builder.add_node("book_hotel", Assistant(book_hotel_prompt, book_hotel_tools + [Escalate]))
 builder.add_edge("enter_book_hotel", "book_hotel")
 builder.add_node(
     "book_hotel_safe_tools",
-    create_tool_node_with_fallback(book_hotel_safe_tools),
+    create_tool_node_with_fallback(book_hotel_safe_tools, node_class=PrefetchToolNode),
 )
 builder.add_node(
     "book_hotel_sensitive_tools",
-    create_tool_node_with_fallback(book_hotel_sensitive_tools),
+    create_tool_node_with_fallback(book_hotel_sensitive_tools, node_class=PrefetchToolNode),
 )
 
 
@@ -686,23 +861,27 @@ builder.add_conditional_edges(
 
 
 # Primary assistant
-builder.add_node("primary_assistant", Assistant(assistant_runnable))
+builder.add_node(
+    "primary_assistant", Assistant(primary_assistant_prompt, primary_assistant_bound_tools)
+)
 builder.add_node("primary_assistant_tools", create_tool_node_with_fallback(primary_assistant_tools))
 
 
-def route_primary_assistant(
-    state: State,
-):
+def route_primary_assistant(state: State, config: RunnableConfig):
     route = tools_condition(state)
     if route == END:
         return END
     tool_calls = state["messages"][-1].tool_calls
     if tool_calls:
+        # The searches these assistants usually start with run while they make their first
+        # model call.
         if tool_calls[0]["name"] == ToFlightBookingAssistant.__name__:
             return "enter_update_flight"
         elif tool_calls[0]["name"] == ToBookCarRental.__name__:
+            prefetch.start("book_car_rental", state, config)
             return "enter_book_car_rental"
         elif tool_calls[0]["name"] == ToHotelBookingAssistant.__name__:
+            prefetch.start("book_hotel", state, config)
             return "enter_book_hotel"
         elif tool_calls[0]["name"] == ToTaxiBookingAssistant.__name__:
             return "enter_book_taxi"
@@ -728,15 +907,58 @@ builder.add_conditional_edges(
 builder.add_edge("primary_assistant_tools", "primary_assistant")
 
 
+# Intent router
+def route_intent(state: State) -> dict:
+    """Hand a clear request straight to its specialized assistant.
+
+    This makes the handoff the primary assistant would have made, without the LLM call.
+    """
+    message = state["messages"][-1]
+    if not isinstance(message, HumanMessage):
+        return {}
+    handoff = classify_intent(message.text())
+    if handoff is None:
+        return {}
+    tool_call = {"name": handoff, "args": {"request": message.text()}, "id": f"route_{uuid4()}"}
+    return {"messages": AIMessage(content="", tool_calls=[tool_call])}
+
+
+def route_after_intent(state: State, config: RunnableConfig):
+    if isinstance(state["messages"][-1], AIMessage):
+        return route_primary_assistant(state, config)
+    return "primary_assistant"
+
+
+builder.add_node("route_intent", route_intent)
+builder.add_conditional_edges(
+    "route_intent",
+    route_after_intent,
+    [
+        "enter_update_flight",
+        "enter_book_car_rental",
+        "enter_book_hotel",
+        "enter_book_taxi",
+        "enter_book_trip",
+        "primary_assistant",
+    ],
+)
+
+
 def route_to_workflow(
     state: State,
 ) -> Literal[
-    "primary_assistant", "update_flight", "book_car_rental", "book_hotel", "book_taxi", "book_trip"
+    "route_intent",
+    "primary_assistant",
+    "update_flight",
+    "book_car_rental",
+    "book_hotel",
+    "book_taxi",
+    "book_trip",
 ]:
     """If we are in a delegated state, route directly to the appropriate assistant."""
     dialog_state = state.get("dialog_state")
     if not dialog_state:
-        return "primary_assistant"
+        return "route_intent" if settings.INTENT_ROUTER else "primary_assistant"
     return dialog_state[-1]
 
 
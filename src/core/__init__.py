@@ -1,4 +1,4 @@
-from core.llm import get_model
+from core.llm import get_bound_model, get_model
 from core.settings import settings
 
-__all__ = ["settings", "get_model"]
+__all__ = ["settings", "get_model", "get_bound_model"]
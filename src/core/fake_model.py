@@ -0,0 +1,9 @@
+from langchain_community.chat_models import FakeListChatModel
+
+
+class FakeToolModel(FakeListChatModel):
+    def __init__(self, responses: list[str]):
+        super().__init__(responses=responses)
+
+    def bind_tools(self, tools):
+        return self
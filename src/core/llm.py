@@ -1,14 +1,8 @@
+from collections.abc import Sequence
 from functools import cache
-from typing import TypeAlias
+from typing import TYPE_CHECKING, Any, TypeAlias
 
-from langchain_anthropic import ChatAnthropic
-from langchain_aws import ChatBedrock
-from langchain_community.chat_models import FakeListChatModel
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_vertexai import ChatVertexAI
-from langchain_groq import ChatGroq
-from langchain_ollama import ChatOllama
-from langchain_openai import AzureChatOpenAI, ChatOpenAI
+from langchain_core.runnables import Runnable
 
 from core.settings import settings
 from schema.models import (
@@ -40,25 +34,29 @@ _MODEL_TABLE = (
     | {m: m.value for m in FakeModelName}
 )
 
+# Provider SDKs are slow to import and a deployment only uses one or two of them, so each is
+# imported by get_model when a model of that provider is first requested.
+if TYPE_CHECKING:
+    from langchain_anthropic import ChatAnthropic
+    from langchain_aws import ChatBedrock
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain_google_vertexai import ChatVertexAI
+    from langchain_groq import ChatGroq
+    from langchain_ollama import ChatOllama
+    from langchain_openai import AzureChatOpenAI, ChatOpenAI
 
-class FakeToolModel(FakeListChatModel):
-    def __init__(self, responses: list[str]):
-        super().__init__(responses=responses)
-
-    def bind_tools(self, tools):
-        return self
-
+    from core.fake_model import FakeToolModel
 
 ModelT: TypeAlias = (
-    AzureChatOpenAI
-    | ChatOpenAI
-    | ChatAnthropic
-    | ChatGoogleGenerativeAI
-    | ChatVertexAI
-    | ChatGroq
-    | ChatBedrock
-    | ChatOllama
-    | FakeToolModel
+    "AzureChatOpenAI"
+    " | ChatOpenAI"
+    " | ChatAnthropic"
+    " | ChatGoogleGenerativeAI"
+    " | ChatVertexAI"
+    " | ChatGroq"
+    " | ChatBedrock"
+    " | ChatOllama"
+    " | FakeToolModel"
 )
 
 
@@ -74,10 +72,14 @@ def get_model(model_name: AllModelEnum, /) -> ModelT:
     # print(model_name in GroqModelName)
 
     if model_name in OpenAIModelName:
-        return ChatOpenAI(model=api_model_name, temperature=0.5, streaming=True)
+        from langchain_openai import ChatOpenAI
+
+        # stream_usage reports token usage, including cached prompt tokens, when streaming.
+        return ChatOpenAI(model=api_model_name, temperature=0.5, streaming=True, stream_usage=True)
     if model_name in OpenAICompatibleName:
         if not settings.COMPATIBLE_BASE_URL or not settings.COMPATIBLE_MODEL:
             raise ValueError("OpenAICompatible base url and endpoint must be configured")
+        from langchain_openai import ChatOpenAI
 
         return ChatOpenAI(
             model=settings.COMPATIBLE_MODEL,
@@ -89,6 +91,7 @@ def get_model(model_name: AllModelEnum, /) -> ModelT:
     if model_name in AzureOpenAIModelName:
         if not settings.AZURE_OPENAI_API_KEY or not settings.AZURE_OPENAI_ENDPOINT:
             raise ValueError("Azure OpenAI API key and endpoint must be configured")
+        from langchain_openai import AzureChatOpenAI
 
         return AzureChatOpenAI(
             azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
@@ -100,6 +103,8 @@ def get_model(model_name: AllModelEnum, /) -> ModelT:
             max_retries=3,
         )
     if model_name in DeepseekModelName:
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model=api_model_name,
             temperature=0.5,
@@ -108,21 +113,33 @@ def get_model(model_name: AllModelEnum, /) -> ModelT:
             api_key=settings.DEEPSEEK_API_KEY,
         )
     if model_name in AnthropicModelName:
+        from langchain_anthropic import ChatAnthropic
+
         return ChatAnthropic(
             model_name=api_model_name, temperature=0.5, streaming=True, timeout=60, stop=None
         )
     if model_name in GoogleModelName:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         return ChatGoogleGenerativeAI(model=api_model_name, temperature=0.5)
     if model_name in VertexAIModelName:
+        from langchain_google_vertexai import ChatVertexAI
+
         return ChatVertexAI(model=api_model_name, temperature=0.5, streaming=True)
     if model_name in GroqModelName:
+        from langchain_groq import ChatGroq
+
         if model_name == GroqModelName.LLAMA_GUARD_4_12B:
             return ChatGroq(model=api_model_name, temperature=0.0)
         # print("Hello")
         return ChatGroq(model=api_model_name, temperature=0.5)
     if model_name in AWSModelName:
+        from langchain_aws import ChatBedrock
+
         return ChatBedrock(model=api_model_name, temperature=0.5)
     if model_name in OllamaModelName:
+        from langchain_ollama import ChatOllama
+
         if settings.OLLAMA_BASE_URL:
             chat_ollama = ChatOllama(
                 model=settings.OLLAMA_MODEL,  # type: ignore
@@ -133,6 +150,28 @@ def get_model(model_name: AllModelEnum, /) -> ModelT:
             chat_ollama = ChatOllama(model=settings.OLLAMA_MODEL, temperature=0.5)  # type: ignore
         return chat_ollama
     if model_name in FakeModelName:
+        from core.fake_model import FakeToolModel
+
         return FakeToolModel(responses=["This is a test response from the fake model."])
 
     raise ValueError(f"Unsupported model: {model_name}")
+
+
+# Bound runnables by model and toolset identity. Each entry keeps its tools alive so that
+# their ids are not reused by other objects while the key is in use.
+_BOUND_MODELS: dict[tuple[AllModelEnum, tuple[int, ...]], tuple[tuple[Any, ...], Runnable]] = {}
+
+
+def get_bound_model(model_name: AllModelEnum, tools: Sequence[Any], /) -> Runnable:
+    """``get_model(model_name).bind_tools(tools)``, built once per model and toolset.
+
+    ``bind_tools`` converts every tool to a schema, so agents that honour the per-request
+    model look the bound runnable up here instead of binding on every turn. Toolsets are
+    matched by the identity of their tools.
+    """
+    key = (model_name, tuple(map(id, tools)))
+    entry = _BOUND_MODELS.get(key)
+    if entry is None:
+        bound = get_model(model_name).bind_tools(list(tools))
+        entry = _BOUND_MODELS.setdefault(key, (tuple(tools), bound))
+    return entry[1]
@@ -0,0 +1,27 @@
+import threading
+from collections import defaultdict
+
+# Process-wide counters for work that is otherwise invisible in responses, such as wasted
+# LLM calls. Served as JSON by the service's /metrics endpoint.
+_counters: defaultdict[str, float] = defaultdict(float)
+_lock = threading.Lock()
+
+
+def increment(name: str, amount: float = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0.0)
+
+
+def snapshot() -> dict[str, float]:
+    with _lock:
+        return dict(_counters)
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
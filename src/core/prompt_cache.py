@@ -0,0 +1,60 @@
+from typing import Any
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.prompt_values import PromptValue
+
+from core import metrics
+from schema.models import AllModelEnum, AnthropicModelName
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def mark_cache_prefix(model_name: AllModelEnum, prompt: PromptValue) -> list[BaseMessage]:
+    """The prompt's messages, with a cache breakpoint after the first system message.
+
+    Anthropic only caches up to an explicit ``cache_control`` marker, which covers the tool
+    schemas and the static instructions. OpenAI, DeepSeek, Groq and Gemini cache matching
+    prefixes on their own, so their prompts are left alone.
+    """
+    messages = prompt.to_messages()
+    if model_name not in AnthropicModelName or not isinstance(messages[0], SystemMessage):
+        return messages
+    first = messages[0]
+    blocks: list[dict[str, Any]]
+    if isinstance(first.content, str):
+        blocks = [{"type": "text", "text": first.content}]
+    else:
+        blocks = [
+            dict(block) if isinstance(block, dict) else {"type": "text", "text": block}
+            for block in first.content
+        ]
+    blocks[-1]["cache_control"] = CACHE_CONTROL
+    return [first.model_copy(update={"content": blocks}), *messages[1:]]
+
+
+def cached_input_tokens(message: AIMessage) -> int | None:
+    """Prompt tokens the provider read from its cache, or None if it reported no usage."""
+    usage = message.usage_metadata
+    if usage and "cache_read" in usage.get("input_token_details", {}):
+        return usage["input_token_details"]["cache_read"]
+    metadata = message.response_metadata
+    openai_details = metadata.get("token_usage", {}).get("prompt_tokens_details") or {}
+    if "cached_tokens" in openai_details:
+        return openai_details["cached_tokens"] or 0
+    anthropic_usage = metadata.get("usage") or {}
+    if "cache_read_input_tokens" in anthropic_usage:
+        return anthropic_usage["cache_read_input_tokens"] or 0
+    return 0 if usage else None
+
+
+def record_prompt_cache(message: AIMessage) -> None:
+    """Count prompt tokens and cache reads. The hit rate is cached_tokens / input_tokens."""
+    cached = cached_input_tokens(message)
+    if cached is None:
+        return
+    metrics.increment("prompt_cache.calls")
+    usage = message.usage_metadata
+    metrics.increment("prompt_cache.input_tokens", usage["input_tokens"] if usage else 0)
+    metrics.increment("prompt_cache.cached_tokens", cached)
+    if cached:
+        metrics.increment("prompt_cache.hits")
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from functools import cache, partial
+from typing import Any, Literal
+from uuid import uuid4
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from core import metrics
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CacheMode = Literal["exact", "similar"]
+
+
+class LRUCache:
+    """The ``max_entries`` most recently used entries, each kept for ``ttl`` seconds.
+
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def values(self) -> list[Any]:
+        """Every entry that hasn't expired, without marking any of them as used."""
+        now = self.clock()
+        with self._lock:
+            return [value for expires, value in self._entries.values() if expires > now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_responses = LRUCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL)
+# First-turn responses by the embedding of the user's message: (scope, vector, response).
+_first_turns = LRUCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL)
+
+
+def _text(content: str | list) -> str:
+    if isinstance(content, list):
+        content = " ".join(
+            block if isinstance(block, str) else block.get("text") or json.dumps(block)
+            for block in content
+        )
+    return " ".join(content.split()).casefold()
+
+
+def _normalized(message: BaseMessage) -> list:
+    """What the model sees of ``message``, ignoring ids, whitespace and case."""
+    calls = [(c["name"], c["args"]) for c in getattr(message, "tool_calls", None) or []]
+    return [message.type, getattr(message, "name", None), _text(message.content), calls]
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _tool_name(tool: Any) -> str:
+    return getattr(tool, "name", None) or getattr(tool, "__name__", None) or repr(tool)
+
+
+def has_booking_results(messages: Sequence[BaseMessage], tools: Sequence[Any]) -> bool:
+    """Whether the current turn has results of tools that may have changed something.
+
+    Only tools marked read-only (``metadata={"read_only": True}``) are known not to.
+    """
+    read_only = {
+        _tool_name(tool)
+        for tool in tools
+        if (getattr(tool, "metadata", None) or {}).get("read_only")
+    }
+    human = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+    turn = messages[human[-1] :] if human else messages
+    return any(isinstance(m, ToolMessage) and m.name not in read_only for m in turn)
+
+
+def _first_message(messages: Sequence[BaseMessage]) -> str | None:
+    """The user's message if ``messages`` is the first turn, before any model response."""
+    if not all(isinstance(m, SystemMessage | HumanMessage) for m in messages):
+        return None
+    human = [m for m in messages if isinstance(m, HumanMessage)]
+    return _text(human[0].content) if len(human) == 1 else None
+
+
+@cache
+def _embeddings(model: str) -> Embeddings:
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=model)
+
+
+def _most_similar(scope: str, vector: list[float]) -> AIMessage | None:
+    candidates = [(v, response) for s, v, response in _first_turns.values() if s == scope]
+    if not candidates:
+        return None
+    matrix = np.array([v for v, _ in candidates])
+    query = np.array(vector)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    scores = matrix @ query / np.maximum(norms, np.finfo(float).tiny)
+    best = int(np.argmax(scores))
+    return candidates[best][1] if scores[best] >= settings.RESPONSE_CACHE_SIMILARITY else None
+
+
+def _cacheable(response: Any) -> bool:
+    return (
+        isinstance(response, AIMessage)
+        and bool(response.content or response.tool_calls)
+        and not response.invalid_tool_calls
+    )
+
+
+def _replayed(response: AIMessage, tier: str) -> AIMessage:
+    """A copy of a cached response with new message and tool call ids, so that a thread can
+    receive the same response twice."""
+    metrics.increment(f"response_cache.{tier}_hits")
+    tool_calls = [{**call, "id": f"call_{uuid4().hex}"} for call in response.tool_calls]
+    additional_kwargs = {k: v for k, v in response.additional_kwargs.items() if k != "tool_calls"}
+    return response.model_copy(
+        update={
+            "id": None,
+            "tool_calls": tool_calls,
+            "additional_kwargs": additional_kwargs,
+            "response_metadata": {**response.response_metadata, "response_cache": tier},
+            "usage_metadata": None,
+        },
+        deep=True,
+    )
+
+
+class _Lookup:
+    """The cache keys of one model call."""
+
+    def __init__(self, mode: CacheMode, model_name: str, tools: Sequence[Any], messages: list):
+        names = sorted(map(_tool_name, tools))
+        self.key = _digest(model_name, names, [_normalized(m) for m in messages])
+        self.first_message = _first_message(messages) if mode == "similar" else None
+        system = [_normalized(m) for m in messages if isinstance(m, SystemMessage)]
+        self.scope = _digest(model_name, names, system)
+        self.vector: list[float] | None = None
+
+    def exact(self) -> AIMessage | None:
+        response = _responses.get(self.key)
+        return _replayed(response, "exact") if response else None
+
+    def similar(self) -> AIMessage | None:
+        response = _most_similar(self.scope, self.vector) if self.vector else None
+        return _replayed(response, "similar") if response else None
+
+    def store(self, response: Any) -> None:
+        metrics.increment("response_cache.misses")
+        if not _cacheable(response):
+            return
+        _responses.put(self.key, response)
+        # A tool call carries the arguments of this message, which a merely similar message
+        # (another order number, another day) must not receive, so only text is shared.
+        if self.vector and not response.tool_calls:
+            _first_turns.put(self.key, (self.scope, self.vector, response))
+
+
+def _embedding_failed() -> None:
+    # The similarity tier is an optimization; the model call goes ahead without it.
+    logger.warning("Embedding the first message for the response cache failed", exc_info=True)
+    metrics.increment("response_cache.embedding_errors")
+
+
+def _lookup(
+    mode: CacheMode, model_name: str, tools: Sequence[Any], messages: list
+) -> _Lookup | None:
+    if has_booking_results(messages, tools):
+        metrics.increment("response_cache.skipped")
+        return None
+    return _Lookup(mode, model_name, tools, messages)
+
+
+def _invoke(
+    messages: list,
+    config: RunnableConfig,
+    *,
+    mode: CacheMode,
+    model_name: str,
+    tools: Sequence[Any],
+    model: Runnable,
+) -> Any:
+    lookup = _lookup(mode, model_name, tools, messages)
+    if lookup is None:
+        return model.invoke(messages, config)
+    if response := lookup.exact():
+        return response
+    if lookup.first_message:
+        try:
+            embeddings = _embeddings(settings.RESPONSE_CACHE_EMBEDDING_MODEL)
+            lookup.vector = embeddings.embed_query(lookup.first_message)
+        except Exception:
+            _embedding_failed()
+        if response := lookup.similar():
+            return response
+    response = model.invoke(messages, config)
+    lookup.store(response)
+    return response
+
+
+async def _ainvoke(
+    messages: list,
+    config: RunnableConfig,
+    *,
+    mode: CacheMode,
+    model_name: str,
+    tools: Sequence[Any],
+    model: Runnable,
+) -> Any:
+    lookup = _lookup(mode, model_name, tools, messages)
+    if lookup is None:
+        return await model.ainvoke(messages, config)
+    if response := lookup.exact():
+        return response
+    if lookup.first_message:
+        try:
+            embeddings = _embeddings(settings.RESPONSE_CACHE_EMBEDDING_MODEL)
+            lookup.vector = await embeddings.aembed_query(lookup.first_message)
+        except Exception:
+            _embedding_failed()
+        if response := lookup.similar():
+            return response
+    response = await model.ainvoke(messages, config)
+    lookup.store(response)
+    return response
+
+
+def with_response_cache(
+    agent_id: str, model_name: str, tools: Sequence[Any], model: Runnable
+) -> Runnable:
+    """``model`` (bound to ``tools``) behind the response cache configured for ``agent_id``.
+
+    RESPONSE_CACHE maps agent ids to "exact", which reuses the response to the same model,
+    tools and messages (ignoring ids, whitespace and case), or "similar", which also reuses
+    the text response to a first message whose embedding is close enough to an earlier one.
+    If the embedding fails, the model is called as if there were no similar message.
+    Turns with results of tools that aren't read-only, such as bookings, are never cached.
+    Hits, misses and skips are counted in core.metrics.
+    """
+    mode = settings.RESPONSE_CACHE.get(agent_id)
+    if mode is None:
+        return model
+    return RunnableLambda(
+        partial(_invoke, mode=mode, model_name=model_name, tools=tools, model=model),
+        afunc=partial(_ainvoke, mode=mode, model_name=model_name, tools=tools, model=model),
+        name="ResponseCache",
+    )
@@ -1,6 +1,7 @@
 from enum import StrEnum
 from json import loads
-from typing import Annotated, Any
+from pathlib import Path
+from typing import Annotated, Any, Literal
 
 from dotenv import find_dotenv
 from pydantic import (
@@ -29,6 +30,9 @@ from schema.models import (
     VertexAIModelName,
 )
 
+# Where src/download_db.py puts the travel database, next to the agents package.
+DEFAULT_TRAVEL_DB_PATH = Path(__file__).resolve().parent.parent / "agents" / "db" / "travel.sqlite"
+
 
 class DatabaseType(StrEnum):
     SQLITE = "sqlite"
@@ -78,6 +82,55 @@ class Settings(BaseSettings):
 
     OPENWEATHERMAP_API_KEY: SecretStr | None = None
 
+    # The travel assistants re-prompt a model that returns an empty answer at most this many
+    # times, waiting ASSISTANT_REPROMPT_BACKOFF seconds before the first retry and twice as
+    # long before each next one, then try ASSISTANT_FALLBACK_MODEL once if it is set.
+    ASSISTANT_MAX_REPROMPTS: int = 2
+    ASSISTANT_REPROMPT_BACKOFF: float = 0.5
+    ASSISTANT_FALLBACK_MODEL: AllModelEnum | None = None  # type: ignore[assignment]
+
+    # Conversation history sent to the model: older turns are dropped to stay within
+    # HISTORY_MAX_TOKENS (0 keeps everything) and folded into a rolling summary written by
+    # HISTORY_SUMMARY_MODEL (the request's model if unset), and tool outputs before the
+    # current turn are cut to HISTORY_TOOL_OUTPUT_CHARS characters (0 keeps them whole).
+    HISTORY_MAX_TOKENS: int = 8000
+    HISTORY_TOOL_OUTPUT_CHARS: int = 2000
+    HISTORY_SUMMARIZE: bool = True
+    HISTORY_SUMMARY_MODEL: AllModelEnum | None = None  # type: ignore[assignment]
+
+    # Send clear requests ("book a hotel in Basel") straight to the travel sub-assistant
+    # without asking the primary assistant first. INTENT_CLASSIFIER is an optional
+    # "module:function" taking the message text and returning (handoff tool name or None,
+    # confidence), asked when the keyword rules can't tell.
+    INTENT_ROUTER: bool = True
+    INTENT_CLASSIFIER: str | None = None
+    INTENT_MIN_CONFIDENCE: float = 0.8
+
+    # When the travel assistant hands off to the hotel or car rental assistant, run the
+    # searches it usually starts with (hotels and cars at the arrival airport of the user's
+    # booked flight) while its first model call is in flight.
+    PREFETCH: bool = True
+
+    # Tool outputs are sent to the model as compact tables rather than JSON: empty columns
+    # are dropped, columns that are the same in every row are written once and timestamps
+    # are shortened. Tables are cut to TOOL_OUTPUT_MAX_ROWS rows (0 keeps them whole).
+    TOOL_OUTPUT_COMPACT: bool = True
+    TOOL_OUTPUT_MAX_ROWS: int = 20
+
+    # Reuse model responses, per agent (as JSON, e.g. {"research-assistant": "similar"}).
+    # "exact" matches the model, tools and messages; "similar" also matches a first message
+    # whose RESPONSE_CACHE_EMBEDDING_MODEL embedding has at least RESPONSE_CACHE_SIMILARITY
+    # cosine similarity to a cached one. Entries expire after RESPONSE_CACHE_TTL seconds.
+    RESPONSE_CACHE: dict[str, Literal["exact", "similar"]] = {}
+    RESPONSE_CACHE_TTL: float = 3600
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    RESPONSE_CACHE_SIMILARITY: float = 0.95
+
+    # Agents are compiled on first use. List agent ids here (as JSON) to compile them at
+    # startup instead, so the first request to them doesn't pay for it.
+    WARM_UP_AGENTS: list[str] = []
+
     LANGCHAIN_TRACING_V2: bool = False
     LANGCHAIN_PROJECT: str = "default"
     LANGCHAIN_ENDPOINT: Annotated[str, BeforeValidator(check_str_is_http)] = (
@@ -93,6 +146,15 @@ class Settings(BaseSettings):
     )  # Options: DatabaseType.SQLITE or DatabaseType.POSTGRES
     SQLITE_DB_PATH: str = "checkpoints.db"
 
+    # Travel database used by the travel agent tools. Defaults to DEFAULT_TRAVEL_DB_PATH.
+    TRAVEL_DB_PATH: str | None = None
+    # Only enable when nothing writes to the travel database (e.g. a read-only demo), so
+    # read connections can skip locking entirely.
+    TRAVEL_DB_IMMUTABLE: bool = False
+    # Threads that run travel database work for async tool calls. Each keeps its own read
+    # connection open.
+    TRAVEL_DB_WORKERS: int = 8
+
     # PostgreSQL Configuration
     POSTGRES_USER: str | None = None
     POSTGRES_PASSWORD: SecretStr | None = None
@@ -213,5 +275,24 @@ class Settings(BaseSettings):
     def is_dev(self) -> bool:
         return self.MODE == "dev"
 
+    def travel_db_path(self) -> Path:
+        """Absolute path of the travel database, independent of the working directory."""
+        if self.TRAVEL_DB_PATH:
+            return Path(self.TRAVEL_DB_PATH).expanduser().resolve()
+        return DEFAULT_TRAVEL_DB_PATH
+
+    def travel_db_uri(self, read_only: bool = False) -> str:
+        """SQLite ``file:`` URI for the travel database.
+
+        Neither mode creates the file if it is missing, so a wrong path fails on connect
+        instead of silently producing an empty database.
+        """
+        uri = self.travel_db_path().as_uri()
+        if not read_only:
+            return f"{uri}?mode=rw"
+        if self.TRAVEL_DB_IMMUTABLE:
+            return f"{uri}?mode=ro&immutable=1"
+        return f"{uri}?mode=ro"
+
 
 settings = Settings()
@@ -19,8 +19,8 @@ from langfuse.langchain import CallbackHandler
 from langgraph.pregel import Pregel
 from langgraph.types import Command, Interrupt
 
-from agents import DEFAULT_AGENT, get_agent, get_all_agent_info
-from core import settings
+from agents import DEFAULT_AGENT, get_agent, get_all_agent_info, set_agent_memory, warm_up
+from core import metrics, settings
 from memory import initialize_database, initialize_store
 from schema import (
     ChatHistory,
@@ -71,14 +71,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             if hasattr(store, "setup"):  # ignore: union-attr
                 await store.setup()
 
-            # Configure agents with both memory components
-            agents = get_all_agent_info()
-            for a in agents:
-                agent = get_agent(a.key)
-                # Set checkpointer for thread-scoped memory (conversation history)
-                agent.checkpointer = saver
-                # Set store for long-term memory (cross-conversation knowledge)
-                agent.store = store
+            # Give every agent both memory components: checkpointer for thread-scoped memory
+            # (conversation history), store for long-term cross-conversation knowledge.
+            # Agents compiled later, on their first request, get them too.
+            set_agent_memory(saver, store)
+            if settings.WARM_UP_AGENTS:
+                warm_up(settings.WARM_UP_AGENTS)
             yield
     except Exception as e:
         logger.error(f"Error during database/store initialization: {e}")
@@ -444,6 +442,12 @@ def history(input: ChatHistoryInput) -> ChatHistory:
         raise HTTPException(status_code=500, detail="Unexpected error")
 
 
+@router.get("/metrics")
+async def get_metrics() -> dict[str, float]:
+    """Counters of otherwise invisible work, such as re-prompted or fallback LLM calls."""
+    return metrics.snapshot()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -0,0 +1,143 @@
+import sqlite3
+
+import pytest
+
+from agents.tools import db
+
+# Minimal copy of the downloaded travel database layout.
+TRAVEL_SCHEMA = """
+CREATE TABLE flights (
+    flight_id INTEGER PRIMARY KEY, flight_no TEXT, scheduled_departure TEXT,
+    scheduled_arrival TEXT, departure_airport TEXT, arrival_airport TEXT, status TEXT,
+    aircraft_code TEXT, actual_departure TEXT, actual_arrival TEXT
+);
+CREATE TABLE tickets (
+    ticket_no TEXT, book_ref TEXT, passenger_id TEXT, flight_no TEXT, flight_id TEXT
+);
+CREATE TABLE ticket_flights (
+    ticket_no TEXT, flight_id INTEGER, fare_conditions TEXT, amount REAL
+);
+CREATE TABLE boarding_passes (
+    ticket_no TEXT, flight_id INTEGER, boarding_no INTEGER, seat_no TEXT
+);
+CREATE TABLE hotels (
+    id INTEGER PRIMARY KEY, name TEXT, location TEXT, price_tier TEXT,
+    checkin_date TEXT, checkout_date TEXT, booked INTEGER
+);
+CREATE TABLE hotel_bookings (
+    booking_id TEXT, hotel_id INTEGER, passenger_id TEXT, check_in_date TEXT,
+    check_out_date TEXT, room_type TEXT, num_guests INTEGER
+);
+CREATE TABLE car_rentals (
+    id INTEGER PRIMARY KEY, name TEXT, location TEXT, price_tier TEXT,
+    start_date TEXT, end_date TEXT, booked INTEGER
+);
+CREATE TABLE car_rental_bookings (
+    rental_id INTEGER, start_date TEXT, end_date TEXT, passenger_id TEXT
+);
+CREATE TABLE taxi (
+    id INTEGER PRIMARY KEY, name TEXT, vehicle_type TEXT, price_tier TEXT,
+    capacity INTEGER, location TEXT
+);
+CREATE TABLE taxi_bookings (
+    id TEXT, passenger_id TEXT, vehicle_type TEXT, pickup_time TEXT,
+    pickup_location TEXT, dropoff_location TEXT
+);
+CREATE TABLE trip_recommendations (
+    id INTEGER PRIMARY KEY, name TEXT, location TEXT, keywords TEXT, details TEXT,
+    booked INTEGER
+);
+"""
+
+FLIGHTS = [
+    (
+        1,
+        "LX0112",
+        "2024-05-01 07:30:00.000000+03:00",
+        "2024-05-01 09:00:00.000000+03:00",
+        "BSL",
+        "CDG",
+    ),
+    (
+        2,
+        "LX0112",
+        "2024-05-02 07:30:00.000000+03:00",
+        "2024-05-02 09:00:00.000000+03:00",
+        "BSL",
+        "CDG",
+    ),
+    (
+        3,
+        "LX0114",
+        "2024-05-02 23:30:00.000000+03:00",
+        "2024-05-03 01:00:00.000000+03:00",
+        "BSL",
+        "CDG",
+    ),
+    (
+        4,
+        "LX0200",
+        "2024-05-03 12:00:00.000000+03:00",
+        "2024-05-03 14:00:00.000000+03:00",
+        "CDG",
+        "BSL",
+    ),
+]
+
+HOTELS = [
+    (1, "Hilton Basel", "Basel", "Luxury"),
+    (2, "Marriott Zurich Hotel", "Zurich", "Upscale"),
+    (3, "Hyatt Regency Basel", "Basel", "Upper Upscale"),
+    (4, "Radisson Blu Lucerne", "Lucerne", "Midscale"),
+]
+
+TRIPS = [
+    (1, "Basel Minster", "Basel", "landmark, history"),
+    (2, "Kunstmuseum Basel", "Basel", "art, museum"),
+    (3, "Zurich Old Town", "Zurich", "history, architecture"),
+    (4, "Lucerne Wine Tasting", "Lucerne", "wine, food"),
+]
+
+
+@pytest.fixture
+def travel_db_path(tmp_path):
+    """A small travel database on disk."""
+    path = tmp_path / "travel.sqlite"
+    conn = sqlite3.connect(path)
+    conn.executescript(TRAVEL_SCHEMA)
+    conn.executemany(
+        "INSERT INTO flights (flight_id, flight_no, scheduled_departure, scheduled_arrival, "
+        "departure_airport, arrival_airport, status) VALUES (?, ?, ?, ?, ?, ?, 'Scheduled')",
+        FLIGHTS,
+    )
+    conn.executemany(
+        "INSERT INTO hotels (id, name, location, price_tier, booked) VALUES (?, ?, ?, ?, 0)",
+        HOTELS,
+    )
+    conn.executemany(
+        "INSERT INTO car_rentals (id, name, location, price_tier, booked) VALUES (?, ?, ?, ?, 0)",
+        [(1, "Europcar", "Basel", "Economy"), (2, "Avis", "Zurich", "Midscale")],
+    )
+    conn.executemany(
+        "INSERT INTO trip_recommendations (id, name, location, keywords, details, booked) "
+        "VALUES (?, ?, ?, ?, '', 0)",
+        TRIPS,
+    )
+    conn.executemany(
+        "INSERT INTO taxi (id, name, vehicle_type, price_tier, capacity, location) "
+        "VALUES (?, ?, ?, ?, 4, 'Basel')",
+        [(1, "City Cabs", "Sedan", "Economy"), (2, "Blacklane", "Sedan", "Luxury")]
+        + [(i, f"Van {i}", "Van", "Economy") for i in range(3, 30)],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def travel_pool(travel_db_path, monkeypatch):
+    """Point the shared travel database pool at the test database."""
+    pool = db.TravelDBPool(f"file:{travel_db_path}?mode=rw", f"file:{travel_db_path}?mode=ro")
+    monkeypatch.setattr(db, "_pool", pool)
+    yield pool
+    pool.close()
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from agents.travel_agent_support import GIVE_UP_MESSAGE, REPROMPT, Assistant
+from core import metrics, settings
+from schema.models import OpenAIModelName
+
+PROMPT = ChatPromptTemplate.from_messages([("placeholder", "{messages}")])
+STATE = {"messages": [("user", "hi")], "user_info": ""}
+
+
+@pytest.fixture
+def models():
+    """Fake bound models that answer with queued replies, recording each prompt."""
+    replies: dict[str, list[str]] = {}
+    prompts: list[tuple[str, int]] = []
+
+    def bound(model, tools):
+        def reply(messages):
+            prompts.append((model, len(messages)))
+            return AIMessage(content=replies[model].pop(0))
+
+        return RunnableLambda(reply)
+
+    metrics.reset()
+    with (
+        patch("agents.travel_agent_support.get_bound_model", bound),
+        patch.object(settings, "ASSISTANT_REPROMPT_BACKOFF", 0),
+        patch.object(settings, "ASSISTANT_MAX_REPROMPTS", 2),
+        patch.object(settings, "ASSISTANT_FALLBACK_MODEL", OpenAIModelName.GPT_4O),
+    ):
+        yield replies, prompts
+
+
+@pytest.mark.asyncio
+async def test_reprompts_until_the_model_answers(models):
+    replies, prompts = models
+    replies[OpenAIModelName.GPT_4O_MINI] = ["", "Hello!"]
+    config = {"configurable": {"model": OpenAIModelName.GPT_4O_MINI}}
+
+    result = await Assistant(PROMPT, []).ainvoke(STATE, config)
+    assert result["messages"].content == "Hello!"
+    # The re-prompt is only added to the retried call, not to the graph state.
+    assert prompts == [(OpenAIModelName.GPT_4O_MINI, 1), (OpenAIModelName.GPT_4O_MINI, 2)]
+    assert REPROMPT not in STATE["messages"]
+    assert metrics.snapshot() == {"assistant.empty_responses": 1, "assistant.reprompts": 1}
+
+
+def test_bounded_reprompts_then_fallback_then_give_up(models):
+    replies, prompts = models
+    replies[OpenAIModelName.GPT_4O_MINI] = ["", "", ""]
+    replies[OpenAIModelName.GPT_4O] = ["Fallback answer"]
+    config = {"configurable": {"model": OpenAIModelName.GPT_4O_MINI}}
+
+    result = Assistant(PROMPT, []).invoke(STATE, config)
+    assert result["messages"].content == "Fallback answer"
+    assert [model for model, _ in prompts] == [OpenAIModelName.GPT_4O_MINI] * 3 + [
+        OpenAIModelName.GPT_4O
+    ]
+    assert prompts[-1][1] == 1
+    assert metrics.snapshot() == {
+        "assistant.empty_responses": 3,
+        "assistant.reprompts": 2,
+        "assistant.fallbacks": 1,
+    }
+
+    replies[OpenAIModelName.GPT_4O_MINI] = ["", "", ""]
+    replies[OpenAIModelName.GPT_4O] = [""]
+    result = Assistant(PROMPT, []).invoke(STATE, config)
+    assert result["messages"].content == GIVE_UP_MESSAGE
+    assert metrics.snapshot()["assistant.exhausted"] == 1
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+import pytest
+
+from agents.tools.base import TravelDBTool
+from agents.tools.flight_tools import fetch_user_flight_information
+from agents.tools.hotel_tools import BookHotel, SearchHotel
+
+
+class WhichThread(TravelDBTool):
+    name: str = "which_thread"
+    description: str = "Report the thread the tool ran on."
+
+    def _run(self) -> str:
+        return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_arun_uses_db_thread_pool():
+    names = await asyncio.gather(*(WhichThread().ainvoke({}) for _ in range(20)))
+    assert all(name.startswith("travel-db") for name in names)
+
+
+@pytest.mark.asyncio
+async def test_async_tools_match_sync(travel_pool):
+    args = {"location": "Basel", "price_tier": "Luxury"}
+    assert await SearchHotel().ainvoke(args) == SearchHotel().invoke(args)
+
+
+@pytest.mark.asyncio
+async def test_async_tools_receive_config(travel_pool):
+    config = {"configurable": {"passenger_id": "3442 587242"}}
+    result = await BookHotel().ainvoke(
+        {"hotel_id": "1", "check_in_date": "2024-05-01", "check_out_date": "2024-05-03"},
+        config=config,
+    )
+    assert result.startswith("Hotel booked successfully")
+
+    itinerary = await fetch_user_flight_information.ainvoke({}, config=config)
+    assert itinerary["summary"]["total_hotels"] == 1
+
+    with pytest.raises(ValueError, match="No passenger ID configured"):
+        await fetch_user_flight_information.ainvoke({}, config={})
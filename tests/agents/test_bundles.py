@@ -0,0 +1,88 @@
+import pytest
+
+from agents.tools.bundles import PlanTrip, best_bundles
+
+
+def flight(flight_id: int, departs: str, arrives: str, cost: float, minutes: int = 90) -> dict:
+    return {
+        "legs": [{"flight_id": flight_id}],
+        "stops": 0,
+        "scheduled_departure": f"2024-05-01 {departs}:00+02:00",
+        "scheduled_arrival": f"2024-05-01 {arrives}:00+02:00",
+        "duration_minutes": minutes,
+        "estimated_cost": cost,
+    }
+
+
+def test_best_bundles_scores_and_respects_constraints():
+    outbound = [flight(1, "08:00", "09:30", 100), flight(2, "12:00", "13:30", 90)]
+    inbound = [flight(3, "11:00", "12:30", 100), flight(4, "18:00", "19:30", 120)]
+    hotels = [
+        {"id": 1, "estimated_cost": 200, "distance_km": 1},
+        {"id": 2, "estimated_cost": 150, "distance_km": 40},
+    ]
+    bundles = best_bundles(outbound, inbound, hotels, None, top_k=10)
+    pairs = [
+        (b["outbound"]["legs"][0]["flight_id"], b["return"]["legs"][0]["flight_id"])
+        for b in bundles
+    ]
+    # The 11:00 return leaves before the 12:00 outbound lands.
+    assert (2, 3) not in pairs
+    assert pairs[0] == (1, 3)
+    # Hotel 2 is cheaper but 40 km away, which costs more than the 50 saved.
+    assert bundles[0]["hotel"]["id"] == 1
+    assert bundles[0]["car"] is None
+    assert bundles[0]["estimated_total"] == 400
+
+    bundles = best_bundles(outbound, inbound, hotels, None, budget=360)
+    assert [b["estimated_total"] for b in bundles] == [350, 360]
+    assert all(b["within_budget"] for b in bundles)
+
+    bundles = best_bundles(outbound, inbound, hotels, None, budget=100, top_k=1)
+    assert bundles[0]["within_budget"] is False
+
+
+def test_plan_trip_one_way_with_hotel_and_car(travel_pool):
+    with travel_pool.write() as conn:
+        conn.execute("INSERT INTO ticket_flights VALUES ('T1', 4, 'Economy', 90)")
+
+    result = PlanTrip().invoke(
+        {"origin": "CDG", "destination": "BSL", "departure_date": "2024-05-03"}
+    )
+    assert result["options_found"] == {"outbound": 1, "hotels": 2, "cars": 1}
+    best = result["bundles"][0]
+    assert best["outbound"]["legs"][0]["flight_id"] == 4
+    assert best["hotel"]["id"] == 3
+    assert best["car"]["id"] == 1
+    # 90 fare, one night at an Upper Upscale hotel and one Economy car day.
+    assert best["estimated_total"] == 90 + 300 + 45
+    assert [b["hotel"]["id"] for b in result["bundles"]] == [3, 1]
+
+
+@pytest.mark.asyncio
+async def test_plan_trip_round_trip_skips_sold_out_flights(travel_pool):
+    args = {
+        "origin": "BSL",
+        "destination": "CDG",
+        "departure_date": "2024-05-01",
+        "return_date": "2024-05-03",
+        "include_car": False,
+    }
+    result = await PlanTrip().ainvoke(args)
+    assert result["options_found"] == {"outbound": 1, "hotels": 0, "return": 1}
+    best = result["bundles"][0]
+    assert (best["outbound"]["legs"][0]["flight_id"], best["return"]["legs"][0]["flight_id"]) == (
+        1,
+        4,
+    )
+    assert best["hotel"] is None
+    assert best["estimated_total"] == 300
+
+    with travel_pool.write() as conn:
+        conn.execute(
+            "INSERT INTO flight_inventory (flight_id, fare_conditions, capacity, booked) "
+            "VALUES (1, 'Economy', 1, 1)"
+        )
+    result = await PlanTrip().ainvoke(args)
+    assert result["options_found"]["outbound"] == 0
+    assert result["bundles"] == []
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from agents.tools.connections import FlightSchedule, Leg, find_connections
+from agents.tools.flight_tools import SearchConnectingFlights
+
+
+def leg(flight_id: int, origin: str, dest: str, departs: str, arrives: str) -> Leg:
+    dep, arr = f"2024-05-01 {departs}:00", f"2024-05-01 {arrives}:00"
+    return Leg(
+        datetime.fromisoformat(dep).timestamp(),
+        datetime.fromisoformat(arr).timestamp(),
+        flight_id,
+        f"XX{flight_id:04d}",
+        origin,
+        dest,
+        dep,
+        arr,
+    )
+
+
+SCHEDULE = FlightSchedule(
+    [
+        leg(1, "AAA", "BBB", "08:00", "09:00"),
+        # Leaves 15 minutes after flight 1 lands: too short a connection.
+        leg(2, "BBB", "DDD", "09:15", "10:00"),
+        leg(3, "BBB", "DDD", "10:00", "11:00"),
+        leg(4, "AAA", "DDD", "07:00", "12:00"),
+        leg(5, "AAA", "CCC", "08:00", "08:30"),
+        leg(6, "CCC", "BBB", "09:30", "10:00"),
+        leg(7, "BBB", "AAA", "10:00", "11:00"),
+        leg(8, "AAA", "DDD", "12:00", "13:00"),
+        leg(9, "BBB", "EEE", "10:00", "11:00"),
+        leg(10, "EEE", "DDD", "12:00", "12:30"),
+    ]
+)
+
+
+def flight_ids(connections) -> list[list[int]]:
+    return [[leg["flight_id"] for leg in c["legs"]] for c in connections]
+
+
+def test_connections_ranked_by_arrival():
+    connections = find_connections(SCHEDULE, "AAA", "DDD", "2024-05-01", "2024-05-02", limit=10)
+    assert flight_ids(connections) == [[1, 3], [4], [1, 9, 10], [8]]
+    assert connections[0]["stops"] == 1
+    assert connections[0]["duration_minutes"] == 180
+
+
+def test_connections_respect_minimum_connection_time():
+    connections = find_connections(
+        SCHEDULE, "AAA", "DDD", "2024-05-01", "2024-05-02", min_connection_minutes=10
+    )
+    assert flight_ids(connections)[0] == [1, 2]
+
+
+def test_connections_cap_legs_and_never_revisit():
+    connections = find_connections(SCHEDULE, "AAA", "DDD", "2024-05-01", "2024-05-02", max_legs=1)
+    assert flight_ids(connections) == [[4], [8]]
+    # AAA -> BBB -> AAA -> DDD would arrive at 13:00 but returns to the origin.
+    connections = find_connections(SCHEDULE, "AAA", "DDD", "2024-05-01", "2024-05-02")
+    assert [1, 7, 8] not in flight_ids(connections)
+
+
+def test_connections_first_leg_in_window():
+    connections = find_connections(
+        SCHEDULE, "AAA", "DDD", "2024-05-01 07:30", "2024-05-02", max_legs=2
+    )
+    assert flight_ids(connections) == [[1, 3], [8]]
+
+
+def test_search_connecting_flights_tool(travel_pool):
+    with travel_pool.write() as conn:
+        conn.executemany(
+            "INSERT INTO flights (flight_id, flight_no, scheduled_departure, scheduled_arrival, "
+            "departure_airport, arrival_airport, status) VALUES (?, ?, ?, ?, ?, ?, 'Scheduled')",
+            [
+                (
+                    10,
+                    "AF1000",
+                    "2024-05-01 09:15:00+03:00",
+                    "2024-05-01 10:15:00+03:00",
+                    "CDG",
+                    "ZRH",
+                ),
+                (
+                    11,
+                    "AF1100",
+                    "2024-05-01 10:30:00+03:00",
+                    "2024-05-01 11:30:00+03:00",
+                    "CDG",
+                    "ZRH",
+                ),
+            ],
+        )
+
+    connections = SearchConnectingFlights().invoke(
+        {"departure_airport": "BSL", "arrival_airport": "ZRH", "start_time": "2024-05-01"}
+    )
+    assert flight_ids(connections) == [[1, 11]]
+    assert connections[0]["scheduled_arrival"] == "2024-05-01 11:30:00+03:00"
@@ -0,0 +1,81 @@
+import json
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from agents.tools.encoding import encode, encode_rows, encode_tool_message, shorten_timestamp
+from agents.tools.error_handling import ConcurrentToolNode
+from agents.tools.hotel_tools import SearchHotel
+from agents.travel_agent_support import itinerary_prompt
+from core import settings
+
+FLIGHTS = [
+    {
+        "flight_id": n,
+        "flight_no": "LX0112",
+        "scheduled_departure": f"2024-05-0{n} 07:30:00.000000+03:00",
+        "status": "Scheduled",
+        "actual_departure": None,
+    }
+    for n in range(1, 5)
+]
+
+
+def test_shorten_timestamp():
+    assert shorten_timestamp("2024-05-01 07:30:00.000000+03:00") == "2024-05-01 07:30+03:00"
+    assert shorten_timestamp("2024-05-01T07:30:15Z") == "2024-05-01 07:30:15Z"
+    assert shorten_timestamp("2024-05-01") == "2024-05-01"
+    assert shorten_timestamp("Basel") == "Basel"
+
+
+def test_rows_drop_empty_and_constant_columns():
+    assert encode_rows(FLIGHTS, max_rows=3).splitlines() == [
+        "all rows: flight_no=LX0112; status=Scheduled",
+        "flight_id|scheduled_departure",
+        "1|2024-05-01 07:30+03:00",
+        "2|2024-05-02 07:30+03:00",
+        "3|2024-05-03 07:30+03:00",
+        "... 1 more available",
+    ]
+    # A single row keeps all its non-empty columns.
+    assert encode_rows(FLIGHTS[:1]).splitlines() == [
+        "flight_id|flight_no|scheduled_departure|status",
+        "1|LX0112|2024-05-01 07:30+03:00|Scheduled",
+    ]
+    assert encode_rows([]) == "(no results)"
+    assert encode_rows([{"name": "a|b"}]).splitlines()[1] == '"a|b"'
+
+
+def test_nested_outputs():
+    itinerary = {"flights": FLIGHTS[:1], "hotels": [], "summary": {"total_flights": 1}}
+    assert encode(itinerary).splitlines() == [
+        "flights:",
+        "  flight_id|flight_no|scheduled_departure|status",
+        "  1|LX0112|2024-05-01 07:30+03:00|Scheduled",
+        "hotels: (none)",
+        "summary:",
+        "  total_flights: 1",
+    ]
+    message = ToolMessage(content="Hotel booked", tool_call_id="1")
+    assert encode_tool_message(message) is message
+
+
+def test_tool_node_sends_compact_output(travel_pool):
+    call = {"name": "search_hotel", "args": {"location": "Basel"}, "id": "call1"}
+    state = {"messages": [AIMessage(content="", tool_calls=[call])]}
+    node = ConcurrentToolNode([SearchHotel()])
+
+    [message] = node.invoke(state)["messages"]
+    assert message.content.startswith("all rows: location=Basel; booked=0")
+    with patch.object(settings, "TOOL_OUTPUT_COMPACT", False):
+        [message] = node.invoke(state)["messages"]
+    assert message.content.startswith('[{"id": 1')
+
+
+def test_itinerary_prompt_is_compact():
+    itinerary = {"flights": FLIGHTS, "hotels": [], "summary": {"total_flights": 4}}
+    text = itinerary_prompt(itinerary)
+    assert text.startswith("flights:\n  all rows: flight_no=LX0112; status=Scheduled")
+    assert "2024-05-01 07:30+03:00" in text and "hotels: (none)" in text
+    with patch.object(settings, "TOOL_OUTPUT_COMPACT", False):
+        assert json.loads(itinerary_prompt(itinerary)) == itinerary
@@ -0,0 +1,77 @@
+from agents.tools.flight_tools import SearchFlightCalendar, build_calendar_query
+
+
+def calendar(conn, day: str) -> dict | None:
+    row = conn.execute(
+        "SELECT flights, first_departure, last_departure, min_fare_economy, min_fare_business "
+        "FROM flight_calendar WHERE departure_airport = 'BSL' AND arrival_airport = 'CDG' "
+        "AND day = ?",
+        (day,),
+    ).fetchone()
+    return row and dict(zip(["flights", "first", "last", "economy", "business"], row, strict=True))
+
+
+def test_calendar_built_from_existing_flights(travel_pool):
+    with travel_pool.read() as conn:
+        assert calendar(conn, "2024-05-01")["flights"] == 1
+        may_2 = calendar(conn, "2024-05-02")
+    assert may_2["flights"] == 2
+    assert may_2["first"].startswith("2024-05-02 07:30")
+    assert may_2["last"].startswith("2024-05-02 23:30")
+    assert may_2["economy"] is None
+
+
+def test_calendar_follows_fares_and_flight_changes(travel_pool):
+    with travel_pool.write() as conn:
+        conn.executemany(
+            "INSERT INTO ticket_flights VALUES (?, ?, ?, ?)",
+            [("T1", 2, "Economy", 100), ("T2", 2, "Business", 500), ("T3", 3, "Economy", 80)],
+        )
+        assert calendar(conn, "2024-05-02")["economy"] == 80
+        assert calendar(conn, "2024-05-02")["business"] == 500
+
+        conn.execute("UPDATE flights SET status = 'Cancelled' WHERE flight_id = 3")
+        assert calendar(conn, "2024-05-02")["flights"] == 1
+        assert calendar(conn, "2024-05-02")["economy"] == 100
+
+        # Moving a ticket to another flight refreshes both days.
+        conn.execute("UPDATE ticket_flights SET flight_id = 1 WHERE ticket_no = 'T2'")
+        assert calendar(conn, "2024-05-02")["business"] is None
+        assert calendar(conn, "2024-05-01")["business"] == 500
+
+        conn.execute(
+            "INSERT INTO flights (flight_id, flight_no, scheduled_departure, departure_airport, "
+            "arrival_airport, status) VALUES (5, 'LX0116', '2024-05-05 10:00:00+03:00', "
+            "'BSL', 'CDG', 'Scheduled')"
+        )
+        assert calendar(conn, "2024-05-05")["flights"] == 1
+        conn.execute("DELETE FROM flights WHERE flight_id = 5")
+        assert calendar(conn, "2024-05-05") is None
+
+
+def test_calendar_query_uses_primary_key(travel_pool):
+    query, params = build_calendar_query("BSL", "CDG", "2024-05-01")
+    assert params == ["BSL", "CDG", "2024-05-01", "2024-05-31"]
+    assert build_calendar_query("BSL", "CDG", "2024-05-01", "2024-12-31")[1][3] == "2024-07-01"
+    with travel_pool.read() as conn:
+        plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+    assert "PRIMARY KEY" in plan
+
+
+def test_search_flight_calendar_tool(travel_pool):
+    days = SearchFlightCalendar().invoke(
+        {"departure_airport": "BSL", "arrival_airport": "CDG", "start_date": "2024-05-01"}
+    )
+    assert [(day["day"], day["flights"]) for day in days] == [
+        ("2024-05-01", 1),
+        ("2024-05-02", 2),
+    ]
+    days = SearchFlightCalendar().invoke(
+        {
+            "departure_airport": "BSL",
+            "arrival_airport": "CDG",
+            "start_date": "2024-05-02",
+            "end_date": "2024-05-02",
+        }
+    )
+    assert [day["day"] for day in days] == ["2024-05-02"]
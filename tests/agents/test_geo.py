@@ -0,0 +1,81 @@
+import pytest
+
+from agents.tools.car_rental_tools import SearchCarRental
+from agents.tools.geo import bounding_box, build_nearby_query, distance_km
+from agents.tools.hotel_tools import SearchHotel
+from agents.tools.taxi_tools import BookTaxi, SearchTaxi
+
+CONFIG = {"configurable": {"passenger_id": "3442 587242"}}
+
+
+def test_distance_and_bounding_box():
+    assert distance_km(47.5896, 7.5299, 47.4647, 8.5492) == pytest.approx(77.6, abs=0.5)
+    assert distance_km(47.5, None, 47.5, 7.5) is None
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(47.5896, 7.5299, 10)
+    assert min_lat < 47.5 < max_lat and min_lon < 7.45 and 7.6 < max_lon
+    assert bounding_box(89.9, 0, 50)[2:] == [-180.0, 180.0]
+    assert bounding_box(0, 179.99, 50)[2:] == [-180.0, 180.0]
+
+
+def test_migration_places_rows_at_their_city(travel_pool):
+    with travel_pool.write() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM hotels_geo").fetchone()[0] == 4
+        conn.execute("INSERT INTO hotels (id, name, location) VALUES (5, 'Beau-Rivage', 'Geneva')")
+        conn.execute(
+            "INSERT INTO hotels (id, name, location) VALUES (6, 'Nowhere Inn', 'Atlantis')"
+        )
+        rows = conn.execute("SELECT id, min_lat FROM hotels_geo WHERE id > 4").fetchall()
+        assert [(id_, round(lat, 2)) for id_, lat in rows] == [(5, 46.2)]
+
+        conn.execute("UPDATE hotels SET latitude = 47.0, longitude = 8.0 WHERE id = 6")
+        conn.execute("DELETE FROM hotels WHERE id = 5")
+        assert [row[0] for row in conn.execute("SELECT id FROM hotels_geo WHERE id > 4")] == [6]
+
+
+def test_nearby_query_uses_rtree(travel_pool):
+    query, params = build_nearby_query("hotels", 47.5896, 7.5299, 5, filters={"price_tier": "x"})
+    with travel_pool.read() as conn:
+        plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+    assert "VIRTUAL TABLE INDEX" in plan
+
+
+def test_search_hotel_within_radius_of_airport(travel_pool):
+    hotels = SearchHotel().invoke({"near": "BSL", "radius_km": 10})
+    assert [hotel["id"] for hotel in hotels] == [1, 3]
+    assert hotels[0]["distance_km"] == pytest.approx(5.5, abs=0.5)
+    assert SearchHotel().invoke({"near": "bsl", "radius_km": 5}) == []
+
+    hotels = SearchHotel().invoke({"near": "Basel", "radius_km": 10, "name": "hyatt"})
+    assert [hotel["id"] for hotel in hotels] == [3]
+
+
+def test_search_nearest_without_radius(travel_pool):
+    hotels = SearchHotel().invoke({"near": "ZRH", "limit": 2})
+    assert [hotel["id"] for hotel in hotels] == [2, 4]
+
+    rentals = SearchCarRental().invoke({"near": "Zurich, Switzerland", "limit": 1})
+    assert [rental["id"] for rental in rentals] == [2]
+
+    with pytest.raises(ValueError, match="Unknown location"):
+        SearchHotel().invoke({"near": "Atlantis"})
+
+
+def test_taxi_search_and_booking_use_pickup_point(travel_pool):
+    taxis = SearchTaxi().invoke({"pickup_location": "BSL", "vehicle_type": "sedan"})
+    assert [taxi["id"] for taxi in taxis] == [1, 2]
+    assert all(taxi["distance_km"] < 10 for taxi in taxis)
+
+    args = {
+        "vehicle_type": "Sedan",
+        "pickup_time": "2024-05-01 10:00",
+        "pickup_location": "BSL",
+        "dropoff_location": "Basel",
+    }
+    BookTaxi().invoke(args, CONFIG)
+    BookTaxi().invoke({**args, "pickup_location": "Hotel lobby"}, CONFIG)
+    with travel_pool.read() as conn:
+        points = conn.execute(
+            "SELECT pickup_latitude, pickup_longitude FROM taxi_bookings ORDER BY rowid"
+        ).fetchall()
+    assert points == [(47.5896, 7.5299), (None, None)]
@@ -0,0 +1,88 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from agents import history
+from agents.history import window, windowed_history
+from core import metrics, settings
+
+
+def turn(n: int, output_chars: int = 4000) -> list:
+    """A turn with a tool call whose output is ``output_chars`` long."""
+    return [
+        HumanMessage(content=f"question {n}", id=f"h{n}"),
+        AIMessage(
+            content="",
+            id=f"a{n}",
+            tool_calls=[{"name": "search", "args": {}, "id": f"call{n}"}],
+        ),
+        ToolMessage(content="x" * output_chars, tool_call_id=f"call{n}", id=f"t{n}"),
+        AIMessage(content=f"answer {n}", id=f"r{n}"),
+    ]
+
+
+@pytest.fixture
+def budget():
+    with (
+        patch.object(settings, "HISTORY_MAX_TOKENS", 2000),
+        patch.object(settings, "HISTORY_TOOL_OUTPUT_CHARS", 500),
+        patch.object(settings, "HISTORY_SUMMARIZE", True),
+        patch.object(settings, "HISTORY_SUMMARY_MODEL", None),
+    ):
+        yield
+
+
+def test_window_keeps_whole_turns_and_the_latest_one():
+    messages = turn(1, 100) + turn(2, 100) + turn(3, 20_000)
+    dropped, kept = window(messages, 3000)
+    # The latest turn is over budget on its own, but is always sent.
+    assert [m.id for m in kept] == ["h3", "a3", "t3", "r3"]
+    assert dropped == messages[:8]
+
+    dropped, kept = window(messages[:8], 3000)
+    assert dropped == [] and kept == messages[:8]
+
+
+def test_prompt_size_stays_flat_as_the_thread_grows(budget):
+    sizes = []
+    for turns in (5, 50, 500):
+        messages = [m for n in range(turns) for m in turn(n)]
+        window_messages, update = windowed_history({"messages": messages}, {})
+        sizes.append(count_tokens_approximately(window_messages))
+        assert update == {}
+        # Older tool outputs are truncated, the latest one is kept whole.
+        tools = [m for m in window_messages if isinstance(m, ToolMessage)]
+        assert len(tools[-1].content) == 4000
+        assert all(len(m.content) < 600 for m in tools[:-1])
+    assert sizes[0] <= sizes[1] == sizes[2] <= 2000
+
+
+@pytest.mark.asyncio
+async def test_rolling_summary_is_stored_in_state(budget):
+    config = {"configurable": {"thread_id": "thread-1"}}
+    state = {"messages": [m for n in range(40) for m in turn(n)]}
+    summarizer = FakeListChatModel(responses=["User asked 40 questions."])
+    metrics.reset()
+    with patch("agents.history.get_model", return_value=summarizer):
+        messages, update = windowed_history(state, config)
+        assert update == {} and not isinstance(messages[0], SystemMessage)
+        await asyncio.gather(*history._tasks)
+
+        messages, update = windowed_history(state, config)
+    assert update["summary"] == "User asked 40 questions."
+    last_dropped = update["summarized_until"]
+    assert last_dropped.startswith("r") and last_dropped != "r39"
+    assert messages[0].content.endswith("User asked 40 questions.")
+    assert metrics.snapshot()["history.summaries"] == 1
+
+    # With the summary in state, nothing new needs summarizing until more turns drop out.
+    state.update(update)
+    with patch("agents.history.get_model") as get_model:
+        messages, update = windowed_history(state, config)
+        assert update == {} and not history._tasks
+    get_model.assert_not_called()
+    assert isinstance(messages[0], SystemMessage)
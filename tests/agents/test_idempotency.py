@@ -0,0 +1,89 @@
+import pytest
+
+from agents.tools.flight_tools import BookFlight
+from agents.tools.hotel_tools import BookHotel
+from agents.tools.taxi_tools import BookTaxi
+from agents.tools.trip_recommendations import book_trip, cancel_trip
+
+CONFIG = {"configurable": {"passenger_id": "3442 587242"}}
+HOTEL_ARGS = {"hotel_id": "1", "check_in_date": "2024-05-01", "check_out_date": "2024-05-03"}
+
+
+def tool_call(tool, args, call_id):
+    return {"name": tool.name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+def count(pool, table):
+    with pool.read() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_tool_call_id_is_hidden_from_the_model():
+    for tool in (BookFlight(), BookHotel(), BookTaxi(), book_trip):
+        assert "tool_call_id" not in tool.tool_call_schema.model_json_schema()["properties"]
+
+
+def test_repeated_tool_call_writes_once(travel_pool):
+    first = BookHotel().invoke(tool_call(BookHotel(), HOTEL_ARGS, "call_1"), CONFIG)
+    again = BookHotel().invoke(tool_call(BookHotel(), HOTEL_ARGS, "call_1"), CONFIG)
+    assert first.content == again.content
+    assert count(travel_pool, "hotel_bookings") == 1
+
+    with travel_pool.read() as conn:
+        (booking_id,) = conn.execute("SELECT booking_id FROM hotel_bookings").fetchone()
+    assert first.content == f"Hotel booked successfully with booking ID: {booking_id}"
+
+    BookHotel().invoke(tool_call(BookHotel(), HOTEL_ARGS, "call_2"), CONFIG)
+    assert count(travel_pool, "hotel_bookings") == 2
+
+
+def test_failed_write_is_not_recorded(travel_pool):
+    args = {"flight_no": "LX0999", "departure": "2024-05-01"}
+    for _ in range(2):
+        with pytest.raises(ValueError, match="not found"):
+            BookFlight().invoke(tool_call(BookFlight(), args, "call_1"), CONFIG)
+    assert count(travel_pool, "tool_results") == 0
+
+    args["flight_no"] = "LX0112"
+    result = BookFlight().invoke(tool_call(BookFlight(), args, "call_1"), CONFIG)
+    with travel_pool.read() as conn:
+        (ticket_no,) = conn.execute("SELECT ticket_no FROM tickets").fetchone()
+    assert result.content == f"Flight booked successfully with ticket no: {ticket_no}"
+    assert count(travel_pool, "tool_results") == 1
+
+
+def test_plain_invoke_still_writes(travel_pool):
+    args = {
+        "vehicle_type": "Sedan",
+        "pickup_time": "2024-05-01 10:00",
+        "pickup_location": "BSL",
+        "dropoff_location": "Basel",
+    }
+    BookTaxi().invoke(args, CONFIG)
+    BookTaxi().invoke(args, CONFIG)
+    assert count(travel_pool, "taxi_bookings") == 2
+    assert count(travel_pool, "tool_results") == 0
+
+
+def test_trip_bookings_are_per_passenger(travel_pool):
+    other = {"configurable": {"passenger_id": "8149 604011"}}
+    first = book_trip.invoke({"recommendation_id": 2}, CONFIG)
+    assert book_trip.invoke({"recommendation_id": 2}, CONFIG) == first
+    book_trip.invoke({"recommendation_id": 2}, other)
+    assert count(travel_pool, "trip_bookings") == 2
+
+    cancel_trip.invoke({"recommendation_id": 2}, other)
+    with travel_pool.read() as conn:
+        passengers = conn.execute("SELECT passenger_id FROM trip_bookings").fetchall()
+        (booked,) = conn.execute("SELECT booked FROM trip_recommendations WHERE id = 2").fetchone()
+    assert passengers == [("3442 587242",)]
+    assert booked == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_async_tool_call_writes_once(travel_pool):
+    call = tool_call(book_trip, {"recommendation_id": 1}, "call_1")
+    first = await book_trip.ainvoke(call, CONFIG)
+    again = await book_trip.ainvoke(call, CONFIG)
+    assert first.content == again.content
+    assert count(travel_pool, "tool_results") == 1
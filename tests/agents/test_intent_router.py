@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents.intent_router import classify_by_rules, classify_intent, record_llm_handoff
+from agents.travel_agent_support import workflow
+from core import metrics, settings
+from schema.models import FakeModelName
+
+
+@pytest.mark.parametrize(
+    ("text", "intent"),
+    [
+        ("Can you book me a hotel in Basel for two nights?", "ToHotelBookingAssistant"),
+        ("I need to change my flight to Friday", "ToFlightBookingAssistant"),
+        ("I'd like to rent a car at the airport", "ToBookCarRental"),
+        ("Get me a taxi to the hotel lobby", None),  # a taxi and a hotel
+        ("Find some excursions in Lucerne", "ToTripBookingAssistant"),
+        ("Book a flight to Paris and a hotel near the airport", None),
+        ("Is my flight on time?", None),
+        ("Hello!", None),
+    ],
+)
+def test_rules(text, intent):
+    assert classify_by_rules(text)[0] == intent
+
+
+def test_classifier_fallback_and_metrics():
+    metrics.reset()
+    record_llm_handoff(1.5)
+    record_llm_handoff(0.5)
+    assert classify_intent("Please book a hotel in Zurich") == "ToHotelBookingAssistant"
+
+    model = lambda text: ("ToTaxiBookingAssistant", 0.95 if "airport" in text else 0.5)  # noqa: E731
+    with (
+        patch.object(settings, "INTENT_CLASSIFIER", "local:model"),
+        patch("agents.intent_router._load_classifier", return_value=model),
+    ):
+        assert classify_intent("How do I get from the airport?") == "ToTaxiBookingAssistant"
+        assert classify_intent("How do I get there?") is None
+
+    counters = metrics.snapshot()
+    assert counters["intent_router.turns"] == 3
+    assert counters["intent_router.hits"] == 2
+    assert counters["intent_router.seconds_saved"] == 2.0
+
+
+def test_clear_request_skips_the_primary_assistant(travel_pool):
+    config = {
+        "configurable": {
+            "thread_id": "intent-router",
+            "passenger_id": "3442 587242",
+            "model": FakeModelName.FAKE,
+        }
+    }
+    result = workflow.invoke(
+        {"messages": [HumanMessage(content="Please book a hotel in Basel")]}, config
+    )
+    human, handoff, entry, answer = result["messages"]
+    assert handoff.tool_calls[0]["name"] == "ToHotelBookingAssistant"
+    assert handoff.tool_calls[0]["args"] == {"request": "Please book a hotel in Basel"}
+    assert isinstance(entry, ToolMessage) and entry.tool_call_id == handoff.tool_calls[0]["id"]
+    assert isinstance(answer, AIMessage) and answer.content
+    assert result["dialog_state"] == ["book_hotel"]
+
+    result = workflow.invoke(
+        {"messages": [HumanMessage(content="Thanks!")]},
+        {**config, "configurable": {**config["configurable"], "thread_id": "no-intent"}},
+    )
+    assert [type(m) for m in result["messages"]] == [HumanMessage, AIMessage]
+    assert not result.get("dialog_state")
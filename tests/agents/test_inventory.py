@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.tools import inventory
+from agents.tools.car_rental_tools import BookCarRental, CancelCarRental
+from agents.tools.flight_tools import BookFlight, UpdateFlight
+from agents.tools.hotel_tools import BookHotel, CancelHotelBooking
+from agents.tools.inventory import (
+    SoldOut,
+    confirm_hold,
+    hold_rooms,
+    hold_seats,
+    release_expired,
+    seats_left,
+    stay_days,
+)
+
+CONFIG = {"configurable": {"passenger_id": "3442 587242"}}
+
+
+@pytest.fixture
+def small_flights(monkeypatch):
+    monkeypatch.setattr(inventory, "DEFAULT_SEATS", {"Economy": 3, "Business": 1})
+
+
+def nights_booked(pool, hotel_id):
+    with pool.read() as conn:
+        rows = conn.execute(
+            "SELECT night, booked FROM room_inventory WHERE hotel_id = ? ORDER BY night",
+            (hotel_id,),
+        )
+        return dict(rows.fetchall())
+
+
+def test_stay_days():
+    assert stay_days("2024-05-01", "2024-05-03") == ["2024-05-01", "2024-05-02"]
+    assert stay_days("2024-05-01T10:00", "2024-05-01T18:00") == ["2024-05-01"]
+    with pytest.raises(ValueError):
+        stay_days("2024-05-03", "2024-05-01")
+
+
+def test_seats_sell_out(travel_pool, small_flights):
+    with travel_pool.write() as conn:
+        hold_seats(conn, 1, "business")
+        with pytest.raises(SoldOut, match="No Business seats left on flight 1"):
+            hold_seats(conn, 1, "Business")
+        hold_seats(conn, 1, None, quantity=3)
+        assert seats_left(conn, 1, "Economy") == 0
+
+
+def test_sold_out_stay_leaves_other_nights_untouched(travel_pool, monkeypatch):
+    monkeypatch.setattr(inventory, "DEFAULT_ROOMS_PER_NIGHT", 1)
+    with travel_pool.write() as conn:
+        hold_rooms(conn, 1, "2024-05-02", "2024-05-03")
+        with pytest.raises(SoldOut):
+            hold_rooms(conn, 1, "2024-05-01", "2024-05-04")
+    assert nights_booked(travel_pool, 1) == {"2024-05-01": 0, "2024-05-02": 1, "2024-05-03": 0}
+
+
+def test_holds_expire(travel_pool, small_flights):
+    with travel_pool.write() as conn:
+        hold_id = hold_seats(conn, 2, quantity=3, ttl=60)
+        assert seats_left(conn, 2) == 0
+        assert release_expired(conn, now=0) == 0
+        assert release_expired(conn, now=2e9) == 1
+        assert seats_left(conn, 2) == 3
+        with pytest.raises(ValueError, match="expired"):
+            confirm_hold(conn, hold_id)
+
+        hold_id = hold_seats(conn, 2, ttl=60)
+        confirm_hold(conn, hold_id, "TICKET")
+        assert release_expired(conn, now=2e9) == 0
+        assert seats_left(conn, 2) == 2
+
+
+def test_concurrent_bookings_never_oversell(travel_pool, small_flights):
+    args = {"flight_no": "LX0112", "departure": "2024-05-01", "fare_conditions": "Economy"}
+
+    def book(i):
+        call = {"name": "book_flight", "args": args, "id": f"call_{i}", "type": "tool_call"}
+        try:
+            BookFlight().invoke(call, CONFIG)
+            return True
+        except SoldOut:
+            return False
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(book, range(20)))
+
+    assert results.count(True) == 3
+    with travel_pool.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0] == 3
+        assert seats_left(conn, 1) == 0
+
+
+def test_hotel_booking_reserves_and_cancel_releases(travel_pool):
+    BookHotel().invoke(
+        {"hotel_id": "2", "check_in_date": "2024-05-01", "check_out_date": "2024-05-03"}, CONFIG
+    )
+    assert nights_booked(travel_pool, 2) == {"2024-05-01": 1, "2024-05-02": 1}
+
+    CancelHotelBooking().invoke({"hotel_id": "2"}, CONFIG)
+    assert nights_booked(travel_pool, 2) == {"2024-05-01": 0, "2024-05-02": 0}
+
+
+def test_car_windows_do_not_overlap(travel_pool):
+    def book(start, end):
+        return BookCarRental().invoke(
+            {"rental_id": "1", "start_date": start, "end_date": end}, CONFIG
+        )
+
+    book("2024-05-01", "2024-05-04")
+    with pytest.raises(SoldOut, match="Car rental 1 is not available"):
+        book("2024-05-03", "2024-05-05")
+    assert book("2024-05-04", "2024-05-05") == "Car rental 1 successfully booked."
+
+    CancelCarRental().invoke({"rental_id": "1"}, CONFIG)
+    book("2024-05-02", "2024-05-03")
+
+
+def test_tools_reject_ids_that_are_not_numbers(travel_pool):
+    with pytest.raises(ValueError, match="Invalid hotel ID 'Hilton Basel': expected a number"):
+        BookHotel().invoke(
+            {
+                "hotel_id": "Hilton Basel",
+                "check_in_date": "2024-05-01",
+                "check_out_date": "2024-05-03",
+            },
+            CONFIG,
+        )
+    with pytest.raises(ValueError, match="Invalid rental ID 'abc'"):
+        CancelCarRental().invoke({"rental_id": "abc"}, CONFIG)
+
+
+def test_flight_change_moves_the_seat(travel_pool, small_flights):
+    with travel_pool.write() as conn:
+        conn.execute(
+            "INSERT INTO flights (flight_id, flight_no, scheduled_departure, scheduled_arrival, "
+            "departure_airport, arrival_airport, status) VALUES (9, 'LX0116', "
+            "'2099-05-01 07:30:00.000000+03:00', '2099-05-01 09:00:00.000000+03:00', 'BSL', "
+            "'CDG', 'Scheduled')"
+        )
+        conn.execute(
+            "INSERT INTO tickets (ticket_no, book_ref, passenger_id, flight_no, flight_id) "
+            "VALUES ('T1', 'B1', ?, 'LX0112', 1)",
+            (CONFIG["configurable"]["passenger_id"],),
+        )
+        hold_seats(conn, 1, "Business", booking_ref="T1", ttl=None)
+        conn.execute("INSERT INTO ticket_flights VALUES ('T1', 1, 'Business', 600)")
+
+    result = UpdateFlight().invoke({"ticket_no": "T1", "new_flight_id": "9"}, CONFIG)
+    assert result == "Ticket successfully updated to new flight."
+    with travel_pool.read() as conn:
+        assert seats_left(conn, 1, "Business") == 1
+        assert seats_left(conn, 9, "Business") == 0
+        row = conn.execute("SELECT flight_id FROM ticket_flights WHERE ticket_no = 'T1'")
+        assert row.fetchone() == (9,)
@@ -0,0 +1,117 @@
+from agents.tools.itinerary import fetch_itinerary
+
+PASSENGER = "3442 587242"
+
+
+def book(pool, tickets: int) -> None:
+    with pool.write() as conn:
+        conn.executemany(
+            "INSERT INTO tickets (ticket_no, book_ref, passenger_id, flight_no, flight_id) "
+            "VALUES (?, 'B1', ?, ?, ?)",
+            [(f"T{n}", PASSENGER, "LX0112", n % 4 + 1) for n in range(tickets)],
+        )
+        conn.executemany(
+            "INSERT INTO hotel_bookings (booking_id, hotel_id, passenger_id, check_in_date, "
+            "check_out_date, room_type, num_guests) VALUES (?, ?, ?, ?, ?, 'Double', 2)",
+            [
+                ("H1", 1, PASSENGER, "2024-05-01", "2024-05-03"),
+                ("H2", 2, "8149 604011", "2024-05-01", "2024-05-03"),
+            ],
+        )
+        conn.execute(
+            "INSERT INTO car_rental_bookings (rental_id, start_date, end_date, passenger_id) "
+            "VALUES (2, '2024-05-01', '2024-05-02', ?)",
+            (PASSENGER,),
+        )
+        conn.execute(
+            "INSERT INTO taxi_bookings (id, passenger_id, vehicle_type, pickup_time, "
+            "pickup_location, dropoff_location) "
+            "VALUES ('X1', ?, 'Sedan', '2024-05-01 10:00', 'BSL', 'Basel')",
+            (PASSENGER,),
+        )
+
+
+def test_itinerary_shape(travel_pool):
+    book(travel_pool, 1)
+    with travel_pool.write() as conn:
+        # A ticket whose flight is no longer in the flights table.
+        conn.execute(
+            "INSERT INTO tickets (ticket_no, book_ref, passenger_id, flight_no, flight_id) "
+            "VALUES ('T9', 'B2', ?, 'LX0999', 99)",
+            (PASSENGER,),
+        )
+    with travel_pool.read() as conn:
+        itinerary = fetch_itinerary(conn, PASSENGER)
+
+    missing, flight = itinerary["flights"]
+    assert missing == {
+        "ticket_no": "T9",
+        "book_ref": "B2",
+        "flight_id": None,
+        "flight_no": "LX0999",
+        "departure_airport": None,
+        "arrival_airport": None,
+        "scheduled_departure": None,
+        "scheduled_arrival": None,
+        "status": None,
+    }
+    assert flight == {
+        "ticket_no": "T0",
+        "book_ref": "B1",
+        "flight_id": 1,
+        "flight_no": "LX0112",
+        "departure_airport": "BSL",
+        "arrival_airport": "CDG",
+        "scheduled_departure": "2024-05-01 07:30:00.000000+03:00",
+        "scheduled_arrival": "2024-05-01 09:00:00.000000+03:00",
+        "status": "Scheduled",
+    }
+    assert itinerary["hotels"] == [
+        {
+            "booking_id": "H1",
+            "hotel_id": 1,
+            "name": "Hilton Basel",
+            "location": "Basel",
+            "price_tier": "Luxury",
+            "check_in_date": "2024-05-01",
+            "check_out_date": "2024-05-03",
+            "room_type": "Double",
+            "num_guests": 2,
+        }
+    ]
+    assert itinerary["car_rentals"] == [
+        {
+            "rental_id": 2,
+            "name": "Avis",
+            "location": "Zurich",
+            "price_tier": "Midscale",
+            "start_date": "2024-05-01",
+            "end_date": "2024-05-02",
+        }
+    ]
+    assert itinerary["taxis"] == [
+        {
+            "id": "X1",
+            "vehicle_type": "Sedan",
+            "pickup_time": "2024-05-01 10:00",
+            "pickup_location": "BSL",
+            "dropoff_location": "Basel",
+        }
+    ]
+    assert itinerary["summary"] == {
+        "total_flights": 2,
+        "total_hotels": 1,
+        "total_taxis": 1,
+        "total_car_rentals": 1,
+    }
+
+
+def test_itinerary_takes_four_queries_however_many_bookings(travel_pool):
+    book(travel_pool, 50)
+    statements: list[str] = []
+    with travel_pool.read() as conn:
+        conn.set_trace_callback(statements.append)
+        itinerary = fetch_itinerary(conn, PASSENGER)
+        conn.set_trace_callback(None)
+    assert len(itinerary["flights"]) == 50
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 4
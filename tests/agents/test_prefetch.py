@@ -0,0 +1,71 @@
+from langchain_core.messages import AIMessage
+
+from agents import prefetch
+from agents.prefetch import PrefetchToolNode, call_key, predict_searches
+from agents.tools.encoding import encode_tool_message
+from agents.tools.hotel_tools import BookHotel, SearchHotel
+from agents.travel_agent_support import route_primary_assistant
+from core import metrics
+
+ITINERARY = {"flights": [{"departure_airport": "CDG", "arrival_airport": "BSL"}]}
+CONFIG = {"configurable": {"thread_id": "prefetch"}}
+
+
+def tool_calls(*calls: tuple[str, dict]) -> dict:
+    return {
+        "messages": [
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": name, "args": args, "id": f"call{i}"}
+                    for i, (name, args) in enumerate(calls)
+                ],
+            )
+        ]
+    }
+
+
+def test_predicted_searches():
+    assert [(tool.name, args) for tool, args in predict_searches("book_hotel", ITINERARY)] == [
+        ("search_hotel", {"near": "BSL"}),
+        ("search_hotel", {"location": "Basel"}),
+    ]
+    assert predict_searches("update_flight", ITINERARY) == []
+    assert predict_searches("book_hotel", {"flights": []}) == []
+    assert call_key("search_hotel", {"location": "Basel", "name": None}) == call_key(
+        "search_hotel", {"location": "Basel"}
+    )
+
+
+def test_routing_to_a_sub_assistant_starts_its_searches(travel_pool):
+    state = {
+        **tool_calls(("ToHotelBookingAssistant", {"request": "a hotel"})),
+        "itinerary": ITINERARY,
+    }
+    assert route_primary_assistant(state, CONFIG) == "enter_book_hotel"
+    assert set(prefetch._prefetched["prefetch"]) == {
+        call_key("search_hotel", {"near": "BSL"}),
+        call_key("search_hotel", {"location": "Basel"}),
+    }
+    prefetch.discard(CONFIG)
+
+
+def test_tool_node_uses_prefetched_searches_once(travel_pool):
+    metrics.reset()
+    node = PrefetchToolNode([SearchHotel(), BookHotel()])
+    prefetch.start("book_hotel", {"itinerary": ITINERARY}, CONFIG)
+    search = {"name": "search_hotel", "args": {"location": "Basel"}, "id": "x", "type": "tool_call"}
+    expected = encode_tool_message(SearchHotel().invoke(search), 20).content
+
+    result = node.invoke(
+        tool_calls(("search_hotel", {"location": "Basel"}), ("search_hotel", {"name": "Hilton"})),
+        CONFIG,
+    )
+    hit, miss = result["messages"]
+    assert hit.tool_call_id == "call0" and hit.content == expected
+    assert miss.tool_call_id == "call1" and "Hilton" in miss.content
+    assert metrics.get("prefetch.hits") == 1 and metrics.get("prefetch.misses") == 1
+
+    # A booking drops the rest, since they may be out of date.
+    node.invoke(tool_calls(("book_hotel", {"hotel_id": 1})), CONFIG)
+    assert "prefetch" not in prefetch._prefetched
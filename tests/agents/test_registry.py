@@ -0,0 +1,44 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from agents.agents import Agent, get_agent, set_agent_memory, warm_up
+
+
+def test_agents_compile_on_first_use_with_memory():
+    compiled = Mock()
+    factory = Mock(return_value=compiled)
+    loaded = Mock()
+    registry = {
+        "lazy": Agent(description="Lazy.", factory=factory),
+        "loaded": Agent(description="Loaded.", graph=loaded),
+    }
+    with (
+        patch.dict("agents.agents.agents", registry, clear=True),
+        patch.dict("agents.agents._memory", clear=True),
+    ):
+        set_agent_memory("saver", "store")
+        assert (loaded.checkpointer, loaded.store) == ("saver", "store")
+        factory.assert_not_called()
+
+        assert get_agent("lazy") is compiled
+        assert get_agent("lazy") is compiled
+        factory.assert_called_once()
+        assert (compiled.checkpointer, compiled.store) == ("saver", "store")
+
+
+def test_warm_up_compiles_listed_agents():
+    factories = {name: Mock() for name in ("a", "b")}
+    registry = {name: Agent(description=name, factory=f) for name, f in factories.items()}
+    with patch.dict("agents.agents.agents", registry, clear=True):
+        warm_up(["a"])
+        factories["a"].assert_called_once()
+        factories["b"].assert_not_called()
+        warm_up()
+        factories["b"].assert_called_once()
+
+
+def test_agent_without_graph_or_factory_is_rejected():
+    with patch.dict("agents.agents.agents", {"empty": Agent(description="Empty.")}, clear=True):
+        with pytest.raises(ValueError, match="Agent empty has neither a graph nor a factory"):
+            get_agent("empty")
@@ -0,0 +1,83 @@
+from agents.tools.car_rental_tools import SearchCarRental
+from agents.tools.flight_tools import SearchFlights
+from agents.tools.hotel_tools import SearchHotel
+from agents.tools.search import SEARCH_LIMIT, fts_any, fts_column, fts_match, fts_phrase, page
+from agents.tools.taxi_tools import SearchTaxi
+from agents.tools.trip_recommendations import search_trip_recommendations
+
+
+def test_fts_phrase_strips_query_syntax():
+    assert fts_phrase('New "York" OR *') == '"new york or"*'
+    assert fts_phrase("  ") is None
+    assert fts_column("name", None) is None
+    assert fts_any("keywords", ["art", " wine tasting", ""]) == (
+        'keywords : ("art"* OR "wine tasting"*)'
+    )
+    assert fts_match(None, 'name : "a"*', 'location : "b"*') == 'name : "a"* AND location : "b"*'
+
+
+def test_page_clamps_limit_and_offset():
+    assert page() == [10, 0]
+    assert page(0, -5) == [1, 0]
+    assert page(500, 40) == [SEARCH_LIMIT, 40]
+
+
+def test_search_hotel_by_location(travel_pool):
+    hotels = SearchHotel().invoke({"location": "basel"})
+    assert {hotel["id"] for hotel in hotels} == {1, 3}
+
+    hotels = SearchHotel().invoke({"location": "Basel", "name": "hyatt"})
+    assert [hotel["name"] for hotel in hotels] == ["Hyatt Regency Basel"]
+
+
+def test_search_hotel_price_tier(travel_pool):
+    hotels = SearchHotel().invoke({"location": "Basel", "price_tier": "luxury"})
+    assert [hotel["id"] for hotel in hotels] == [1]
+
+    hotels = SearchHotel().invoke({"price_tier": "Upscale"})
+    assert [hotel["id"] for hotel in hotels] == [2]
+
+
+def test_search_hotel_index_follows_table(travel_pool):
+    with travel_pool.write() as conn:
+        conn.execute(
+            "INSERT INTO hotels (id, name, location) VALUES (5, 'Les Trois Rois', 'Basel')"
+        )
+        conn.execute("UPDATE hotels SET location = 'Geneva' WHERE id = 1")
+        conn.execute("DELETE FROM hotels WHERE id = 3")
+
+    hotels = SearchHotel().invoke({"location": "Basel"})
+    assert [hotel["id"] for hotel in hotels] == [5]
+
+
+def test_search_car_rental_prefix(travel_pool):
+    rentals = SearchCarRental().invoke({"location": "zur"})
+    assert [rental["name"] for rental in rentals] == ["Avis"]
+
+    assert SearchCarRental().invoke({"location": "zurich", "price_tier": "Economy"}) == []
+
+
+def test_search_taxi_filters_and_pages(travel_pool):
+    taxis = SearchTaxi().invoke({"vehicle_type": "sedan", "price_tier": "Luxury"})
+    assert [taxi["name"] for taxi in taxis] == ["Blacklane"]
+
+    vans = SearchTaxi().invoke({"vehicle_type": "Van"})
+    assert [taxi["id"] for taxi in vans] == list(range(3, 13))
+    vans = SearchTaxi().invoke({"vehicle_type": "Van", "limit": 100, "offset": 10})
+    assert [taxi["id"] for taxi in vans] == list(range(13, 30))
+    assert len(SearchTaxi().invoke({})) == 10
+
+
+def test_search_flights_sorted_pages(travel_pool):
+    flights = SearchFlights().invoke({"departure_airport": "BSL", "limit": 2})
+    assert [flight["flight_id"] for flight in flights] == [1, 2]
+    flights = SearchFlights().invoke({"departure_airport": "BSL", "limit": 2, "offset": 2})
+    assert [flight["flight_id"] for flight in flights] == [3]
+
+
+def test_search_trip_recommendations_any_keyword(travel_pool):
+    trips = search_trip_recommendations.invoke({"keywords": "museum, wine"})
+    assert {trip["id"] for trip in trips} == {2, 4}
+
+    trips = search_trip_recommendations.invoke({"location": "Basel", "keywords": "history"})
+    assert [trip["id"] for trip in trips] == [1]
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from agents.tools.base import READ_ONLY
+from agents.tools.error_handling import ConcurrentToolNode
+
+
+class Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.log = []
+
+    def enter(self, name):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.log.append(name)
+
+    def exit(self):
+        with self.lock:
+            self.active -= 1
+
+
+@pytest.fixture
+def tracker():
+    return Tracker()
+
+
+@pytest.fixture
+def tools(tracker):
+    @tool
+    def search(query: str) -> str:
+        """Search."""
+        tracker.enter("search")
+        time.sleep(0.05)
+        tracker.exit()
+        return f"found {query}"
+
+    @tool
+    def broken(query: str) -> str:
+        """Always fails."""
+        raise ValueError("bad query")
+
+    @tool
+    def book(item: str) -> str:
+        """Book."""
+        tracker.enter("book")
+        tracker.exit()
+        return f"booked {item}"
+
+    search.metadata = dict(READ_ONLY)
+    broken.metadata = dict(READ_ONLY)
+    return [search, broken, book]
+
+
+def calls(*specs):
+    tool_calls = [
+        {"name": name, "args": args, "id": f"call_{i}"} for i, (name, args) in enumerate(specs)
+    ]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+STATE = calls(
+    ("search", {"query": "a"}),
+    ("search", {"query": "b"}),
+    ("broken", {"query": "c"}),
+    ("search", {"query": "d"}),
+    ("search", {"query": "e"}),
+    ("book", {"item": "x"}),
+    ("search", {"query": "f"}),
+)
+
+
+def check_messages(messages):
+    assert [m.tool_call_id for m in messages] == [f"call_{i}" for i in range(7)]
+    assert [m.content for m in messages if m.status == "success"] == [
+        "found a",
+        "found b",
+        "found d",
+        "found e",
+        "booked x",
+        "found f",
+    ]
+    error = messages[2]
+    assert error.status == "error"
+    assert error.content.startswith("Error: ValueError('bad query')")
+
+
+def test_batches_split_on_writes(tools):
+    node = ConcurrentToolNode(tools)
+    assert node._batches(STATE["messages"][-1].tool_calls) == [[0, 1, 2, 3, 4], [5], [6]]
+
+
+def test_sync_reads_run_concurrently_up_to_cap(tools, tracker):
+    result = ConcurrentToolNode(tools, max_concurrency=3).invoke(STATE)
+    check_messages(result["messages"])
+    assert tracker.peak == 3
+    # The write waits for the reads before it and runs before the read after it.
+    assert tracker.log[4:] == ["book", "search"]
+
+
+@pytest.mark.asyncio
+async def test_async_reads_run_concurrently_up_to_cap(tools, tracker):
+    node = ConcurrentToolNode(tools, max_concurrency=2)
+    result = await node.ainvoke(STATE)
+    check_messages(result["messages"])
+    assert tracker.peak == 2
+    assert tracker.log[4:] == ["book", "search"]
+
+
+@pytest.mark.asyncio
+async def test_writes_run_one_at_a_time(tools, tracker):
+    state = calls(*[("book", {"item": str(i)}) for i in range(5)])
+    result = await ConcurrentToolNode(tools).ainvoke(state)
+    assert [m.content for m in result["messages"]] == [f"booked {i}" for i in range(5)]
+    assert tracker.peak == 1
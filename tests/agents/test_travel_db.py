@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from agents.tools.flight_tools import build_flight_search_query, day_bounds
+from agents.tools.itinerary import FLIGHTS_QUERY
+from agents.tools.migrations import MIGRATIONS, apply_migrations
+
+
+@pytest.fixture
+def conn(travel_db_path):
+    conn = sqlite3.connect(travel_db_path)
+    apply_migrations(conn)
+    yield conn
+    conn.close()
+
+
+def query_plan(conn: sqlite3.Connection, query: str, params) -> str:
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_apply_migrations_is_idempotent(conn):
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert apply_migrations(conn) == len(MIGRATIONS)
+
+
+def test_pool_applies_migrations(travel_pool):
+    with travel_pool.read() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_pool_write_rolls_back_on_error(travel_pool):
+    with pytest.raises(RuntimeError):
+        with travel_pool.write() as conn:
+            # The transaction is open before the first statement.
+            assert conn.in_transaction
+            conn.execute("DELETE FROM flights")
+            raise RuntimeError
+    with travel_pool.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0] == 4
+
+
+def test_day_bounds():
+    assert day_bounds("2024-05-02") == ("2024-05-02", "2024-05-03")
+    assert day_bounds("2024-05-31T18:00:00+03:00") == ("2024-05-31", "2024-06-01")
+
+
+def test_search_flights_date_range(conn):
+    query, params = build_flight_search_query("BSL", "CDG", "2024-05-02", "2024-05-02")
+    flight_ids = [row[0] for row in conn.execute(query, params)]
+    # Includes the late-evening departure on the end day, excludes the day before.
+    assert flight_ids == [2, 3]
+
+
+def test_search_flights_uses_route_index(conn):
+    query, params = build_flight_search_query("BSL", "CDG", "2024-05-01", "2024-05-03")
+    plan = query_plan(conn, query, params)
+    assert "USING INDEX idx_flights_route_departure" in plan
+    assert "scheduled_departure>? AND scheduled_departure<?" in plan
+
+
+def test_book_flight_lookup_uses_flight_no_index(conn):
+    query = (
+        "SELECT * FROM flights WHERE flight_no = ? "
+        "AND scheduled_departure >= ? AND scheduled_departure < ?"
+    )
+    plan = query_plan(conn, query, ("LX0112", *day_bounds("2024-05-02")))
+    assert "USING INDEX idx_flights_no_departure" in plan
+
+
+def test_itinerary_uses_passenger_index(conn):
+    plan = query_plan(conn, FLIGHTS_QUERY, ("8149 123456",))
+    assert "USING INDEX idx_tickets_passenger" in plan
+    assert "SCAN t" not in plan
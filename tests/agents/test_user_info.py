@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents.travel_agent_support import itinerary_changed, itinerary_write_tools, user_info
+
+CONFIG = {"configurable": {"passenger_id": "3442 587242", "thread_id": "user-info"}}
+ITINERARY = {"flights": [{"flight_id": 1, "flight_no": "LX0112"}], "hotels": []}
+
+
+def booking_turn(status: str = "success") -> list:
+    return [
+        HumanMessage(content="book it", id="h2"),
+        AIMessage(
+            content="",
+            id="a2",
+            tool_calls=[{"name": "book_hotel", "args": {"hotel_id": "1"}, "id": "call1"}],
+        ),
+        ToolMessage(
+            content="booked", name="book_hotel", tool_call_id="call1", status=status, id="t2"
+        ),
+    ]
+
+
+@pytest.fixture
+def fetch():
+    with patch("agents.travel_agent_support.fetch_user_flight_information") as fetch:
+        fetch.invoke.return_value = ITINERARY
+        yield fetch
+
+
+@pytest.fixture
+def cached():
+    """State after the itinerary was loaded for the first message."""
+    return {
+        "messages": [HumanMessage(content="hi", id="h1"), AIMessage(content="hello", id="a1")],
+        "user_info": "flights: ...",
+        "itinerary": ITINERARY,
+        "user_info_passenger": "3442 587242",
+        "user_info_checked_id": "h1",
+    }
+
+
+def test_first_turn_loads_the_itinerary(fetch):
+    update = user_info({"messages": [HumanMessage(content="hi", id="h1")]}, CONFIG)
+    fetch.invoke.assert_called_once_with({}, CONFIG)
+    assert update["itinerary"] == ITINERARY and "LX0112" in update["user_info"]
+    assert update["user_info_passenger"] == "3442 587242"
+    assert update["user_info_checked_id"] == "h1"
+
+
+def test_cached_itinerary_is_reused(fetch, cached):
+    cached["messages"].append(HumanMessage(content="and tomorrow?", id="h2"))
+    assert user_info(cached, CONFIG) == {"user_info_checked_id": "h2"}
+    fetch.invoke.assert_not_called()
+
+
+def test_successful_booking_reloads(fetch, cached):
+    cached["messages"] += booking_turn()
+    update = user_info(cached, CONFIG)
+    fetch.invoke.assert_called_once()
+    assert update["user_info_checked_id"] == "t2"
+
+
+def test_failed_booking_does_not_reload(fetch, cached):
+    cached["messages"] += booking_turn(status="error")
+    assert user_info(cached, CONFIG) == {"user_info_checked_id": "t2"}
+    fetch.invoke.assert_not_called()
+
+
+def test_booking_before_the_cached_copy_does_not_reload(fetch, cached):
+    cached["messages"] = booking_turn() + [HumanMessage(content="thanks", id="h3")]
+    cached["user_info_checked_id"] = "t2"
+    assert user_info(cached, CONFIG) == {"user_info_checked_id": "h3"}
+    fetch.invoke.assert_not_called()
+
+
+def test_other_passenger_reloads(fetch, cached):
+    config = {"configurable": {**CONFIG["configurable"], "passenger_id": "8149 604011"}}
+    update = user_info(cached, config)
+    fetch.invoke.assert_called_once_with({}, config)
+    assert update["user_info_passenger"] == "8149 604011"
+
+
+def test_write_tools_cover_bookings_updates_and_cancellations():
+    assert {"book_hotel", "update_flight", "cancel_car_rental"} <= itinerary_write_tools
+    assert "search_hotel" not in itinerary_write_tools
+    assert not itinerary_changed(
+        [ToolMessage(content="[]", name="search_hotel", tool_call_id="x")], None
+    )
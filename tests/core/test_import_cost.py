@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="reads /proc/self/status")
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+PROVIDERS = (
+    "langchain_anthropic",
+    "langchain_aws",
+    "langchain_community",
+    "langchain_google_genai",
+    "langchain_google_vertexai",
+    "langchain_groq",
+    "langchain_ollama",
+    "langchain_openai",
+)
+# Budgets are a few times what a laptop measures (core: 0.3 s and 45 MB, service: 2.3 s and
+# 125 MB), so they only fail when something heavy is imported again. Importing every provider
+# SDK up front cost about 7 s and 400 MB.
+CORE_BUDGET = (2.0, 120)
+SERVICE_BUDGET = (6.0, 250)
+
+# Peak RSS comes from VmHWM: ru_maxrss survives exec, so the child would report pytest's.
+MEASURE = """
+import json, re, sys, time
+start = time.perf_counter()
+{code}
+with open("/proc/self/status") as status:
+    peak_kb = int(re.search(r"VmHWM:\\s+(\\d+)", status.read()).group(1))
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "rss_mb": peak_kb / 1024,
+    "providers": sorted({{name.split(".")[0] for name in sys.modules}} & set({providers})),
+}}))
+"""
+
+
+def measure(code: str) -> dict:
+    """Run ``code`` in a fresh interpreter and report its import time, peak RSS and providers."""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(code=code, providers=PROVIDERS)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    ("code", "budget"),
+    [("import core", CORE_BUDGET), ("from service import app", SERVICE_BUDGET)],
+)
+def test_import_loads_no_provider_and_stays_in_budget(code, budget):
+    result = measure(code)
+    print(f"{code}: {result['seconds']:.2f} s, {result['rss_mb']:.0f} MB")
+    assert result["providers"] == []
+    assert result["seconds"] < budget[0]
+    assert result["rss_mb"] < budget[1]
+
+
+def test_get_model_imports_only_its_provider():
+    result = measure(
+        "from core import get_model\n"
+        "from schema.models import OpenAIModelName\n"
+        "get_model(OpenAIModelName.GPT_4O_MINI)"
+    )
+    assert result["providers"] == ["langchain_openai"]
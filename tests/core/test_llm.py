@@ -8,7 +8,7 @@ from langchain_groq import ChatGroq
 from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
 
-from core.llm import get_model
+from core.llm import get_bound_model, get_model
 from schema.models import (
     AnthropicModelName,
     FakeModelName,
@@ -70,3 +70,22 @@ def test_get_model_invalid():
     with pytest.raises(ValueError, match="Unsupported model:"):
         # Using type: ignore since we're intentionally testing invalid input
         get_model("invalid_model")  # type: ignore
+
+
+def test_get_bound_model_binds_once_per_model_and_toolset():
+    tools = [object(), object()]
+    with (
+        patch("core.llm.get_model") as get_model_mock,
+        patch.dict("core.llm._BOUND_MODELS", clear=True),
+    ):
+        first = get_bound_model(OpenAIModelName.GPT_4O, tools)
+        assert get_bound_model(OpenAIModelName.GPT_4O, list(tools)) is first
+        get_bound_model(OpenAIModelName.GPT_4O_MINI, tools)
+        get_bound_model(OpenAIModelName.GPT_4O, tools[:1])
+
+    assert [c.args for c in get_model_mock.call_args_list] == [
+        (OpenAIModelName.GPT_4O,),
+        (OpenAIModelName.GPT_4O_MINI,),
+        (OpenAIModelName.GPT_4O,),
+    ]
+    assert get_model_mock.return_value.bind_tools.call_count == 3
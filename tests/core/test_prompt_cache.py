@@ -0,0 +1,63 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompt_values import ChatPromptValue
+
+from agents.travel_agent_support import primary_assistant_prompt
+from core import metrics
+from core.prompt_cache import CACHE_CONTROL, mark_cache_prefix, record_prompt_cache
+from schema.models import AnthropicModelName, OpenAIModelName
+
+PROMPT = ChatPromptValue(
+    messages=[
+        SystemMessage(content="static instructions"),
+        SystemMessage(content="Current time: 2025-01-01 12:00."),
+        HumanMessage(content="hi"),
+    ]
+)
+
+
+def test_anthropic_prefix_is_marked():
+    first, context, human = mark_cache_prefix(AnthropicModelName.HAIKU_35, PROMPT)
+    assert first.content == [
+        {"type": "text", "text": "static instructions", "cache_control": CACHE_CONTROL}
+    ]
+    assert context.content == "Current time: 2025-01-01 12:00." and human.content == "hi"
+    # The template's messages are left untouched.
+    assert PROMPT.messages[0].content == "static instructions"
+
+    assert mark_cache_prefix(OpenAIModelName.GPT_4O_MINI, PROMPT) == PROMPT.messages
+
+
+def test_static_prefix_comes_before_volatile_context():
+    state = {"messages": [HumanMessage(content="hi")], "user_info": "[]"}
+    first = primary_assistant_prompt.invoke(state).to_messages()
+    second = primary_assistant_prompt.invoke(
+        {**state, "user_info": "[{'flight_id': 1}]"}
+    ).to_messages()
+    assert first[0] == second[0]
+    assert "{" not in first[0].content
+    assert first[1] != second[1] and "Current time" in first[1].content
+
+
+def test_cache_hits_are_counted():
+    metrics.reset()
+    usage = {"input_tokens": 1200, "output_tokens": 10, "total_tokens": 1210}
+    record_prompt_cache(
+        AIMessage(
+            content="",
+            usage_metadata={**usage, "input_token_details": {"cache_read": 1024}},
+        )
+    )
+    record_prompt_cache(
+        AIMessage(
+            content="",
+            usage_metadata=usage,
+            response_metadata={"usage": {"cache_read_input_tokens": 0}},
+        )
+    )
+    record_prompt_cache(AIMessage(content="no usage reported"))
+    assert metrics.snapshot() == {
+        "prompt_cache.calls": 2,
+        "prompt_cache.input_tokens": 2400,
+        "prompt_cache.cached_tokens": 1024,
+        "prompt_cache.hits": 1,
+    }
@@ -0,0 +1,151 @@
+from unittest.mock import patch
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+
+from core import metrics, response_cache, settings
+from core.response_cache import LRUCache, with_response_cache
+
+
+@tool
+def search_hotel(location: str) -> str:
+    """Search hotels."""
+    return location
+
+
+search_hotel.metadata = {"read_only": True}
+
+
+@tool
+def book_hotel(hotel_id: int) -> str:
+    """Book a hotel."""
+    return "booked"
+
+
+class TopicEmbeddings(Embeddings):
+    """Embeds a text by whether it is about the weather."""
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0] if "weather" in text else [0.0, 1.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def model():
+    """A fake model that counts its calls, behind a cleared cache.
+
+    It searches for hotels when asked about them and answers with text otherwise.
+    """
+    calls = []
+
+    def answer(messages):
+        calls.append(messages)
+        if "hotel" not in messages[-1].content.lower():
+            return AIMessage(content=f"answer {len(calls)}", id=f"run-{len(calls)}")
+        return AIMessage(
+            content="",
+            id=f"run-{len(calls)}",
+            tool_calls=[{"name": "search_hotel", "args": {"location": "Basel"}, "id": "call_1"}],
+        )
+
+    response_cache._responses.clear()
+    response_cache._first_turns.clear()
+    metrics.reset()
+    with patch.object(
+        settings, "RESPONSE_CACHE", {"research-assistant": "exact", "rag-assistant": "similar"}
+    ):
+        yield RunnableLambda(answer), calls
+
+
+def test_lru_cache_expires_and_evicts():
+    now = [0.0]
+    cache = LRUCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # "b" is the least recently used
+    assert cache.get("b") is None and cache.get("c") == 3
+    now[0] = 10
+    assert cache.get("a") is None and cache.values() == []
+
+
+def test_exact_tier(model):
+    fake, calls = model
+    cached = with_response_cache("research-assistant", "gpt-4o-mini", [search_hotel], fake)
+    system = SystemMessage(content="You are helpful.")
+
+    first = cached.invoke([system, HumanMessage(content="Hotels in  Basel?")])
+    second = cached.invoke([system, HumanMessage(content="hotels in Basel?\n")])
+    assert len(calls) == 1
+    assert second.tool_calls[0]["args"] == first.tool_calls[0]["args"] and second.id is None
+    assert second.response_metadata["response_cache"] == "exact"
+    # Tool call ids are new, so the same thread can receive the response twice.
+    assert second.tool_calls[0]["id"] != first.tool_calls[0]["id"]
+
+    cached.invoke([system, HumanMessage(content="Hotels in Zurich?")])
+    with_response_cache("research-assistant", "gpt-4o", [search_hotel], fake).invoke(
+        [system, HumanMessage(content="Hotels in Basel?")]
+    )
+    assert len(calls) == 3
+    assert with_response_cache("order-assistant", "gpt-4o-mini", [], fake) is fake
+
+
+def test_turns_with_booking_results_are_not_cached(model):
+    fake, calls = model
+    tools = [search_hotel, book_hotel]
+    cached = with_response_cache("research-assistant", "gpt-4o-mini", tools, fake)
+    booked = [
+        HumanMessage(content="Book the Hilton"),
+        AIMessage(content="", tool_calls=[{"name": "book_hotel", "args": {}, "id": "1"}]),
+        ToolMessage(content="booked", name="book_hotel", tool_call_id="1"),
+    ]
+    cached.invoke(booked)
+    cached.invoke(booked)
+    assert len(calls) == 2
+    assert metrics.get("response_cache.skipped") == 2
+
+    # A booking in an earlier turn doesn't stop the next one from being cached.
+    searched = [
+        HumanMessage(content="Any hotels in Basel?"),
+        AIMessage(content="", tool_calls=[{"name": "search_hotel", "args": {}, "id": "2"}]),
+        ToolMessage(content="Hilton", name="search_hotel", tool_call_id="2"),
+    ]
+    cached.invoke(booked + searched)
+    cached.invoke(booked + searched)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_similar_tier_for_first_turns(model):
+    fake, calls = model
+    cached = with_response_cache("rag-assistant", "gpt-4o-mini", [search_hotel], fake)
+    with patch("core.response_cache._embeddings", return_value=TopicEmbeddings()):
+        await cached.ainvoke([HumanMessage(content="What's the weather in Basel?")])
+        similar = await cached.ainvoke([HumanMessage(content="How is the weather in Basel")])
+        # Tool calls carry the arguments of their own message, so they are never shared.
+        await cached.ainvoke([HumanMessage(content="Any hotels in Basel?")])
+        await cached.ainvoke([HumanMessage(content="Any hotels in Zurich?")])
+        # Only first turns are matched by similarity.
+        later = [
+            HumanMessage(content="Hi"),
+            AIMessage(content="Hello!"),
+            HumanMessage(content="Weather in Basel?"),
+        ]
+        await cached.ainvoke(later)
+    assert similar.response_metadata["response_cache"] == "similar"
+    assert len(calls) == 4
+    assert metrics.get("response_cache.similar_hits") == 1
+
+
+def test_embedding_failures_fall_back_to_the_model(model):
+    fake, calls = model
+    cached = with_response_cache("rag-assistant", "gpt-4o-mini", [], fake)
+    with patch("core.response_cache._embeddings", side_effect=RuntimeError("no API key")):
+        response = cached.invoke([HumanMessage(content="What's the weather in Basel?")])
+    assert response.content == "answer 1" and len(calls) == 1
+    assert metrics.get("response_cache.embedding_errors") == 1
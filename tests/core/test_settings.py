@@ -5,7 +5,7 @@ from unittest.mock import patch
 import pytest
 from pydantic import SecretStr, ValidationError
 
-from core.settings import Settings, check_str_is_http
+from core.settings import DEFAULT_TRAVEL_DB_PATH, Settings, check_str_is_http
 from schema.models import (
     AnthropicModelName,
     AzureOpenAIModelName,
@@ -200,3 +200,35 @@ def test_settings_azure_openai():
         assert settings.AZURE_OPENAI_API_KEY.get_secret_value() == "test-key"
         assert settings.AZURE_OPENAI_ENDPOINT == "https://test.openai.azure.com"
         assert settings.AZURE_OPENAI_DEPLOYMENT_MAP == deployment_map
+
+
+def test_settings_travel_db_path_default():
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}, clear=True):
+        settings = Settings(_env_file=None)
+        assert settings.travel_db_path() == DEFAULT_TRAVEL_DB_PATH
+        assert DEFAULT_TRAVEL_DB_PATH.parts[-3:] == ("agents", "db", "travel.sqlite")
+
+
+def test_settings_travel_db_uri(tmp_path):
+    db_path = (tmp_path / "travel.sqlite").resolve()
+    with patch.dict(
+        os.environ, {"OPENAI_API_KEY": "test_key", "TRAVEL_DB_PATH": str(db_path)}, clear=True
+    ):
+        settings = Settings(_env_file=None)
+        assert settings.travel_db_path() == db_path
+        assert settings.travel_db_uri() == f"{db_path.as_uri()}?mode=rw"
+        assert settings.travel_db_uri(read_only=True) == f"{db_path.as_uri()}?mode=ro"
+
+    with patch.dict(
+        os.environ,
+        {
+            "OPENAI_API_KEY": "test_key",
+            "TRAVEL_DB_PATH": str(db_path),
+            "TRAVEL_DB_IMMUTABLE": "true",
+        },
+        clear=True,
+    ):
+        settings = Settings(_env_file=None)
+        assert settings.travel_db_uri(read_only=True).endswith("?mode=ro&immutable=1")
+        # Writers never get the immutable flag
+        assert settings.travel_db_uri() == f"{db_path.as_uri()}?mode=rw"
@@ -8,6 +8,7 @@ from langgraph.pregel.types import StateSnapshot
 from langgraph.types import Interrupt
 
 from agents.agents import Agent
+from core import metrics
 from schema import ChatHistory, ChatMessage, ServiceMetadata
 from schema.models import OpenAIModelName
 
@@ -354,3 +355,13 @@ def test_info(test_client, mock_settings) -> None:
 
     assert output.default_model == OpenAIModelName.GPT_4O_MINI
     assert output.models == [OpenAIModelName.GPT_4O, OpenAIModelName.GPT_4O_MINI]
+
+
+def test_metrics(test_client, mock_settings) -> None:
+    """Test that /metrics returns the process counters."""
+    mock_settings.AUTH_SECRET = None
+    metrics.reset()
+    metrics.increment("assistant.reprompts", 2)
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.json() == {"assistant.reprompts": 2}